@@ -1,7 +1,9 @@
+import asyncio
 from typing import Optional
 
 from coreason_identity.models import UserContext
 from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import ORJSONResponse
 from starlette import status
 
 from coreason_catalog.dependencies import get_federation_broker, get_registry_service
@@ -13,6 +15,20 @@ from coreason_catalog.utils.logger import logger
 router = APIRouter()
 
 
+def _registration_error(exc: Exception) -> HTTPException:
+    """
+    Translate a registration failure into the HTTP error returned to the client.
+
+    Embedding (ValueError) and storage (RuntimeError) failures carry a message that is
+    safe to surface; anything else is reported as a generic internal error.
+    """
+    if isinstance(exc, (ValueError, RuntimeError)):
+        logger.error(f"Registration failed: {exc}")
+        return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    logger.error(f"Unexpected error during registration: {exc}")
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+
+
 @router.post(
     "/v1/sources",
     status_code=status.HTTP_201_CREATED,
@@ -24,26 +40,23 @@ async def register_source(
 ) -> dict[str, str]:
     """
     Register a new source manifest.
+
+    Embedding the description is CPU-bound, so registration runs in a worker thread
+    and the event loop stays free to serve other requests meanwhile.
     """
     logger.info(f"Received registration request for source: {manifest.urn}")
     try:
-        registry_service.register_source(manifest)
-        return {"status": "registered", "urn": manifest.urn}
-    except ValueError as e:
-        logger.error(f"Validation error during registration: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
-    except RuntimeError as e:
-        logger.error(f"Runtime error during registration: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+        await asyncio.to_thread(registry_service.register_source, manifest)
     except Exception as e:
-        logger.error(f"Unexpected error during registration: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error") from e
+        raise _registration_error(e) from e
+    return {"status": "registered", "urn": manifest.urn}
 
 
 @router.post(
     "/v1/query",
     status_code=status.HTTP_200_OK,
     response_model=CatalogResponse,
+    response_class=ORJSONResponse,
 )  # type: ignore[misc]
 async def query_catalog(
     request: QueryRequest,
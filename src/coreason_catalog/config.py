@@ -0,0 +1,33 @@
+# Copyright (c) 2025 CoReason, Inc.
+#
+# This software is proprietary and dual-licensed.
+# Licensed under the Prosperity Public License 3.0 (the "License").
+# A copy of the license is available at https://prosperitylicense.com/versions/3.0.0
+# For details, see the LICENSE file.
+# Commercial use beyond a 30-day trial requires a separate license.
+#
+# Source Code: https://github.com/CoReason-AI/coreason_catalog
+
+"""
+Configuration for the coreason-catalog service.
+"""
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class CoreasonCatalogConfig(BaseSettings):
+    """
+    Configuration settings for coreason-catalog, read from the environment.
+
+    Attributes:
+        semantic_cache_enabled (bool): Reuse discovery results for near-identical intents
+            (`COREASON_CATALOG_SEMANTIC_CACHE_ENABLED`). Off by default: a hit returns the
+            candidates found for a different intent, which can change query results.
+    """
+
+    model_config = SettingsConfigDict(
+        env_prefix="COREASON_CATALOG_",
+        case_sensitive=False,
+    )
+
+    semantic_cache_enabled: bool = False
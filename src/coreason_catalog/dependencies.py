@@ -8,112 +8,63 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_catalog
 
-from threading import Lock
-from typing import Callable, TypeVar
-
-from fastapi import Depends
+from fastapi import Request
 
 from coreason_catalog.services.broker import FederationBroker, QueryDispatcher
 from coreason_catalog.services.embedding import EmbeddingService
 from coreason_catalog.services.policy_engine import PolicyEngine
 from coreason_catalog.services.provenance import ProvenanceService
 from coreason_catalog.services.registry import RegistryService
-from coreason_catalog.services.sse_dispatcher import SSEQueryDispatcher
 from coreason_catalog.services.vector_store import VectorStore
 
-T = TypeVar("T")
-
-
-def thread_safe_singleton(func: Callable[[], T]) -> Callable[[], T]:
-    """
-    Decorator to ensure a function is called only once, thread-safely.
-    Similar to lru_cache but with a Lock for strict concurrency safety on init.
-    """
-    lock = Lock()
-    instance: T | None = None
-
-    def wrapper() -> T:
-        nonlocal instance
-        if instance is None:
-            with lock:
-                if instance is None:
-                    instance = func()
-        return instance
-
-    # Expose a way to clear the singleton for testing
-    def cache_clear() -> None:
-        nonlocal instance
-        with lock:
-            instance = None
-
-    wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
-    return wrapper
+# Service singletons are built once by the application lifespan (see main.py)
+# and bound to app.state, so the providers below are plain attribute lookups.
 
 
-@thread_safe_singleton
-def get_vector_store() -> VectorStore:
+def get_vector_store(request: Request) -> VectorStore:
     """
     Singleton provider for VectorStore.
     """
-    return VectorStore()
+    return request.app.state.vector_store  # type: ignore[no-any-return]
 
 
-@thread_safe_singleton
-def get_embedding_service() -> EmbeddingService:
+def get_embedding_service(request: Request) -> EmbeddingService:
     """
     Singleton provider for EmbeddingService.
     """
-    return EmbeddingService()
+    return request.app.state.embedding_service  # type: ignore[no-any-return]
 
 
-@thread_safe_singleton
-def get_policy_engine() -> PolicyEngine:
+def get_policy_engine(request: Request) -> PolicyEngine:
     """
     Singleton provider for PolicyEngine.
     """
-    return PolicyEngine()
+    return request.app.state.policy_engine  # type: ignore[no-any-return]
 
 
-@thread_safe_singleton
-def get_provenance_service() -> ProvenanceService:
+def get_provenance_service(request: Request) -> ProvenanceService:
     """
     Singleton provider for ProvenanceService.
     """
-    return ProvenanceService()
+    return request.app.state.provenance_service  # type: ignore[no-any-return]
 
 
-@thread_safe_singleton
-def get_query_dispatcher() -> QueryDispatcher:
+def get_query_dispatcher(request: Request) -> QueryDispatcher:
     """
     Singleton provider for QueryDispatcher.
     """
-    return SSEQueryDispatcher()
+    return request.app.state.query_dispatcher  # type: ignore[no-any-return]
 
 
-def get_registry_service(
-    vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
-    embedding_service: EmbeddingService = Depends(get_embedding_service),  # noqa: B008
-) -> RegistryService:
+def get_registry_service(request: Request) -> RegistryService:
     """
     Provider for RegistryService.
     """
-    return RegistryService(vector_store, embedding_service)
+    return request.app.state.registry_service  # type: ignore[no-any-return]
 
 
-def get_federation_broker(
-    vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
-    policy_engine: PolicyEngine = Depends(get_policy_engine),  # noqa: B008
-    embedding_service: EmbeddingService = Depends(get_embedding_service),  # noqa: B008
-    dispatcher: QueryDispatcher = Depends(get_query_dispatcher),  # noqa: B008
-    provenance_service: ProvenanceService = Depends(get_provenance_service),  # noqa: B008
-) -> FederationBroker:
+def get_federation_broker(request: Request) -> FederationBroker:
     """
     Provider for FederationBroker.
     """
-    return FederationBroker(
-        vector_store=vector_store,
-        policy_engine=policy_engine,
-        embedding_service=embedding_service,
-        dispatcher=dispatcher,
-        provenance_service=provenance_service,
-    )
+    return request.app.state.federation_broker  # type: ignore[no-any-return]
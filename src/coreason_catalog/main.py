@@ -1,9 +1,64 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from coreason_catalog.api.routes import router
+from coreason_catalog.config import CoreasonCatalogConfig
+from coreason_catalog.services.broker import FederationBroker
+from coreason_catalog.services.embedding import EmbeddingService
+from coreason_catalog.services.policy_engine import PolicyEngine
+from coreason_catalog.services.provenance import ProvenanceService
+from coreason_catalog.services.registry import RegistryService
+from coreason_catalog.services.semantic_cache import SemanticCache
+from coreason_catalog.services.sse_dispatcher import SSEQueryDispatcher
+from coreason_catalog.services.vector_store import VectorStore
 from coreason_catalog.utils.logger import logger
 
-app = FastAPI(title="coreason-catalog", version="0.3.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Application lifespan.
+
+    Instantiates every service singleton exactly once at startup and binds it to
+    app.state, where the dependency providers resolve it per request.
+    """
+    logger.info("Initializing catalog services")
+    config = CoreasonCatalogConfig()
+    app.state.vector_store = VectorStore()
+    app.state.embedding_service = EmbeddingService()
+    app.state.policy_engine = PolicyEngine()
+    app.state.provenance_service = ProvenanceService()
+    app.state.query_dispatcher = SSEQueryDispatcher()
+    app.state.registry_service = RegistryService(app.state.vector_store, app.state.embedding_service)
+    app.state.federation_broker = FederationBroker(
+        vector_store=app.state.vector_store,
+        policy_engine=app.state.policy_engine,
+        embedding_service=app.state.embedding_service,
+        dispatcher=app.state.query_dispatcher,
+        provenance_service=app.state.provenance_service,
+        semantic_cache=SemanticCache() if config.semantic_cache_enabled else None,
+    )
+    # Each teardown is registered once its service has started, so a failed startup step
+    # releases only what is already running (in reverse order).
+    async with AsyncExitStack() as running:
+        running.push_async_callback(app.state.federation_broker.close)
+        await app.state.embedding_service.start()
+        running.push_async_callback(app.state.embedding_service.stop)
+        await app.state.policy_engine.start_server()
+        running.push_async_callback(app.state.policy_engine.stop_server)
+        try:
+            yield
+        finally:
+            logger.info("Shutting down catalog services")
+
+
+app = FastAPI(title="coreason-catalog", version="0.3.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+# Wide federated responses compress well; level 5 balances CPU against ratio.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 
 @app.get("/health", response_model=dict[str, str])  # type: ignore[misc]
@@ -1,9 +1,17 @@
 from enum import Enum
-from typing import Any, Dict, List, Literal, Optional
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Dict, FrozenSet, List, Literal, Mapping, Optional, Self
 from uuid import UUID
 
 from coreason_identity.models import UserContext
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+
+@lru_cache(maxsize=1024)
+def policy_digest(policy_code: str) -> bytes:
+    """Return a stable 128-bit fingerprint of a Rego policy."""
+    return blake2b(policy_code.encode(), digest_size=16).digest()
 
 
 class DataSensitivity(str, Enum):
@@ -14,6 +22,9 @@ class DataSensitivity(str, Enum):
 
 
 class SourceManifest(BaseModel):
+    # Immutable: manifests are shared between the vector store index, the broker and callers.
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     urn: str = Field(..., description="URN of the source, e.g. urn:coreason:mcp:clin_data_01")
     name: str = Field(..., description="Human readable name of the source")
     description: str = Field(..., description="Natural language description for semantic search")
@@ -29,6 +40,39 @@ class SourceManifest(BaseModel):
     # OPA Policy (Rego)
     access_policy: str = Field(..., description="Rego policy string")
 
+    # Derived, not part of the wire schema: computed once so the governance path never re-hashes the
+    # policy or rebuilds the ACL set.
+    _policy_digest: bytes = PrivateAttr(default=b"")
+    _acls_set: FrozenSet[str] = PrivateAttr(default=frozenset())
+
+    def model_post_init(self, __context: Any) -> None:
+        self._derive()
+
+    def __hash__(self) -> int:
+        # Pydantic's frozen hash covers every field and fails on the list/dict ones. Equal manifests
+        # always share a URN, so hashing the URN alone is consistent with the field-wise __eq__.
+        return hash(self.urn)
+
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False) -> Self:
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            copied._derive()
+        return copied
+
+    def _derive(self) -> None:
+        self._policy_digest = policy_digest(self.access_policy)
+        self._acls_set = frozenset(self.acls)
+
+    @property
+    def policy_digest(self) -> bytes:
+        """blake2b digest of `access_policy`."""
+        return self._policy_digest
+
+    @property
+    def acls_set(self) -> FrozenSet[str]:
+        """`acls` as a frozenset, for O(1) membership tests."""
+        return self._acls_set
+
 
 class SourceResult(BaseModel):
     source_urn: str
@@ -2,18 +2,34 @@ import asyncio
 import time
 import uuid
 from abc import ABC, abstractmethod
-from typing import Any, List
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Coroutine, Dict, List, Optional, Tuple
 
+import numpy as np
+import numpy.typing as npt
 from coreason_identity.models import UserContext
 
 from coreason_catalog.models import CatalogResponse, SourceManifest, SourceResult
 from coreason_catalog.services.embedding import EmbeddingService
-from coreason_catalog.services.policy_engine import PolicyEngine
+from coreason_catalog.services.policy_engine import DecisionCacheInfo, PolicyEngine
 from coreason_catalog.services.provenance import ProvenanceService
+from coreason_catalog.services.semantic_cache import SemanticCache
 from coreason_catalog.services.vector_store import VectorStore
 from coreason_catalog.utils.logger import logger
 
 
+class _DiscoveryError(Exception):
+    """Semantic discovery failed; the message names the failed step."""
+
+
+# Discovery failures all produce the same empty response, so they are validated once here and
+# copied per query (model_copy skips validation) instead of rebuilt during a dependency outage.
+_FAILURE_RESPONSES: Dict[str, CatalogResponse] = {
+    step: CatalogResponse(query_id=uuid.UUID(int=0), aggregated_results=[], provenance_signature=f"ERROR: {step}")
+    for step in ("Embedding Failed", "Search Failed")
+}
+
+
 class QueryDispatcher(ABC):
     """
     Abstract interface for dispatching queries to MCP servers.
@@ -33,6 +49,10 @@ class QueryDispatcher(ABC):
         """
         pass  # pragma: no cover
 
+    async def close(self) -> None:
+        """Release pooled resources (e.g. HTTP connections). Stateless dispatchers need not override this."""
+        return None
+
 
 class FederationBroker:
     """
@@ -47,135 +67,374 @@ class FederationBroker:
         embedding_service: EmbeddingService,
         dispatcher: QueryDispatcher,
         provenance_service: ProvenanceService,
+        max_parallel: int = 32,
+        embedding_cache_size: int = 1024,
+        dispatch_timeout: Optional[float] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
     ):
+        """
+        Initialize the FederationBroker.
+
+        Args:
+            vector_store: Store used for semantic discovery.
+            policy_engine: Engine used for ACL and policy checks.
+            embedding_service: Service used to embed query intents.
+            dispatcher: Dispatcher used to query allowed sources.
+            provenance_service: Service used to stamp responses.
+            max_parallel: Maximum number of sources queried at once per request.
+            embedding_cache_size: Maximum number of intent embeddings kept in the LRU cache (0 disables it).
+            dispatch_timeout: Optional per-source deadline in seconds; slower sources yield an ERROR result.
+            semantic_cache: Optional similarity cache reusing discovery results for near-identical intents.
+            breaker_threshold: Consecutive dispatch failures after which a source's circuit opens (0 disables it).
+            breaker_cooldown: Seconds an open circuit short-circuits the source to an ERROR result.
+        """
         self.vector_store = vector_store
         self.policy_engine = policy_engine
         self.embedding_service = embedding_service
         self.dispatcher = dispatcher
         self.provenance_service = provenance_service
+        self.max_parallel = max_parallel
+        self.dispatch_timeout = dispatch_timeout
+        self.semantic_cache = semantic_cache
+        self._embedding_cache_size = embedding_cache_size
+        self._embedding_cache: OrderedDict[str, npt.NDArray[np.float32]] = OrderedDict()
+        self._inflight_embeddings: Dict[str, "asyncio.Future[npt.NDArray[np.float32]]"] = {}
+        self._policy_objects: Dict[str, Tuple[SourceManifest, Dict[str, Any]]] = {}
+        self._breaker_threshold = breaker_threshold
+        self._breaker_cooldown = breaker_cooldown
+        # urn -> (consecutive failures, open until); open until is infinite while a half-open trial runs
+        self._breaker: Dict[str, Tuple[int, float]] = {}
 
-    async def dispatch_query(self, intent: str, user_context: UserContext, limit: int = 10) -> CatalogResponse:
+    async def close(self) -> None:
+        """Release the dispatcher's pooled connections; call once at shutdown."""
+        await self.dispatcher.close()
+
+    def _policy_object(self, source: SourceManifest) -> Dict[str, Any]:
         """
-        Execute the Register-Discover-Govern-Stamp Loop.
+        Return the OPA `object` document for a source, memoized per manifest instance.
 
-        1. Semantic Discovery: Find sources matching the intent.
-        2. Governance: Filter sources based on policy and user context.
-        3. Dispatch: Query allowed sources in parallel.
-        4. Aggregation: Combine results and stamp with provenance.
+        Manifests are frozen and the vector store hands out the same instances until the index
+        changes, so the document is built once per URN and rebuilt only when a new instance
+        (e.g. a re-registration) replaces it. Callers must not mutate the returned dict.
+        """
+        cached = self._policy_objects.get(source.urn)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+        document = {
+            "urn": source.urn,
+            "geo": source.geo_location,
+            "sensitivity": source.sensitivity.value,
+            "owner": source.owner_group,
+        }
+        self._policy_objects[source.urn] = (source, document)
+        return document
 
-        Args:
-            intent: The user's high-level query/intent.
-            user_context: The user/agent context (Subject) for policy evaluation.
-            limit: Max number of sources to query.
+    @staticmethod
+    def _policy_subject(user_context: UserContext) -> Dict[str, Any]:
+        """
+        Return the OPA `subject` document for a user; built once per query and shared by every source.
 
-        Returns:
-            A CatalogResponse containing aggregated results.
+        JSON-mode so the document is always serializable, without the downstream token: it is a
+        credential for the sources, not an attribute for policies.
         """
-        query_id = uuid.uuid4()
-        logger.info(f"Processing query {query_id}: '{intent}'", user=user_context.user_id)
+        subject: Dict[str, Any] = user_context.model_dump(mode="json", exclude={"downstream_token"})
+        return subject
 
-        # 1. Semantic Discovery
+    def _build_policy_input(self, source: SourceManifest, subject: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Construct the OPA input document for a source.
+
+        Subject: the shared `_policy_subject` document
+        Object: source attributes
+        Action: "QUERY"
+        """
+        return {
+            "subject": subject,
+            "object": self._policy_object(source),
+            "action": "QUERY",
+        }
+
+    async def _get_or_embed(self, intent: str) -> npt.NDArray[np.float32]:
+        """
+        Return the embedding of `intent`, reusing it for repeated intents.
+
+        Checks the LRU cache first, then joins an in-flight embedding of the same intent
+        (single-flight), and only then calls the embedding service. Failures are not cached.
+        """
+        cached = self._embedding_cache.get(intent)
+        if cached is not None:
+            self._embedding_cache.move_to_end(intent)
+            return cached
+
+        task = self._inflight_embeddings.get(intent)
+        if task is None:
+            task = asyncio.ensure_future(self._embed_and_cache(intent))
+            self._inflight_embeddings[intent] = task
+            task.add_done_callback(lambda t: self._finish_inflight_embedding(intent, t))
+        # Shielded so one cancelled caller does not cancel the embedding the others are waiting on.
+        return await asyncio.shield(task)
+
+    def _finish_inflight_embedding(self, intent: str, task: "asyncio.Future[npt.NDArray[np.float32]]") -> None:
+        """Forget a finished single-flight embedding (its waiters already hold the outcome)."""
+        self._inflight_embeddings.pop(intent, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every waiter was cancelled.
+
+    async def _embed_and_cache(self, intent: str) -> npt.NDArray[np.float32]:
+        """Embed `intent` and store the result in the LRU cache."""
+        embedding = np.asarray(await self.embedding_service.embed_text_async(intent), dtype=np.float32)
+        # Shared between queries, so guard against in-place modification.
+        embedding.setflags(write=False)
+        if self._embedding_cache_size > 0:
+            self._embedding_cache[intent] = embedding
+            if len(self._embedding_cache) > self._embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+
+    def _discover(self, intent_embedding: npt.NDArray[np.float32], limit: int) -> List[SourceManifest]:
+        """Find candidate sources, reusing the results of a semantically equivalent recent query."""
+        cache = self.semantic_cache
+        if cache is None:
+            return self.vector_store.search(intent_embedding, limit=limit)
+
+        generation = self.vector_store.current_generation()
+        cached = cache.lookup(intent_embedding, limit, generation)
+        if cached is not None:
+            return cached
+        candidates = self.vector_store.search(intent_embedding, limit=limit)
+        cache.store(intent_embedding, limit, generation, candidates)
+        return candidates
+
+    def policy_cache_info(self) -> DecisionCacheInfo:
+        """Report the policy engine's decision cache hits, misses, maximum size and current size."""
+        return self.policy_engine.cache_info()
+
+    def invalidate_policy_cache(self) -> None:
+        """
+        Drop every memoized policy decision, e.g. after policies or group memberships changed.
+
+        Decisions are memoized only by the policy engine, keyed by the policy and the whole input
+        document (subject included), so clearing its cache invalidates every cached decision.
+        """
+        self.policy_engine.cache_clear()
+
+    def _circuit_open(self, urn: str) -> bool:
+        """
+        True while the source's circuit is open.
+
+        Once the cooldown expires, the first caller claims a single trial dispatch (half-open) and
+        every other caller still sees the circuit open until the trial's outcome is recorded. The
+        check and the claim run without an await in between, so concurrent queries on the event
+        loop cannot both claim it.
+        """
+        state = self._breaker.get(urn)
+        if state is None or state[0] < self._breaker_threshold:
+            return False
+        if state[1] > time.monotonic():
+            return True
+        self._breaker[urn] = (state[0], float("inf"))
+        return False
+
+    def _release_trial(self, urn: str) -> None:
+        """Give up a claimed trial without an outcome (e.g. cancelled), so the next caller can try again."""
+        state = self._breaker.get(urn)
+        if state is not None and state[1] == float("inf"):
+            self._breaker[urn] = (state[0], 0.0)
+
+    def _record_dispatch(self, urn: str, ok: bool) -> None:
+        """Reset the source's failure count on success; open its circuit after too many consecutive failures."""
+        if ok or self._breaker_threshold <= 0:
+            self._breaker.pop(urn, None)
+            return
+        failures = self._breaker.get(urn, (0, 0.0))[0] + 1
+        open_until = 0.0
+        if failures >= self._breaker_threshold:
+            # Also covers a failed half-open trial, which reopens the circuit for another cooldown.
+            open_until = time.monotonic() + self._breaker_cooldown
+            logger.warning(f"Circuit opened for {urn} after {failures} consecutive failures.")
+        self._breaker[urn] = (failures, open_until)
+
+    async def _find_candidates(self, intent: str, limit: int) -> List[SourceManifest]:
+        """
+        Semantic discovery: embed the intent and search the vector store.
+
+        Raises:
+            _DiscoveryError: If embedding or search fails; the message names the failed step.
+        """
         # Embed the intent
         try:
-            intent_embedding = self.embedding_service.embed_text(intent)
+            intent_embedding = await self._get_or_embed(intent)
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
-            # If embedding fails, we can't search. Return empty response or error.
-            # For now, let's return an empty response with no results.
-            return CatalogResponse(
-                query_id=query_id, aggregated_results=[], provenance_signature="ERROR: Embedding Failed"
-            )
+            raise _DiscoveryError("Embedding Failed") from e
 
         # Search Vector Store
         try:
-            candidates = self.vector_store.search(intent_embedding, limit=limit)
+            # Pick up other workers' writes off the event loop; the search itself is in-memory.
+            await self.vector_store.refresh_if_stale_async()
+            candidates = self._discover(intent_embedding, limit)
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
-            return CatalogResponse(
-                query_id=query_id, aggregated_results=[], provenance_signature="ERROR: Search Failed"
-            )
+            raise _DiscoveryError("Search Failed") from e
 
         logger.info(f"Found {len(candidates)} candidate sources.")
+        return candidates
 
-        # 2. Governance (Policy Filtering)
-        allowed_sources: List[SourceManifest] = []
-        for source in candidates:
-            # Check ACLs
-            if not self.policy_engine.check_access(source, user_context):
+    def _source_pipelines(
+        self, intent: str, user_context: UserContext, candidates: List[SourceManifest]
+    ) -> List[Coroutine[Any, Any, Optional[SourceResult]]]:
+        """
+        Governance and dispatch: one coroutine per ACL-allowed source.
+
+        Each coroutine checks the source's policy and, if allowed, dispatches the intent to it.
+        It returns the SourceResult, or None when the policy blocks the source.
+        """
+        # ACL checks are in-memory, so they run first and only survivors reach OPA.
+        acl_allowed: List[SourceManifest] = []
+        access = self.policy_engine.check_access_batch(candidates, user_context)
+        for source, has_access in zip(candidates, access, strict=True):
+            if not has_access:
                 logger.info(f"Source {source.urn} blocked by ACLs.")
                 continue
+            acl_allowed.append(source)
 
-            # Construct Input Context for OPA
-            # Subject: user_context
-            # Object: source attributes
-            # Action: "QUERY"
-            input_data = {
-                "subject": user_context.model_dump(),
-                "object": {
-                    "urn": source.urn,
-                    "geo": source.geo_location,
-                    "sensitivity": source.sensitivity.value,
-                    "owner": source.owner_group,
-                },
-                "action": "QUERY",
-            }
+        # Each surviving source runs its own policy-check -> dispatch pipeline, so a source starts
+        # streaming as soon as its own decision is in rather than after the slowest policy.
+        # The subject document is built once per query and shared by every OPA input of the query.
+        subject = self._policy_subject(user_context)
+        # Bound the fan-out so a broad query cannot open an unbounded number of streams.
+        semaphore = asyncio.Semaphore(self.max_parallel)
 
+        async def process_source(source: SourceManifest) -> Optional[SourceResult]:
             try:
-                # evaluate_policy uses subprocess, so it blocks.
-                # Ideally, offload to thread, but keeping simple for now.
-                is_allowed = self.policy_engine.evaluate_policy(source.access_policy, input_data)
-                if is_allowed:
-                    allowed_sources.append(source)
-                else:
-                    logger.info(f"Source {source.urn} blocked by policy.")
-                    # We might want to record blocked attempts in the future (Story B)
+                allowed = await self.policy_engine.evaluate_policy_async(
+                    source.access_policy, self._build_policy_input(source, subject), digest=source.policy_digest
+                )
             except Exception as e:
                 logger.error(f"Policy evaluation failed for {source.urn}: {e}")
                 # Fail closed: if policy fails, assume blocked.
-                continue
+                return None
+            if not allowed:
+                logger.info(f"Source {source.urn} blocked by policy.")
+                # We might want to record blocked attempts in the future (Story B)
+                return None
+
+            if self._circuit_open(source.urn):
+                # A source that keeps failing is not worth a slot or its timeout until the cooldown ends.
+                return SourceResult.model_construct(
+                    source_urn=source.urn, status="ERROR", data={"error": "Circuit open"}, latency_ms=0.0
+                )
 
-        logger.info(f"Allowed {len(allowed_sources)} sources after governance check.")
+            try:
+                async with semaphore:
+                    return await self._dispatch(source, intent)
+            except asyncio.CancelledError:
+                # A cancelled trial has no outcome; let the next request try again.
+                self._release_trial(source.urn)
+                raise
 
-        # 3. Dispatch & 4. Aggregation
-        results: List[SourceResult] = []
+        return [process_source(source) for source in acl_allowed]
 
-        if not allowed_sources:
-            return CatalogResponse(
-                query_id=query_id,
-                aggregated_results=[],
-                provenance_signature=self.provenance_service.generate_provenance(query_id, []),
+    async def _dispatch(self, source: SourceManifest, intent: str) -> SourceResult:
+        """Dispatch the intent to one allowed source, recording the outcome for its circuit breaker."""
+        start_ns = time.perf_counter_ns()
+        try:
+            data = await asyncio.wait_for(self.dispatcher.dispatch(source, intent), self.dispatch_timeout)
+            latency = (time.perf_counter_ns() - start_ns) / 1_000_000
+            self._record_dispatch(source.urn, ok=True)
+            return SourceResult.model_construct(source_urn=source.urn, status="SUCCESS", data=data, latency_ms=latency)
+        except Exception as e:
+            latency = (time.perf_counter_ns() - start_ns) / 1_000_000
+            error = f"Timed out after {self.dispatch_timeout}s" if isinstance(e, TimeoutError) else str(e)
+            logger.error(f"Query to {source.urn} failed: {error}")
+            self._record_dispatch(source.urn, ok=False)
+            return SourceResult.model_construct(
+                source_urn=source.urn,
+                status="ERROR",
+                data={"error": error},
+                latency_ms=latency,
             )
 
-        # Define an async worker for dispatching
-        async def query_source(source: SourceManifest) -> SourceResult:
-            start_time = time.time()
-            try:
-                data = await self.dispatcher.dispatch(source, intent)
-                latency = (time.time() - start_time) * 1000
-                return SourceResult(source_urn=source.urn, status="SUCCESS", data=data, latency_ms=latency)
-            except Exception as e:
-                latency = (time.time() - start_time) * 1000
-                logger.error(f"Query to {source.urn} failed: {e}")
-                return SourceResult(
-                    source_urn=source.urn,
-                    status="ERROR",
-                    data={"error": str(e)},
-                    latency_ms=latency,
-                )
+    async def dispatch_query(self, intent: str, user_context: UserContext, limit: int = 10) -> CatalogResponse:
+        """
+        Execute the Register-Discover-Govern-Stamp Loop.
+
+        1. Semantic Discovery: Find sources matching the intent.
+        2. Governance: Filter sources based on policy and user context.
+        3. Dispatch: Query each allowed source in parallel, as soon as its policy check passes.
+        4. Aggregation: Combine results and stamp with provenance.
+
+        Args:
+            intent: The user's high-level query/intent.
+            user_context: The user/agent context (Subject) for policy evaluation.
+            limit: Max number of sources to query.
 
-        # Run all queries in parallel
-        tasks = [query_source(s) for s in allowed_sources]
-        results = await asyncio.gather(*tasks)
+        Returns:
+            A CatalogResponse containing aggregated results, in discovery (relevance) order.
+        """
+        query_id = uuid.uuid4()
+        logger.info(f"Processing query {query_id}: '{intent}'", user=user_context.user_id)
+
+        # 1. Semantic Discovery
+        try:
+            candidates = await self._find_candidates(intent, limit)
+        except _DiscoveryError as e:
+            # Without candidates there is nothing to query; report which step failed.
+            return _FAILURE_RESPONSES[str(e)].model_copy(update={"query_id": query_id, "aggregated_results": []})
+
+        # 2. Governance, 3. Dispatch & 4. Aggregation
+        outcomes = await asyncio.gather(*self._source_pipelines(intent, user_context, candidates))
+        # Results and the response are built from trusted, already-typed values, so they use
+        # model_construct and skip per-field validation on the hot path.
+        results = [r for r in outcomes if r is not None]
+        logger.info(f"Allowed {len(results)} sources after governance check.")
 
         # Final Response
         # Check if any source returned an error
         has_partial_content = any(r.status == "ERROR" for r in results)
 
-        response = CatalogResponse(
+        response = CatalogResponse.model_construct(
             query_id=query_id,
-            aggregated_results=list(results),
-            provenance_signature=self.provenance_service.generate_provenance(query_id, list(results)),
+            aggregated_results=results,
+            provenance_signature=self.provenance_service.generate_provenance(query_id, results),
             partial_content=has_partial_content,
         )
 
         return response
+
+    async def dispatch_query_stream(
+        self, intent: str, user_context: UserContext, limit: int = 10
+    ) -> AsyncIterator[SourceResult]:
+        """
+        Run the same loop as `dispatch_query`, yielding each source's result as soon as it completes.
+
+        Time to first result is the fastest allowed source's latency rather than the slowest's, and
+        results are never buffered. A result with status ERROR means the response is partial.
+        Discovery failures end the stream without results (they are logged).
+        If the consumer stops early, dispatches still in flight are cancelled.
+
+        Args:
+            intent: The user's high-level query/intent.
+            user_context: The user/agent context (Subject) for policy evaluation.
+            limit: Max number of sources to query.
+
+        Yields:
+            SourceResults in completion order; policy-blocked sources are skipped.
+        """
+        logger.info(f"Processing streamed query: '{intent}'", user=user_context.user_id)
+        try:
+            candidates = await self._find_candidates(intent, limit)
+        except _DiscoveryError:
+            return
+
+        tasks = [asyncio.ensure_future(p) for p in self._source_pipelines(intent, user_context, candidates)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if result is not None:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
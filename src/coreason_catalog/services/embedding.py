@@ -1,14 +1,28 @@
-from typing import List
+import asyncio
+from typing import List, Optional, Tuple
 
+import numpy as np
+import numpy.typing as npt
 from fastembed import TextEmbedding
 
+from coreason_catalog.utils.logger import logger
+
+_Pending = Tuple[str, "asyncio.Future[npt.NDArray[np.float32]]"]
+
 
 class EmbeddingService:
     """
     Service for generating vector embeddings from text using FastEmbed.
     Default model: 'BAAI/bge-small-en-v1.5' (Dimension: 384)
+
+    Concurrent async callers are coalesced by a micro-batcher: requests are queued
+    and a background worker embeds them together once MAX_BATCH texts are pending
+    or MAX_WAIT_MS has elapsed since the first one arrived.
     """
 
+    MAX_BATCH = 32
+    MAX_WAIT_MS = 5
+
     def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5"):
         """
         Initialize the embedding model.
@@ -18,8 +32,10 @@ class EmbeddingService:
         """
         self.model = TextEmbedding(model_name=model_name)
         self._embedding_dim = 384  # Default for bge-small-en-v1.5
+        self._queue: Optional[asyncio.Queue[_Pending]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
 
-    def embed_text(self, text: str) -> List[float]:
+    def embed_text(self, text: str) -> npt.NDArray[np.float32]:
         """
         Embed a single text string.
 
@@ -27,24 +43,112 @@ class EmbeddingService:
             text: The input text.
 
         Returns:
-            A list of floats representing the embedding vector.
+            A float32 numpy array representing the embedding vector.
         """
-        # embed returns a generator of numpy arrays, we take the first one and convert to list
-        embeddings = list(self.model.embed([text]))
-        return embeddings[0].tolist()  # type: ignore[no-any-return]
+        # embed returns a generator of numpy arrays; keep the first one as-is (no list round-trip)
+        embedding = next(iter(self.model.embed([text])))
+        return np.asarray(embedding, dtype=np.float32)
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def embed_batch(self, texts: List[str]) -> List[npt.NDArray[np.float32]]:
         """
-        Embed a batch of text strings.
+        Embed a batch of text strings in one model call.
 
         Args:
             texts: A list of input texts.
 
         Returns:
-            A list of embedding vectors (lists of floats).
+            A list of float32 numpy arrays, one embedding vector per text.
+        """
+        return [np.asarray(e, dtype=np.float32) for e in self.model.embed(texts)]
+
+    def embed_texts(self, texts: List[str]) -> npt.NDArray[np.float32]:
+        """
+        Embed many texts, batched through the model, as one matrix.
+
+        Args:
+            texts: A list of input texts.
+
+        Returns:
+            A float32 array of shape (len(texts), embedding_dim), one row per text.
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return np.asarray(list(self.model.embed(texts)), dtype=np.float32)
+
+    async def start(self) -> None:
+        """Start the micro-batching worker on the running event loop."""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run_batcher(self._queue))
+
+    async def stop(self) -> None:
+        """Stop the micro-batching worker and fail any requests still queued."""
+        worker, queue = self._worker, self._queue
+        self._worker = self._queue = None
+        if worker is None or queue is None:
+            return
+
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding service stopped"))
+
+    async def embed_text_async(self, text: str) -> npt.NDArray[np.float32]:
+        """
+        Embed a single text string without blocking the event loop.
+
+        The request joins the current micro-batch. If the batcher is not running
+        the text is embedded on its own in a worker thread.
+
+        Args:
+            text: The input text.
+
+        Returns:
+            A float32 numpy array representing the embedding vector.
         """
-        embeddings = list(self.model.embed(texts))
-        return [e.tolist() for e in embeddings]
+        if self._queue is None:
+            return await asyncio.to_thread(self.embed_text, text)
+
+        future: asyncio.Future[npt.NDArray[np.float32]] = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run_batcher(self, queue: "asyncio.Queue[_Pending]") -> None:
+        """Collect queued requests into batches and embed them off the event loop."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.MAX_WAIT_MS / 1000
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(self.embed_batch, texts)
+            except Exception as e:
+                logger.error(f"Batch embedding of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings, strict=True):
+                if not future.done():
+                    future.set_result(embedding)
 
     @property
     def embedding_dim(self) -> int:
@@ -1,62 +1,207 @@
-import json
+import asyncio
+import atexit
+import concurrent.futures
+import contextlib
+import hashlib
+import os
+import re
 import shutil
+import signal
 import subprocess
 import tempfile
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 
+import httpx
+import orjson
 from coreason_identity.models import UserContext
 
-from coreason_catalog.models import SourceManifest
+from coreason_catalog.models import SourceManifest, policy_digest
 from coreason_catalog.utils.logger import logger
 
+# (policy digest, digest of the canonical JSON input document)
+DecisionKey = Tuple[bytes, bytes]
+
+
+class DecisionCacheInfo(NamedTuple):
+    """Decision cache statistics, in the shape of `functools.lru_cache().cache_info()`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+# An evaluation queued for the next server round-trip: (policy code, policy digest, input, timeout, caller's future)
+_PendingCheck = Tuple[str, bytes, Dict[str, Any], float, "asyncio.Future[bool]"]
+
+
+class PolicyCheck(NamedTuple):
+    """One evaluation for `PolicyEngine.evaluate_policy_batch_async`."""
+
+    policy_code: str
+    input_data: Dict[str, Any]
+    digest: Optional[bytes] = None
+
+
+# Policies uploaded to the OPA server are re-homed under a per-digest package so
+# sources whose policies declare the same package cannot collide.
+_SERVER_PACKAGE_ROOT = "coreason.policies"
+_SERVER_PACKAGE_PATH = _SERVER_PACKAGE_ROOT.replace(".", "/")
+_PACKAGE_DECLARATION = re.compile(r"^\s*package\s+[a-zA-Z0-9_.]+", re.MULTILINE)
+# Package name referenced by `opa eval` queries on the subprocess path.
+_PACKAGE_RE = re.compile(r"package\s+([a-zA-Z0-9_.]+)")
+
+# Short-lived policy files for `opa eval` go to tmpfs when available (Linux), else the default temp dir.
+_TEMP_DIR: Optional[str] = "/dev/shm" if Path("/dev/shm").is_dir() else None
+
+# Keep-alive connections to the OPA server, shared by sync and async callers.
+_SERVER_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+
+@lru_cache(maxsize=1)
+def _resolve_opa_path() -> Optional[str]:
+    """Find the OPA binary (memoized per process, see `PolicyEngine.refresh_opa_path`)."""
+    # Check PATH
+    path = shutil.which("opa")
+    if path:
+        return path
+
+    # Check local bin/
+    local_bin = Path("bin/opa")
+    if local_bin.exists() and local_bin.is_file():
+        return str(local_bin.resolve())
+
+    # Check /usr/local/bin explicit (sometimes shutil.which might miss if path not set)
+    usr_bin = Path("/usr/local/bin/opa")
+    if usr_bin.exists():
+        return str(usr_bin)
+
+    return None
+
 
 class PolicyEngine:
     """
     Wrapper around the Open Policy Agent (OPA) binary for evaluating Rego policies.
+
+    Policies are evaluated with `opa eval` in a subprocess by default. When
+    `start_server` succeeds, async evaluations are instead served by a long-lived
+    `opa run --server` process over a Unix domain socket. Each policy is compiled
+    by the server once, on upload, and only the input is sent per evaluation; the
+    set of compiled policies is a bounded LRU, and a policy is never unloaded while
+    an evaluation of it is in flight. Synchronous callers outside the
+    event loop are routed to the same server and connection pool.
+
+    Async evaluations requested in the same event loop iteration (e.g. one per
+    candidate source of a federated query) are coalesced into a single ad-hoc
+    OPA query, so N checks cost one round-trip instead of N.
     """
 
-    def __init__(self, opa_path: Optional[str] = None):
+    def __init__(
+        self,
+        opa_path: Optional[str] = None,
+        decision_cache_size: int = 4096,
+        policy_cache_size: int = 1024,
+        decision_ttl: Optional[float] = 300.0,
+    ):
         """
         Initialize the PolicyEngine.
 
         Args:
             opa_path: Path to the OPA binary. If None, tries to find it in PATH or local bin/.
+            decision_cache_size: Max number of memoized policy decisions (0 disables the cache).
+            policy_cache_size: Max number of compiled policies kept loaded in the OPA server.
+            decision_ttl: Seconds a memoized decision stays valid (None keeps it until evicted).
         """
-        self.opa_path = opa_path or self._find_opa()
+        self.opa_path = opa_path or _resolve_opa_path()
         if not self.opa_path:
             logger.warning("OPA binary not found. Policy evaluation will fail.")
 
-    def _find_opa(self) -> Optional[str]:
-        """Find the OPA binary."""
-        # Check PATH
-        path = shutil.which("opa")
-        if path:
-            return path
+        self._decision_cache: OrderedDict[DecisionKey, Tuple[bool, float]] = OrderedDict()
+        self._decision_cache_size = decision_cache_size
+        self._decision_ttl = decision_ttl
+        self._decision_lock = Lock()
+        self._decision_hits = 0
+        self._decision_misses = 0
+        self._decision_generation = 0  # bumped by cache_clear
+
+        self._server_process: Optional[asyncio.subprocess.Process] = None
+        self._server_client: Optional[httpx.AsyncClient] = None
+        self._server_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server_dir: Optional[str] = None
+        self._uploaded_policies: OrderedDict[str, None] = OrderedDict()
+        self._policy_pins: Dict[str, int] = {}  # policy id -> evaluations in flight
+        self._policy_cache_size = max(1, policy_cache_size)
+        self._pending_checks: List[_PendingCheck] = []
+        self._batch_tasks: Set["asyncio.Task[None]"] = set()
+
+    @staticmethod
+    def refresh_opa_path() -> None:
+        """
+        Forget the memoized OPA binary location.
 
-        # Check local bin/
-        local_bin = Path("bin/opa")
-        if local_bin.exists() and local_bin.is_file():
-            return str(local_bin.resolve())
+        The next engine created without an explicit `opa_path` looks the binary up
+        again; existing engines keep their path.
+        """
+        _resolve_opa_path.cache_clear()
 
-        # Check /usr/local/bin explicit (sometimes shutil.which might miss if path not set)
-        usr_bin = Path("/usr/local/bin/opa")
-        if usr_bin.exists():
-            return str(usr_bin)
+    @staticmethod
+    def _decision_key(digest: bytes, input_data: Dict[str, Any]) -> Optional[DecisionKey]:
+        """
+        Build the decision cache key for an input document.
 
-        return None
+        Evaluation is a pure function of the policy and the input, so the key pairs the
+        policy fingerprint with a digest of the input serialized as canonical
+        (key-sorted) JSON. Inputs that cannot be serialized are not cacheable.
+        """
+        try:
+            canonical = orjson.dumps(input_data, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return None
+        return digest, hashlib.blake2b(canonical, digest_size=16).digest()
+
+    def cache_info(self) -> DecisionCacheInfo:
+        """Report decision cache hits, misses, maximum size and current size."""
+        with self._decision_lock:
+            return DecisionCacheInfo(
+                self._decision_hits, self._decision_misses, self._decision_cache_size, len(self._decision_cache)
+            )
+
+    def cache_clear(self) -> None:
+        """
+        Drop every memoized decision and reset the statistics.
 
-    def evaluate_policy(self, policy_code: str, input_data: Dict[str, Any], timeout: float = 5.0) -> bool:
+        Evaluations already in flight do not memoize their (possibly stale) decisions.
+        """
+        with self._decision_lock:
+            self._decision_generation += 1
+            self._decision_cache.clear()
+            self._decision_hits = self._decision_misses = 0
+
+    def evaluate_policy(
+        self,
+        policy_code: str,
+        input_data: Dict[str, Any],
+        timeout: float = 5.0,
+        digest: Optional[bytes] = None,
+    ) -> bool:
         """
         Evaluate a Rego policy against input data.
 
         Assumes the policy defines a rule `allow`.
         If the policy does not contain a package declaration, `package match` is prepended.
+        Decisions are memoized per (policy, input) in a bounded LRU cache with a TTL, so
+        repeating an identical check skips the OPA round-trip.
 
         Args:
             policy_code: The Rego policy string.
             input_data: The input data dictionary.
             timeout: Timeout in seconds for the OPA process.
+            digest: Precomputed `policy_digest(policy_code)` (e.g. `SourceManifest.policy_digest`).
 
         Returns:
             True if the policy evaluates to True, False otherwise.
@@ -72,49 +217,479 @@ class PolicyEngine:
             logger.error("Empty policy code provided.")
             return False
 
+        digest = digest or policy_digest(policy_code)
+        key = self._decision_key(digest, input_data) if self._decision_cache_size else None
+        generation = self._decision_generation
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+
+        decision = self._evaluate_via_server(policy_code, digest, input_data, timeout)
+        if decision is None:
+            decision = self._run_opa(self.opa_path, policy_code, input_data, timeout)
+        self._store_decision(key, decision, generation)
+        return decision
+
+    def _evaluate_via_server(
+        self, policy_code: str, digest: bytes, input_data: Dict[str, Any], timeout: float
+    ) -> Optional[bool]:
+        """
+        Evaluate on the OPA server from a synchronous caller, if possible.
+
+        The request is scheduled on the server's event loop and awaited from this thread.
+        Returns None when the server is not running, or when called on the server's own
+        loop (which must not block), so the caller falls back to the subprocess path.
+        """
+        client, loop = self._server_client, self._server_loop
+        if client is None or loop is None or loop.is_closed():
+            return None
+        try:
+            if asyncio.get_running_loop() is loop:
+                return None
+        except RuntimeError:
+            pass
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._evaluate_on_server(client, policy_code, digest, input_data, timeout), loop
+        )
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError as e:
+            future.cancel()
+            logger.error(f"OPA server evaluation timed out after {timeout} seconds")
+            raise RuntimeError(f"OPA execution timed out after {timeout} seconds") from e
+
+    def _cached_decision(self, key: Optional[DecisionKey]) -> Optional[bool]:
+        """Return a live memoized decision, refreshing its LRU position."""
+        if key is None:
+            return None
+        with self._decision_lock:
+            entry = self._decision_cache.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._decision_cache[key]
+                entry = None
+            if entry is None:
+                self._decision_misses += 1
+                return None
+            self._decision_hits += 1
+            self._decision_cache.move_to_end(key)
+            return entry[0]
+
+    def _store_decision(self, key: Optional[DecisionKey], decision: bool, generation: int) -> None:
+        """
+        Memoize a decision, evicting the least recently used entries beyond the cache size.
+
+        Skipped if the cache was cleared since the evaluation started (`generation` is stale).
+        """
+        if key is None:
+            return
+        expires = time.monotonic() + self._decision_ttl if self._decision_ttl is not None else float("inf")
+        with self._decision_lock:
+            if generation != self._decision_generation:
+                return
+            self._decision_cache[key] = (decision, expires)
+            self._decision_cache.move_to_end(key)
+            while len(self._decision_cache) > self._decision_cache_size:
+                self._decision_cache.popitem(last=False)
+
+    async def evaluate_policy_async(
+        self,
+        policy_code: str,
+        input_data: Dict[str, Any],
+        timeout: float = 5.0,
+        digest: Optional[bytes] = None,
+    ) -> bool:
+        """
+        Evaluate a Rego policy against input data without blocking the event loop.
+
+        Uses the persistent OPA server when it is running, otherwise runs
+        `evaluate_policy` in a worker thread. Decisions share the same LRU cache.
+
+        Args:
+            policy_code: The Rego policy string.
+            input_data: The input data dictionary.
+            timeout: Timeout in seconds for the OPA call.
+            digest: Precomputed `policy_digest(policy_code)` (e.g. `SourceManifest.policy_digest`).
+
+        Returns:
+            True if the policy evaluates to True, False otherwise.
+
+        Raises:
+            RuntimeError: If OPA evaluation fails, times out, or returns invalid data.
+            ValueError: If input data cannot be serialized.
+        """
+        client = self._server_client
+        if client is None:
+            return await asyncio.to_thread(self.evaluate_policy, policy_code, input_data, timeout, digest)
+
+        if not policy_code or not policy_code.strip():
+            logger.error("Empty policy code provided.")
+            return False
+
+        digest = digest or policy_digest(policy_code)
+        key = self._decision_key(digest, input_data) if self._decision_cache_size else None
+        generation = self._decision_generation
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+
+        decision = await self._evaluate_coalesced(client, policy_code, digest, input_data, timeout)
+        self._store_decision(key, decision, generation)
+        return decision
+
+    async def evaluate_policy_batch_async(self, checks: Sequence[PolicyCheck], timeout: float = 5.0) -> List[bool]:
+        """
+        Evaluate several policies concurrently.
+
+        On the OPA server the uncached checks share one round-trip (see `evaluate_policy_async`);
+        otherwise each runs in its own subprocess.
+
+        Args:
+            checks: The policies and input documents to evaluate.
+            timeout: Timeout in seconds for the OPA calls.
+
+        Returns:
+            One decision per check, in order.
+
+        Raises:
+            RuntimeError: If any evaluation fails, times out, or returns invalid data.
+            ValueError: If any input data cannot be serialized.
+        """
+        decisions = await asyncio.gather(
+            *(self.evaluate_policy_async(c.policy_code, c.input_data, timeout, c.digest) for c in checks)
+        )
+        return list(decisions)
+
+    async def _evaluate_coalesced(
+        self, client: httpx.AsyncClient, policy_code: str, digest: bytes, input_data: Dict[str, Any], timeout: float
+    ) -> bool:
+        """Queue an evaluation; everything queued in this loop iteration is flushed together."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[bool] = loop.create_future()
+        if not self._pending_checks:
+            loop.call_soon(self._flush_checks, client)
+        self._pending_checks.append((policy_code, digest, input_data, timeout, future))
+        return await future
+
+    def _flush_checks(self, client: httpx.AsyncClient) -> None:
+        """Hand the queued evaluations to a background task (runs as an event loop callback)."""
+        batch, self._pending_checks = self._pending_checks, []
+        task = asyncio.ensure_future(self._resolve_checks(client, batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _resolve_checks(self, client: httpx.AsyncClient, batch: List[_PendingCheck]) -> None:
+        """Answer a flushed batch with one query, or with one request per check if that is not possible."""
+        live = [check for check in batch if not check[4].done()]  # callers may have been cancelled
+        outcomes: Optional[Sequence[Union[bool, BaseException]]] = None
+        if len(live) > 1:
+            # The shared query must not cut short the caller willing to wait longest.
+            outcomes = await self._evaluate_batch_on_server(client, live, max(check[3] for check in live))
+        if outcomes is None:
+            outcomes = await asyncio.gather(
+                *(
+                    self._evaluate_on_server(client, code, digest, data, timeout)
+                    for code, digest, data, timeout, _ in live
+                ),
+                return_exceptions=True,
+            )
+
+        for (*_, future), outcome in zip(live, outcomes, strict=True):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def _evaluate_batch_on_server(
+        self, client: httpx.AsyncClient, checks: List[_PendingCheck], timeout: float
+    ) -> Optional[List[bool]]:
+        """
+        Evaluate several checks with one ad-hoc query (`POST /v1/query`).
+
+        The inputs are sent as one array and check `i` binds `r<i>` to its policy's `allow`
+        evaluated `with input as input[i]`. Returns None when the batch cannot be answered as a
+        whole (an unserializable input, a rejected policy or query, an undefined result), so the
+        caller evaluates each check on its own and every check gets its individual outcome.
+        """
+        try:
+            async with contextlib.AsyncExitStack() as pins:
+                terms = []
+                for i, (policy_code, digest, *_) in enumerate(checks):
+                    policy_id = await pins.enter_async_context(self._pinned(client, policy_code, digest, timeout))
+                    document = f"data.{_SERVER_PACKAGE_ROOT}.{policy_id}"
+                    terms.append(f'r{i} := object.get({document}, "allow", false) with input as input[{i}]')
+                body = orjson.dumps(
+                    {"query": "; ".join(terms), "input": [check[2] for check in checks]},
+                    option=orjson.OPT_NON_STR_KEYS,
+                )
+                response = await client.post(
+                    "/v1/query", content=body, headers={"Content-Type": "application/json"}, timeout=timeout
+                )
+            if response.status_code != 200:
+                raise RuntimeError(f"OPA server query failed ({response.status_code}): {response.text}")
+            bindings = (orjson.loads(response.content).get("result") or [{}])[0]
+            values = [bindings.get(f"r{i}") for i in range(len(checks))]
+            if any(value is None for value in values):
+                raise RuntimeError("OPA server query result is undefined")
+        except Exception as e:
+            logger.warning(f"Batched evaluation of {len(checks)} policies failed, evaluating individually: {e}")
+            return None
+        return [self._as_decision(value) for value in values]
+
+    @staticmethod
+    def _as_decision(value: Any) -> bool:
+        """Interpret an `allow` value: anything but a boolean denies."""
+        if not isinstance(value, bool):
+            logger.warning(f"Policy returned non-boolean value: {value} (type: {type(value)})")
+            return False
+        return value
+
+    async def _ensure_uploaded(self, client: httpx.AsyncClient, policy_code: str, digest: bytes, timeout: float) -> str:
+        """Upload the policy under its digest on first use and return its policy id."""
+        policy_id = f"p{digest.hex()}"
+        if policy_id in self._uploaded_policies:
+            self._uploaded_policies.move_to_end(policy_id)
+            return policy_id
+
+        module = self._server_module(policy_code, policy_id)
+        response = await client.put(
+            f"/v1/policies/{policy_id}",
+            content=module,
+            headers={"Content-Type": "text/plain"},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"OPA rejected policy {policy_id}: {response.text}")
+        await self._track_upload(client, policy_id, timeout)
+        return policy_id
+
+    @contextlib.asynccontextmanager
+    async def _pinned(
+        self, client: httpx.AsyncClient, policy_code: str, digest: bytes, timeout: float
+    ) -> AsyncIterator[str]:
+        """Upload the policy if needed and keep it loaded until the caller's query is done; yields its id."""
+        policy_id = f"p{digest.hex()}"
+        self._policy_pins[policy_id] = self._policy_pins.get(policy_id, 0) + 1
+        try:
+            await self._ensure_uploaded(client, policy_code, digest, timeout)
+            yield policy_id
+        finally:
+            remaining = self._policy_pins[policy_id] - 1
+            if remaining:
+                self._policy_pins[policy_id] = remaining
+            else:
+                del self._policy_pins[policy_id]
+
+    async def _evaluate_on_server(
+        self, client: httpx.AsyncClient, policy_code: str, digest: bytes, input_data: Dict[str, Any], timeout: float
+    ) -> bool:
+        """
+        Evaluate the policy via the OPA REST API, uploading it under its digest on first use.
+
+        The policy's whole package is queried, so an undefined `allow` (a deny) can be told apart
+        from a policy the server does not have, which is uploaded again and queried once more.
+        """
+        try:
+            async with self._pinned(client, policy_code, digest, timeout) as policy_id:
+                body = orjson.dumps({"input": input_data}, option=orjson.OPT_NON_STR_KEYS)
+                document = await self._query_policy(client, policy_id, body, timeout)
+                if document is None:
+                    logger.warning(f"OPA server has no policy {policy_id}, uploading it again")
+                    self._uploaded_policies.pop(policy_id, None)
+                    await self._ensure_uploaded(client, policy_code, digest, timeout)
+                    document = await self._query_policy(client, policy_id, body, timeout)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialize input data: {e}")
+            raise ValueError(f"Invalid input data: {e}") from e
+        except httpx.HTTPError as e:
+            logger.error(f"OPA server request failed: {e}")
+            raise RuntimeError(f"OPA server request failed: {e}") from e
+
+        if document is None:
+            # Never read as a deny: that would be memoized as the policy's decision.
+            raise RuntimeError(f"OPA server result for policy {policy_id} is undefined")
+        return self._as_decision(document.get("allow", False))
+
+    @staticmethod
+    async def _query_policy(
+        client: httpx.AsyncClient, policy_id: str, body: bytes, timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """Evaluate a policy's package document; None when the server does not have the policy."""
+        response = await client.post(
+            f"/v1/data/{_SERVER_PACKAGE_PATH}/{policy_id}",
+            content=body,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            error_msg = f"OPA server evaluation failed ({response.status_code}): {response.text}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        document: Optional[Dict[str, Any]] = orjson.loads(response.content).get("result")
+        return document
+
+    async def _track_upload(self, client: httpx.AsyncClient, policy_id: str, timeout: float) -> None:
+        """
+        Record an uploaded policy, unloading the least recently used ones beyond the cache size.
+
+        Policies with evaluations in flight are skipped; if every loaded policy is in use the cache
+        temporarily exceeds its size and is trimmed by a later upload.
+        """
+        self._uploaded_policies[policy_id] = None
+        self._uploaded_policies.move_to_end(policy_id)
+        while len(self._uploaded_policies) > self._policy_cache_size:
+            evicted = next((p for p in self._uploaded_policies if p not in self._policy_pins), None)
+            if evicted is None:
+                return
+            del self._uploaded_policies[evicted]
+            try:
+                await client.delete(f"/v1/policies/{evicted}", timeout=timeout)
+            except httpx.HTTPError as e:
+                # Only costs server memory; the policy is re-uploaded if it is used again.
+                logger.warning(f"Failed to unload policy {evicted} from OPA server: {e}")
+
+    @staticmethod
+    def _server_module(policy_code: str, policy_id: str) -> str:
+        """Re-home a policy under its per-digest package for upload to the OPA server."""
+        declaration = f"package {_SERVER_PACKAGE_ROOT}.{policy_id}"
+        module, count = _PACKAGE_DECLARATION.subn(declaration, policy_code, count=1)
+        if count:
+            return module
+        return f"{declaration}\n\n{policy_code}"
+
+    async def start_server(self, startup_timeout: float = 5.0) -> bool:
+        """
+        Start a persistent OPA server listening on a private Unix domain socket.
+
+        Failure is not fatal: evaluations keep using the subprocess path.
+
+        Args:
+            startup_timeout: Seconds to wait for the server to report healthy.
+
+        Returns:
+            True if the server is running, False otherwise.
+        """
+        if self._server_client is not None:
+            return True
+        if not self.opa_path:
+            return False
+
+        server_dir = tempfile.mkdtemp(prefix="coreason-opa-")
+        socket_path = str(Path(server_dir) / "opa.sock")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.opa_path,
+                "run",
+                "--server",
+                "--addr",
+                f"unix://{socket_path}",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logger.warning(f"Could not start OPA server, using subprocess evaluation: {e}")
+            shutil.rmtree(server_dir, ignore_errors=True)
+            return False
+
+        client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=socket_path, limits=_SERVER_LIMITS), base_url="http://opa"
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + startup_timeout
+        while process.returncode is None and loop.time() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    self._server_process, self._server_client, self._server_dir = process, client, server_dir
+                    self._server_loop = loop
+                    # Safety net if the application exits without calling stop_server.
+                    atexit.register(self._kill_server_at_exit)
+                    logger.info(f"OPA server listening on {socket_path}")
+                    return True
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+
+        logger.warning("OPA server did not become healthy, using subprocess evaluation.")
+        await client.aclose()
+        await self._terminate(process)
+        shutil.rmtree(server_dir, ignore_errors=True)
+        return False
+
+    async def stop_server(self) -> None:
+        """Stop the persistent OPA server, if running."""
+        process, client, server_dir = self._server_process, self._server_client, self._server_dir
+        self._server_process = self._server_client = self._server_dir = self._server_loop = None
+        self._uploaded_policies.clear()
+        atexit.unregister(self._kill_server_at_exit)
+
+        if client is not None:
+            await client.aclose()
+        if process is not None:
+            await self._terminate(process)
+        if server_dir is not None:
+            shutil.rmtree(server_dir, ignore_errors=True)
+
+    def _kill_server_at_exit(self) -> None:
+        """Interpreter exit hook: do not leave the OPA server running as an orphan."""
+        process = self._server_process
+        if process is not None and process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(process.pid, signal.SIGTERM)
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process, timeout: float = 5.0) -> None:
+        """Terminate a child process, killing it if it does not exit in time."""
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    def _run_opa(self, opa_path: str, policy_code: str, input_data: Dict[str, Any], timeout: float) -> bool:
+        """Evaluate the policy with the OPA binary."""
+
         # normalize policy code
         final_policy = policy_code
         package_name = "match"
         if "package " not in policy_code:
             final_policy = f"package {package_name}\n\n{policy_code}"
         else:
-            import re
-
-            match = re.search(r"package\s+([a-zA-Z0-9_.]+)", policy_code)
+            match = _PACKAGE_RE.search(policy_code)
             if match:
                 package_name = match.group(1)
-            else:
-                pass
 
         query = f"data.{package_name}.allow"
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".rego", delete=False) as policy_file:
+        # The input document is piped to OPA over stdin; only the policy needs a file.
+        try:
+            input_bytes = orjson.dumps(input_data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError as e:
+            logger.error(f"Failed to serialize input data: {e}")
+            raise ValueError(f"Invalid input data: {e}") from e
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".rego", dir=_TEMP_DIR, delete=False) as policy_file:
             policy_file.write(final_policy)
             policy_path = policy_file.name
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as input_file:
-            try:
-                json.dump(input_data, input_file)
-            except (TypeError, ValueError) as e:
-                logger.error(f"Failed to serialize input data: {e}")
-                # Clean up policy file since we won't proceed
-                Path(policy_path).unlink(missing_ok=True)
-                # Cleanup handled by finally but we raise here
-                raise ValueError(f"Invalid input data: {e}") from e
-            input_path = input_file.name
-
         try:
-            cmd = [self.opa_path, "eval", "--format", "json", "-d", policy_path, "-i", input_path, query]
+            cmd = [opa_path, "eval", "--format", "json", "--stdin-input", "-d", policy_path, query]
 
-            # Run with timeout
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            # Run with timeout; output stays as bytes, which orjson parses without a decode pass.
+            result = subprocess.run(cmd, input=input_bytes, capture_output=True, timeout=timeout)
 
             if result.returncode != 0:
-                error_msg = f"OPA execution failed. CMD: {cmd}, STDERR: {result.stderr}, STDOUT: {result.stdout}"
+                stderr = result.stderr.decode(errors="replace")
+                stdout = result.stdout.decode(errors="replace")
+                error_msg = f"OPA execution failed. CMD: {cmd}, STDERR: {stderr}, STDOUT: {stdout}"
                 logger.error(error_msg)
                 raise RuntimeError(error_msg)
 
-            output = json.loads(result.stdout)
+            output = orjson.loads(result.stdout)
 
             # Check if result is defined and true
             if "result" in output and len(output["result"]) > 0:
@@ -131,7 +706,7 @@ class PolicyEngine:
         except subprocess.TimeoutExpired as e:
             logger.error(f"OPA execution timed out after {timeout} seconds")
             raise RuntimeError(f"OPA execution timed out after {timeout} seconds") from e
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse OPA output: {e}")
             raise RuntimeError(f"Failed to parse OPA output: {e}") from e
         except Exception as e:
@@ -140,8 +715,6 @@ class PolicyEngine:
         finally:
             # Cleanup
             Path(policy_path).unlink(missing_ok=True)
-            if "input_path" in locals():
-                Path(input_path).unlink(missing_ok=True)
 
     def check_access(self, asset: SourceManifest, user_context: UserContext) -> bool:
         """
@@ -160,4 +733,25 @@ class PolicyEngine:
             return True
 
         # Strict check: User must share at least one group with the asset's ACLs.
-        return bool(set(asset.acls) & set(user_context.groups))
+        # isdisjoint probes the precomputed set per group and stops at the first match.
+        return not asset.acls_set.isdisjoint(user_context.groups)
+
+    def check_access_batch(self, assets: Sequence[SourceManifest], user_context: UserContext) -> List[bool]:
+        """
+        Check ACL access for many assets at once.
+
+        Equivalent to calling `check_access` per asset, but the service-account claim and
+        the user's group set are resolved once for the whole batch.
+
+        Args:
+            assets: The source manifests to check.
+            user_context: The user context containing identity and groups.
+
+        Returns:
+            One access decision per asset, in order.
+        """
+        if user_context.claims.get("is_service_account") is True:
+            return [True] * len(assets)
+
+        groups = frozenset(user_context.groups)
+        return [not asset.acls_set.isdisjoint(groups) for asset in assets]
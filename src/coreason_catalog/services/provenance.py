@@ -1,10 +1,19 @@
-import json
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, Final, List
 from uuid import UUID
 
+import orjson
+
 from coreason_catalog.models import SourceResult
 
+# JSON-LD context shared by every provenance document. Only ever read (orjson does
+# not mutate it), so one module-level dict replaces a fresh one per response.
+_CONTEXT: Final[Dict[str, str]] = {
+    "prov": "http://www.w3.org/ns/prov#",
+    "coreason": "https://coreason.ai/provenance#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
 
 class ProvenanceService:
     """
@@ -23,18 +32,13 @@ class ProvenanceService:
         Returns:
             A JSON string representing the provenance graph.
         """
-        timestamp = datetime.now(timezone.utc).isoformat()
-
-        # Define the Context
-        context = {
-            "prov": "http://www.w3.org/ns/prov#",
-            "coreason": "https://coreason.ai/provenance#",
-            "xsd": "http://www.w3.org/2001/XMLSchema#",
-        }
+        # orjson encodes datetime and UUID natively (RFC 3339 / canonical form), so neither is
+        # stringified up front.
+        timestamp = datetime.now(timezone.utc)
 
         # The Activity (The Query Execution)
         activity_id = f"urn:coreason:activity:{query_id}"
-        activity = {
+        activity: Dict[str, Any] = {
             "@id": activity_id,
             "@type": "prov:Activity",
             "prov:endedAtTime": {
@@ -49,23 +53,20 @@ class ProvenanceService:
             "@id": response_id,
             "@type": "prov:Entity",
             "prov:wasGeneratedBy": activity_id,
-            "coreason:queryId": str(query_id),
+            "coreason:queryId": query_id,
         }
 
         # Identify used sources (Entities)
-        used_sources = []
-        for result in results:
-            if result.status == "SUCCESS":
-                used_sources.append(result.source_urn)
+        # Sorted for deterministic output
+        used_sources = sorted(r.source_urn for r in results if r.status == "SUCCESS")
 
         if used_sources:
-            # Sort for deterministic output
-            activity["prov:used"] = sorted(used_sources)
+            activity["prov:used"] = used_sources
 
         # Construct the Graph
         graph = [activity, response_entity]
 
         # Assemble the JSON-LD document
-        provenance_doc = {"@context": context, "@graph": graph}
+        provenance_doc = {"@context": _CONTEXT, "@graph": graph}
 
-        return json.dumps(provenance_doc, sort_keys=True)
+        return orjson.dumps(provenance_doc, option=orjson.OPT_SORT_KEYS).decode()
@@ -1,5 +1,7 @@
 from typing import List
 
+import numpy as np
+
 from coreason_catalog.models import SourceManifest
 from coreason_catalog.services.embedding import EmbeddingService
 from coreason_catalog.services.vector_store import VectorStore
@@ -42,15 +44,16 @@ class RegistryService:
         # or use a more complex representation as per PRD "Indexes... schema fields".
         # For now, description is the primary semantic field.
         try:
-            embedding: List[float] = self.embedding_service.embed_text(manifest.description)
+            # Convert once here; VectorStore.add_source then reuses the same float32 buffer.
+            embedding = np.asarray(self.embedding_service.embed_text(manifest.description), dtype=np.float32)
         except Exception as e:
             logger.error(f"Failed to generate embedding for source {manifest.urn}: {e}")
             raise ValueError(f"Failed to generate embedding: {e}") from e
 
         # Validate embedding dimension (fail-fast)
-        if len(embedding) != self.embedding_service.embedding_dim:
+        if embedding.shape != (self.embedding_service.embedding_dim,):
             msg = (
-                f"Generated embedding dimension {len(embedding)} "
+                f"Generated embedding dimension {embedding.size} "
                 f"does not match expected {self.embedding_service.embedding_dim}"
             )
             logger.error(msg)
@@ -63,3 +66,40 @@ class RegistryService:
         except Exception as e:
             logger.error(f"Failed to store source {manifest.urn} in vector store: {e}")
             raise RuntimeError(f"Failed to store source: {e}") from e
+
+    def register_sources(self, manifests: List[SourceManifest]) -> None:
+        """
+        Register many sources at once (e.g. a catalog import).
+
+        Descriptions are embedded in batched model calls and all manifests are
+        upserted in a single vector store commit.
+
+        Args:
+            manifests: The source manifests to register.
+
+        Raises:
+            ValueError: If embedding generation fails or returns invalid dimension.
+            RuntimeError: If storage fails.
+        """
+        if not manifests:
+            return
+        logger.info(f"Registering {len(manifests)} sources")
+
+        try:
+            embeddings = self.embedding_service.embed_texts([m.description for m in manifests])
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings for {len(manifests)} sources: {e}")
+            raise ValueError(f"Failed to generate embedding: {e}") from e
+
+        expected = (len(manifests), self.embedding_service.embedding_dim)
+        if embeddings.shape != expected:
+            msg = f"Generated embedding matrix shape {embeddings.shape} does not match expected {expected}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        try:
+            self.vector_store.add_sources_batch(manifests, embeddings)
+            logger.info(f"Successfully registered {len(manifests)} sources")
+        except Exception as e:
+            logger.error(f"Failed to store {len(manifests)} sources in vector store: {e}")
+            raise RuntimeError(f"Failed to store source: {e}") from e
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from coreason_catalog.models import SourceManifest
+from coreason_catalog.services.vector_store import EMBEDDING_DIM, Vector
+
+
+class SemanticCache:
+    """
+    Similarity cache for discovery results (SIM-LRU).
+
+    Remembers the candidate sources found for recent query embeddings. A new query
+    whose cosine similarity to a cached one reaches `threshold` reuses those
+    candidates instead of searching the vector store again.
+
+    Keys are L2-normalized and stored in one contiguous float32 matrix, so a lookup
+    is a single matrix-vector product. Entries are tied to a vector store
+    generation; when the store changes, the whole cache is dropped.
+    """
+
+    def __init__(self, max_entries: int = 1024, threshold: float = 0.97, dim: int = EMBEDDING_DIM):
+        """
+        Initialize the SemanticCache.
+
+        Args:
+            max_entries: Maximum number of cached queries; the least recently used is evicted.
+            threshold: Minimum cosine similarity for a cached query to count as a hit.
+            dim: Dimension of the query embeddings.
+
+        Raises:
+            ValueError: If `threshold` is not in (0, 1].
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._keys = np.zeros((max(max_entries, 0), dim), dtype=np.float32)
+        self._values: List[Tuple[int, List[SourceManifest]]] = []  # slot -> (limit, candidates)
+        self._lru: OrderedDict[int, None] = OrderedDict()  # slots, least recently used first
+        self._generation: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._values.clear()
+        self._lru.clear()
+
+    def lookup(self, query: Vector, limit: int, generation: int) -> Optional[List[SourceManifest]]:
+        """
+        Return cached candidates for a query similar to `query`, or None on a miss.
+
+        Args:
+            query: The query embedding.
+            limit: Number of candidates requested; an entry cached with a smaller limit is a miss.
+            generation: The vector store generation the caller is searching against.
+
+        Returns:
+            Up to `limit` cached candidates, best first, or None.
+        """
+        self._sync(generation)
+        normalized = self._normalize(query)
+        if normalized is None or not self._lru:
+            self.misses += 1
+            return None
+
+        similarities = self._keys[: len(self._values)] @ normalized
+        slot = int(np.argmax(similarities))
+        cached_limit, candidates = self._values[slot]
+        if similarities[slot] < self.threshold or cached_limit < limit:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._lru.move_to_end(slot)
+        return candidates[:limit]
+
+    def store(self, query: Vector, limit: int, generation: int, candidates: List[SourceManifest]) -> None:
+        """
+        Cache the candidates found for `query`, evicting the least recently used entry when full.
+
+        Args:
+            query: The query embedding.
+            limit: Number of candidates that was requested.
+            generation: The vector store generation the candidates were found in.
+            candidates: The search results.
+        """
+        self._sync(generation)
+        normalized = self._normalize(query)
+        if normalized is None or self.max_entries <= 0:
+            return
+
+        if len(self._values) < self.max_entries:
+            slot = len(self._values)
+            self._values.append((limit, list(candidates)))
+        else:
+            slot, _ = self._lru.popitem(last=False)
+            self._values[slot] = (limit, list(candidates))
+        self._keys[slot] = normalized
+        self._lru[slot] = None
+
+    def _sync(self, generation: int) -> None:
+        """Drop all entries if the vector store changed since they were cached."""
+        if generation != self._generation:
+            self.clear()
+            self._generation = generation
+
+    @staticmethod
+    def _normalize(query: Vector) -> Optional[npt.NDArray[np.float32]]:
+        """L2-normalize the query; a zero vector has no direction and is never cached."""
+        vector = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
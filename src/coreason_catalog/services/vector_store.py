@@ -1,23 +1,103 @@
+import asyncio
+import time
 from pathlib import Path
-from typing import List, Optional
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import lancedb
+import numpy as np
+import numpy.typing as npt
 import pyarrow as pa
 
 from coreason_catalog.models import DataSensitivity, SourceManifest
+from coreason_catalog.utils.logger import logger
+
+EMBEDDING_DIM = 384
+
+Vector = Union[List[float], npt.NDArray[np.float32]]
+Matrix = Union[List[List[float]], npt.NDArray[np.float32]]
+
+_SCHEMA = pa.schema(
+    [
+        pa.field("urn", pa.string()),
+        pa.field("name", pa.string()),
+        pa.field("description", pa.string()),
+        pa.field("vector", pa.list_(pa.float32(), EMBEDDING_DIM)),  # Assuming 384 dim from EmbeddingService
+        pa.field("endpoint_url", pa.string()),
+        pa.field("geo_location", pa.string()),
+        pa.field("sensitivity", pa.string()),
+        pa.field("owner_group", pa.string()),
+        pa.field("access_policy", pa.string()),
+    ]
+)
+
+# Columns needed to rebuild a SourceManifest; filtered searches fetch only these (no vectors).
+_MANIFEST_COLUMNS = [
+    "urn",
+    "name",
+    "description",
+    "endpoint_url",
+    "geo_location",
+    "sensitivity",
+    "owner_group",
+    "access_policy",
+]
+
+
+class _Index(NamedTuple):
+    """Immutable snapshot of the in-memory search index."""
+
+    matrix: npt.NDArray[Any]  # (N, EMBEDDING_DIM) unit rows, C-contiguous float32, or int8 when quantized
+    scales: Optional[npt.NDArray[np.float32]]  # (N,) per-row int8 scale factors, None when not quantized
+    manifests: List[SourceManifest]
+    rows: Dict[str, int]  # urn -> row in matrix
+
+
+def _as_vector(values: Vector, label: str) -> npt.NDArray[np.float32]:
+    """Convert to float32 (no copy if already float32) and validate the shape once."""
+    vector = np.asarray(values, dtype=np.float32)
+    if vector.shape != (EMBEDDING_DIM,):
+        raise ValueError(f"{label} dimension mismatch. Expected {EMBEDDING_DIM}, got {vector.size}")
+    return vector
+
+
+def _unit_rows(vectors: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    """Return an L2-normalized copy of `vectors`; zero rows stay zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _as_matrix(values: Matrix, rows: int) -> npt.NDArray[np.float32]:
+    """Convert to a C-contiguous float32 matrix and validate it holds `rows` embeddings."""
+    matrix = np.ascontiguousarray(values, dtype=np.float32)
+    if matrix.shape != (rows, EMBEDDING_DIM):
+        raise ValueError(f"Embedding matrix shape mismatch. Expected {(rows, EMBEDDING_DIM)}, got {matrix.shape}")
+    return matrix
 
 
 class VectorStore:
     """
     Wrapper around LanceDB for storing and searching source manifests.
+
+    LanceDB is the system of record. Unfiltered searches are served from an
+    in-memory mirror holding every embedding, normalized to unit length on
+    ingest, in a single contiguous float32 matrix, so a cosine query is one
+    matrix-vector product plus a partial sort.
+    Filtered searches are delegated to LanceDB.
+
+    With `quantize=True` the mirror stores int8 rows with a per-row scale
+    factor instead, using 4x less memory at a small cost in score precision.
     """
 
-    def __init__(self, uri: str = "data/lancedb"):
+    def __init__(self, uri: str = "data/lancedb", quantize: bool = False, refresh_interval: float = 1.0):
         """
         Initialize the LanceDB connection.
 
         Args:
             uri: Path to the LanceDB directory.
+            quantize: Keep the in-memory search matrix as int8 instead of float32.
+            refresh_interval: Seconds between checks for writes made by other processes
+                (e.g. other uvicorn workers) that require reloading the in-memory index.
         """
         # Ensure directory exists if it's a local path
         if not uri.startswith("s3://") and not uri.startswith("gs://"):
@@ -25,28 +105,184 @@ class VectorStore:
 
         self.db = lancedb.connect(uri)
         self.table_name = "sources"
+        self.quantize = quantize
+        self.refresh_interval = refresh_interval
+        self._write_lock = Lock()
+        self._index = self._build_index(np.empty((0, EMBEDDING_DIM), dtype=np.float32), [])
+        self._index_version: Optional[int] = None
+        self._generation = 0
+        self._next_refresh = 0.0
         self._init_table()
+        self._load_index()
 
     def _init_table(self) -> None:
         """Initialize the table schema if it doesn't exist."""
-        schema = pa.schema(
-            [
-                pa.field("urn", pa.string()),
-                pa.field("name", pa.string()),
-                pa.field("description", pa.string()),
-                pa.field("vector", pa.list_(pa.float32(), 384)),  # Assuming 384 dim from EmbeddingService
-                pa.field("endpoint_url", pa.string()),
-                pa.field("geo_location", pa.string()),
-                pa.field("sensitivity", pa.string()),
-                pa.field("owner_group", pa.string()),
-                pa.field("access_policy", pa.string()),
-            ]
+        # Opens the table when it already exists; no scan of the database's table names.
+        self._table = self.db.create_table(self.table_name, schema=_SCHEMA, exist_ok=True)
+
+    def refresh_table(self) -> None:
+        """
+        Reopen the LanceDB table handle and reload the in-memory index.
+
+        The handle is kept for the lifetime of the store; call this after the table
+        was recreated or its schema migrated underneath it.
+        """
+        with self._write_lock:
+            self._table = self.db.open_table(self.table_name)
+            self._load_index()
+
+    def _load_index(self) -> None:
+        """Populate the in-memory index from the rows already persisted in LanceDB."""
+        table = self._table
+        version = table.version
+        rows = list(table.to_arrow().to_pylist())
+
+        vectors = np.ascontiguousarray([row["vector"] for row in rows], dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        self._index = self._build_index(vectors, [self._row_to_manifest(row) for row in rows])
+        self._index_version = version
+        self._generation += 1
+
+    def current_generation(self) -> int:
+        """
+        Return a counter that changes whenever the searchable contents change.
+
+        Like a search, this first checks (rate limited) for writes made by other processes.
+        Callers caching search results can compare generations to detect staleness.
+        """
+        self._refresh_if_stale()
+        return self._generation
+
+    async def refresh_if_stale_async(self) -> None:
+        """
+        Run the check for other processes' writes in a worker thread.
+
+        The check, and the reload it may trigger, block on LanceDB. Async callers await this
+        before searching so the event loop is not stalled; the search's own check is then
+        skipped until the refresh interval elapses again.
+        """
+        if self._refresh_due():
+            await asyncio.to_thread(self._refresh)
+
+    def _refresh_if_stale(self) -> None:
+        """Reload the in-memory index if the table changed since it was loaded (checked at most every interval)."""
+        if self._refresh_due():
+            self._refresh()
+
+    def _refresh_due(self) -> bool:
+        """Claim the next check for other processes' writes, if the refresh interval has elapsed."""
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return False
+        self._next_refresh = now + self.refresh_interval
+        return True
+
+    def _refresh(self) -> None:
+        """Reload the in-memory index if the table changed since it was loaded."""
+        try:
+            # The cached handle only sees other processes' writes once moved to the latest version.
+            self._table.checkout_latest()
+            if self._table.version != self._index_version:
+                with self._write_lock:
+                    # A local write may have caught the index up while this waited for the lock.
+                    if self._table.version != self._index_version:
+                        self._load_index()
+        except Exception as e:
+            # Keep serving the current snapshot; the next check retries.
+            logger.warning(f"Failed to refresh vector index: {e}")
+
+    def _encode(self, vectors: npt.NDArray[np.float32]) -> Tuple[npt.NDArray[Any], Optional[npt.NDArray[np.float32]]]:
+        """Normalize float32 rows and encode them into the stored matrix representation (and per-row scales)."""
+        vectors = _unit_rows(vectors)
+        if not self.quantize:
+            return vectors, None
+
+        scales = (np.abs(vectors).max(axis=1, initial=0.0) / 127.0).astype(np.float32)
+        divisor = np.where(scales > 0, scales, np.float32(1.0))
+        quantized = np.rint(vectors / divisor[:, None]).astype(np.int8)
+        return quantized, scales
+
+    def _build_index(self, vectors: npt.NDArray[np.float32], manifests: List[SourceManifest]) -> _Index:
+        """Build a full index snapshot from float32 rows."""
+        matrix, scales = self._encode(vectors)
+        return _Index(
+            matrix=matrix,
+            scales=scales,
+            manifests=manifests,
+            rows={m.urn: i for i, m in enumerate(manifests)},
+        )
+
+    def _upsert_index(self, manifests: List[SourceManifest], vectors: npt.NDArray[np.float32]) -> None:
+        """Publish a new index snapshot containing `manifests` (unique URNs; caller holds the write lock)."""
+        index = self._index
+        encoded, new_scales = self._encode(vectors)
+
+        positions = [index.rows.get(m.urn) for m in manifests]
+        added = [i for i, row in enumerate(positions) if row is None]
+        updated = [i for i, row in enumerate(positions) if row is not None]
+        targets = [row for row in positions if row is not None]
+
+        # Copy-on-write so concurrent searches keep a consistent snapshot: concatenate always allocates.
+        matrix = np.concatenate((index.matrix, encoded[added]))
+        scales = (
+            None if index.scales is None or new_scales is None else np.concatenate((index.scales, new_scales[added]))
+        )
+        all_manifests = [*index.manifests, *(manifests[i] for i in added)]
+        rows = index.rows
+        if added:
+            rows = {**rows, **{manifests[i].urn: len(index.manifests) + k for k, i in enumerate(added)}}
+
+        if updated:
+            matrix[targets] = encoded[updated]
+            if scales is not None and new_scales is not None:
+                scales[targets] = new_scales[updated]
+            for i, row in zip(updated, targets, strict=True):
+                all_manifests[row] = manifests[i]
+
+        self._index = _Index(
+            matrix=matrix,
+            scales=scales,
+            manifests=all_manifests,
+            rows=rows,
+        )
+        self._generation += 1
+
+    @staticmethod
+    def _row_to_manifest(row: Dict[str, Any]) -> SourceManifest:
+        """Rebuild a SourceManifest from a stored row."""
+        return SourceManifest(
+            urn=row["urn"],
+            name=row["name"],
+            description=row["description"],
+            endpoint_url=row["endpoint_url"],
+            source_pointer=None,
+            geo_location=row["geo_location"],
+            sensitivity=DataSensitivity(row["sensitivity"]),
+            owner_group=row["owner_group"],
+            access_policy=row["access_policy"],
         )
 
-        if self.table_name not in self.db.list_tables(limit=1000).tables:
-            self.db.create_table(self.table_name, schema=schema)
+    @staticmethod
+    def _arrow_to_manifests(table: pa.Table) -> List[SourceManifest]:
+        """Rebuild SourceManifests column-wise from an Arrow result (no pandas, no per-row dicts)."""
+        columns = [table.column(name).to_pylist() for name in _MANIFEST_COLUMNS]
+        return [
+            SourceManifest(
+                urn=urn,
+                name=name,
+                description=description,
+                endpoint_url=endpoint_url,
+                source_pointer=None,
+                geo_location=geo_location,
+                sensitivity=DataSensitivity(sensitivity),
+                owner_group=owner_group,
+                access_policy=access_policy,
+            )
+            for urn, name, description, endpoint_url, geo_location, sensitivity, owner_group, access_policy in zip(
+                *columns, strict=True
+            )
+        ]
 
-    def add_source(self, manifest: SourceManifest, embedding: List[float]) -> None:
+    def add_source(self, manifest: SourceManifest, embedding: Vector) -> None:
         """
         Add or update a source manifest in the vector store.
 
@@ -57,39 +293,70 @@ class VectorStore:
         Raises:
             ValueError: If embedding dimension is incorrect.
         """
-        if len(embedding) != 384:
-            raise ValueError(f"Embedding dimension mismatch. Expected 384, got {len(embedding)}")
+        vector = _as_vector(embedding, "Embedding")
+        self.add_sources_batch([manifest], vector[None, :])
 
-        try:
-            table = self.db.open_table(self.table_name)
-
-            data = [
-                {
-                    "urn": manifest.urn,
-                    "name": manifest.name,
-                    "description": manifest.description,
-                    "vector": embedding,
-                    "endpoint_url": manifest.endpoint_url,
-                    "geo_location": manifest.geo_location,
-                    "sensitivity": manifest.sensitivity.value,
-                    "owner_group": manifest.owner_group,
-                    "access_policy": manifest.access_policy,
-                }
-            ]
-
-            # Check if exists, delete if so (simple upsert strategy)
-            # LanceDB merge/upsert is more complex, delete-insert is safer for MVP
-            table.delete(f"urn = '{manifest.urn}'")
-            table.add(data)
-        except Exception as e:
-            # Handle potential concurrent write issues or other DB errors
-            raise RuntimeError(f"Failed to add source: {e}") from e
+    def add_sources_batch(self, manifests: List[SourceManifest], embeddings: Matrix) -> None:
+        """
+        Add or update many source manifests in a single LanceDB commit.
+
+        If a URN appears more than once, the last occurrence wins.
+
+        Args:
+            manifests: The source manifests to store.
+            embeddings: One embedding per manifest, as an (N, EMBEDDING_DIM) matrix.
 
-    def search(
-        self, query_vector: List[float], limit: int = 10, filter_sql: Optional[str] = None
-    ) -> List[SourceManifest]:
+        Raises:
+            ValueError: If the embeddings do not match the manifests in number or dimension.
+            RuntimeError: If the write fails.
         """
-        Search for sources using vector similarity and SQL filtering.
+        vectors = _as_matrix(embeddings, len(manifests))
+        if not manifests:
+            return
+
+        last = {m.urn: i for i, m in enumerate(manifests)}
+        if len(last) < len(manifests):
+            keep = sorted(last.values())
+            manifests = [manifests[i] for i in keep]
+            vectors = vectors[keep]
+
+        # The matrix buffer backs the fixed-size list column directly (no per-row Python lists).
+        batch = pa.Table.from_pydict(
+            {
+                "urn": [m.urn for m in manifests],
+                "name": [m.name for m in manifests],
+                "description": [m.description for m in manifests],
+                "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), EMBEDDING_DIM),
+                "endpoint_url": [m.endpoint_url for m in manifests],
+                "geo_location": [m.geo_location for m in manifests],
+                "sensitivity": [m.sensitivity.value for m in manifests],
+                "owner_group": [m.owner_group for m in manifests],
+                "access_policy": [m.access_policy for m in manifests],
+            },
+            schema=_SCHEMA,
+        )
+
+        with self._write_lock:
+            loaded = self._index_version
+            try:
+                # Single-commit upsert keyed on urn: no window in which a row is missing.
+                self._table.merge_insert("urn").when_matched_update_all().when_not_matched_insert_all().execute(batch)
+            except Exception as e:
+                # Handle potential concurrent write issues or other DB errors
+                raise RuntimeError(f"Failed to add source: {e}") from e
+
+            # Lance commits on top of the latest version, so a gap means other processes wrote
+            # in between; their rows are not in the mirror yet, so reload everything.
+            if loaded is None or self._table.version != loaded + 1:
+                self._load_index()
+                return
+            # Mirror exactly what was persisted, so both search paths return the same manifests.
+            self._upsert_index(self._arrow_to_manifests(batch), vectors)
+            self._index_version = self._table.version
+
+    def search(self, query_vector: Vector, limit: int = 10, filter_sql: Optional[str] = None) -> List[SourceManifest]:
+        """
+        Search for sources using cosine similarity and SQL filtering.
 
         Args:
             query_vector: The query embedding.
@@ -102,37 +369,55 @@ class VectorStore:
         Raises:
             ValueError: If query vector dimension is incorrect or filter SQL is invalid.
         """
-        if len(query_vector) != 384:
-            raise ValueError(f"Query vector dimension mismatch. Expected 384, got {len(query_vector)}")
+        vector = _as_vector(query_vector, "Query vector")
+        self._refresh_if_stale()
+        if not filter_sql:
+            return self._search_index(vector, limit)
 
         try:
-            table = self.db.open_table(self.table_name)
-
-            query = table.search(query_vector).limit(limit)
-
-            if filter_sql:
-                query = query.where(filter_sql)
-
-            results = query.to_pandas()
+            query = (
+                self._table.search(vector)
+                .distance_type("cosine")
+                .select([*_MANIFEST_COLUMNS, "_distance"])
+                .limit(limit)
+                .where(filter_sql)
+            )
+            results = query.to_arrow()
         except Exception as e:
             # Catch errors related to invalid SQL or other query issues
-            if filter_sql and ("syntax" in str(e).lower() or "parser" in str(e).lower()):
+            if "syntax" in str(e).lower() or "parser" in str(e).lower():
                 raise ValueError(f"Invalid SQL filter: {e}") from e
             raise RuntimeError(f"Search failed: {e}") from e
 
-        manifests = []
-        for _, row in results.iterrows():
-            manifests.append(
-                SourceManifest(
-                    urn=row["urn"],
-                    name=row["name"],
-                    description=row["description"],
-                    endpoint_url=row["endpoint_url"],
-                    geo_location=row["geo_location"],
-                    sensitivity=DataSensitivity(row["sensitivity"]),
-                    owner_group=row["owner_group"],
-                    access_policy=row["access_policy"],
-                )
-            )
+        return self._arrow_to_manifests(results)
+
+    def _search_index(self, query: npt.NDArray[np.float32], limit: int) -> List[SourceManifest]:
+        """Brute-force top-k cosine search over the in-memory matrix."""
+        index = self._index
+        n = len(index.manifests)
+        k = min(limit, n)
+        if k <= 0:
+            return []
+
+        # Rows are unit length, so the dot product ranks by cosine similarity; the query's own
+        # norm scales every score equally and cannot change the order, so it is never computed.
+        scores = self._dot(index, query)
+
+        top = np.argpartition(scores, n - k)[n - k :] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [index.manifests[i] for i in top]
+
+    @staticmethod
+    def _dot(index: _Index, query: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        """Dot product of every stored row with the query, in float32."""
+        if index.scales is None:
+            return index.matrix @ query
+
+        query_scale = np.float32(np.abs(query).max() / 127.0)
+        if query_scale == 0:
+            return np.zeros(len(index.manifests), dtype=np.float32)
 
-        return manifests
+        # Integer dot with int32 accumulation (no int8 BLAS), then undo both scale factors.
+        query_i32 = np.rint(query / query_scale).astype(np.int32)
+        dots = np.einsum("ij,j->i", index.matrix, query_i32)
+        return dots.astype(np.float32) * index.scales * query_scale  # type: ignore[no-any-return]
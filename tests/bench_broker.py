@@ -0,0 +1,113 @@
+"""
+Micro-benchmark for FederationBroker.dispatch_query.
+
+Not collected by pytest. The collaborators are plain stand-ins rather than MagicMocks, whose
+per-call bookkeeping would otherwise dominate the broker's own CPU cost. Run with:
+
+    PYTHONPATH=src python tests/bench_broker.py --sources 20 --iterations 2000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, List, Optional, cast
+
+import numpy as np
+import numpy.typing as npt
+from coreason_identity.models import UserContext
+
+from coreason_catalog.models import DataSensitivity, SourceManifest
+from coreason_catalog.services.broker import FederationBroker, QueryDispatcher
+from coreason_catalog.services.embedding import EmbeddingService
+from coreason_catalog.services.policy_engine import PolicyEngine
+from coreason_catalog.services.provenance import ProvenanceService
+from coreason_catalog.services.vector_store import VectorStore
+
+
+class FakeEmbeddingService:
+    def __init__(self) -> None:
+        self._vector = np.full(384, 0.1, dtype=np.float32)
+
+    async def embed_text_async(self, text: str) -> npt.NDArray[np.float32]:
+        return self._vector
+
+
+class FakeVectorStore:
+    def __init__(self, manifests: List[SourceManifest]) -> None:
+        self._manifests = manifests
+
+    def current_generation(self) -> int:
+        return 0
+
+    async def refresh_if_stale_async(self) -> None:
+        return None
+
+    def search(self, query_vector: Any, limit: int = 10, **kwargs: Any) -> List[SourceManifest]:
+        return self._manifests[:limit]
+
+
+class FakePolicyEngine:
+    def check_access_batch(self, assets: List[SourceManifest], user_context: UserContext) -> List[bool]:
+        return [True] * len(assets)
+
+    async def evaluate_policy_async(
+        self, policy_code: str, input_data: dict[str, Any], timeout: float = 5.0, digest: Optional[bytes] = None
+    ) -> bool:
+        return True
+
+
+class FakeDispatcher(QueryDispatcher):
+    async def dispatch(self, source: SourceManifest, intent: str) -> Any:
+        return [{"urn": source.urn}]
+
+
+def build_broker(sources: int) -> FederationBroker:
+    manifests = [
+        SourceManifest(
+            urn=f"urn:bench:{i}",
+            name=f"Source {i}",
+            description="Benchmark source",
+            endpoint_url="sse://localhost",
+            geo_location="US",
+            sensitivity=DataSensitivity.PUBLIC,
+            owner_group="bench",
+            access_policy="allow { true }",
+        )
+        for i in range(sources)
+    ]
+    return FederationBroker(
+        vector_store=cast(VectorStore, FakeVectorStore(manifests)),
+        policy_engine=cast(PolicyEngine, FakePolicyEngine()),
+        embedding_service=cast(EmbeddingService, FakeEmbeddingService()),
+        dispatcher=FakeDispatcher(),
+        provenance_service=ProvenanceService(),
+    )
+
+
+async def run(sources: int, iterations: int) -> None:
+    broker = build_broker(sources)
+    user = UserContext(user_id="bench", email="bench@example.com")
+
+    # Warm up the embedding cache before timing.
+    await broker.dispatch_query("benchmark intent", user, limit=sources)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await broker.dispatch_query("benchmark intent", user, limit=sources)
+    elapsed = time.perf_counter() - start
+
+    per_query_us = elapsed / iterations * 1e6
+    print(
+        f"{sources} sources x {iterations} queries: {per_query_us:.1f} us/query, {per_query_us / sources:.1f} us/source"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=20, help="Candidates returned per query")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed queries")
+    args = parser.parse_args()
+    asyncio.run(run(args.sources, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Copyright (c) 2025 CoReason, Inc.
+#
+# This software is proprietary and dual-licensed.
+# Licensed under the Prosperity Public License 3.0 (the "License").
+# A copy of the license is available at https://prosperitylicense.com/versions/3.0.0
+# For details, see the LICENSE file.
+# Commercial use beyond a 30-day trial requires a separate license.
+#
+# Source Code: https://github.com/CoReason-AI/coreason_catalog
+
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Tuple, Union
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import orjson
+import pytest
+import pytest_asyncio
+from helpers import PostJson
+from httpx import ASGITransport, AsyncClient, Response
+
+from coreason_catalog.dependencies import get_federation_broker, get_registry_service
+from coreason_catalog.main import app
+from coreason_catalog.models import CatalogResponse
+from coreason_catalog.services.broker import FederationBroker
+from coreason_catalog.services.registry import RegistryService
+
+# The broker mock's default reply; tests only read it, and derive variants with model_copy.
+_DEFAULT_CATALOG_RESPONSE = CatalogResponse(query_id=uuid4(), aggregated_results=[], provenance_signature="sig")
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def service_internals() -> Generator[Tuple[MagicMock, MagicMock], None, None]:
+    """Patch LanceDB and FastEmbed once per module, so the app lifespan starts without real I/O."""
+    with (
+        patch("coreason_catalog.services.vector_store.lancedb.connect") as connect,
+        patch("coreason_catalog.services.embedding.TextEmbedding") as embedding_model,
+    ):
+        yield connect, embedding_model
+
+
+@pytest.fixture  # type: ignore[misc]
+def mock_connect(service_internals: Tuple[MagicMock, MagicMock]) -> MagicMock:
+    """The patched `lancedb.connect`, reset for each test and opening an empty database."""
+    connect, embedding_model = service_internals
+    connect.reset_mock(return_value=True, side_effect=True)
+    embedding_model.reset_mock(return_value=True, side_effect=True)
+    return connect
+
+
+@pytest.fixture  # type: ignore[misc]
+def mock_embedding_model(service_internals: Tuple[MagicMock, MagicMock], mock_connect: MagicMock) -> MagicMock:
+    """The patched FastEmbed `TextEmbedding` class, reset for each test."""
+    return service_internals[1]
+
+
+# API fixtures for the test_main* modules. Each module opts in with
+# `pytest.mark.usefixtures("override_dependencies")` and runs its tests on one module-scoped
+# event loop, so the client below is shared by the module.
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")  # type: ignore[misc]
+async def client() -> AsyncGenerator[AsyncClient, None]:
+    """
+    An in-loop client for the application, shared by the module.
+
+    Server errors come back as 500 responses rather than re-raised exceptions, which is all
+    the error-path tests inspect.
+    """
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # Starlette assembles the middleware stack on the first request; pay for it here, once,
+        # rather than inside whichever test happens to run first.
+        await client.get("/health")
+        yield client
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def post_json(client: AsyncClient) -> PostJson:
+    """POST a payload encoded with orjson rather than the stdlib `json` module httpx uses."""
+
+    async def post(
+        url: str, payload: Union[Dict[str, Any], bytes], headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        # Pre-serialized bodies are sent as-is.
+        body = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+        return await client.post(url, content=body, headers={"Content-Type": "application/json", **(headers or {})})
+
+    return post
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def mock_registry_service() -> MagicMock:
+    # Specced, so a misspelled service method fails the test instead of silently returning a mock.
+    return MagicMock(spec=RegistryService)
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def mock_broker() -> AsyncMock:
+    return AsyncMock(spec=FederationBroker)
+
+
+@pytest.fixture  # type: ignore[misc]
+def default_catalog_response() -> CatalogResponse:
+    """The empty CatalogResponse the broker mock returns unless a test says otherwise."""
+    return _DEFAULT_CATALOG_RESPONSE
+
+
+@pytest.fixture  # type: ignore[misc]
+def override_dependencies(mock_registry_service: MagicMock, mock_broker: AsyncMock) -> Generator[None, None, None]:
+    """Route the app's registry and broker to the shared mocks, reset to their defaults."""
+    for mock in (mock_registry_service, mock_broker):
+        mock.reset_mock(return_value=True, side_effect=True)
+    mock_registry_service.register_source.return_value = None
+    mock_broker.dispatch_query.return_value = _DEFAULT_CATALOG_RESPONSE
+    app.dependency_overrides[get_registry_service] = lambda: mock_registry_service
+    app.dependency_overrides[get_federation_broker] = lambda: mock_broker
+    yield
+    app.dependency_overrides.clear()
@@ -0,0 +1,18 @@
+# Copyright (c) 2025 CoReason, Inc.
+#
+# This software is proprietary and dual-licensed.
+# Licensed under the Prosperity Public License 3.0 (the "License").
+# A copy of the license is available at https://prosperitylicense.com/versions/3.0.0
+# For details, see the LICENSE file.
+# Commercial use beyond a 30-day trial requires a separate license.
+#
+# Source Code: https://github.com/CoReason-AI/coreason_catalog
+
+"""Helpers shared by the test modules (importable because pytest puts tests/ on sys.path)."""
+
+from typing import Awaitable, Callable
+
+from httpx import Response
+
+# The `post_json` fixture from conftest.py: POST a dict or pre-serialized body to a URL.
+PostJson = Callable[..., Awaitable[Response]]
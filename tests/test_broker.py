@@ -1,6 +1,8 @@
+import asyncio
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 from coreason_identity.models import UserContext
 
@@ -8,11 +10,13 @@ from coreason_catalog.models import (
     CatalogResponse,
     DataSensitivity,
     SourceManifest,
+    policy_digest,
 )
 from coreason_catalog.services.broker import FederationBroker, QueryDispatcher
 from coreason_catalog.services.embedding import EmbeddingService
 from coreason_catalog.services.policy_engine import PolicyEngine
 from coreason_catalog.services.provenance import ProvenanceService
+from coreason_catalog.services.semantic_cache import SemanticCache
 from coreason_catalog.services.vector_store import VectorStore
 
 
@@ -29,8 +33,8 @@ def mock_policy_engine() -> MagicMock:
 @pytest.fixture  # type: ignore[misc]
 def mock_embedding_service() -> MagicMock:
     service = MagicMock(spec=EmbeddingService)
-    # Mock return of embed_text to be a list of floats
-    service.embed_text.return_value = [0.1] * 384
+    # Mock return of embed_text_async: a float32 vector, like EmbeddingService
+    service.embed_text_async.return_value = np.full(384, 0.1, dtype=np.float32)
     return service
 
 
@@ -64,7 +68,7 @@ def broker(
     )
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def sample_manifest_us() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:us_data",
@@ -78,7 +82,7 @@ def sample_manifest_us() -> SourceManifest:
     )
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def sample_manifest_eu() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:eu_data",
@@ -113,9 +117,9 @@ async def test_semantic_routing_discovery(
     mock_vector_store.search.return_value = [sample_manifest_us, sample_manifest_eu]
 
     # Policy Engine allows both (for this test case, assume user has global access)
-    mock_policy_engine.evaluate_policy.return_value = True
-    # Also mock check_access to return True
-    mock_policy_engine.check_access.return_value = True
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    # Also mock the ACL check to allow every source
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
     # Dispatcher returns data
     mock_dispatcher.dispatch.side_effect = [
@@ -133,8 +137,13 @@ async def test_semantic_routing_discovery(
     assert response.aggregated_results[1].status == "SUCCESS"
 
     # Verify calls
+    # Other workers' writes are picked up off the event loop before the in-memory search.
+    mock_vector_store.refresh_if_stale_async.assert_awaited_once()
     mock_vector_store.search.assert_called_once()
-    assert mock_policy_engine.evaluate_policy.call_count == 2
+    assert mock_policy_engine.evaluate_policy_async.call_count == 2
+    # The digest precomputed on the manifest is passed through, so nothing is re-hashed.
+    for call in mock_policy_engine.evaluate_policy_async.call_args_list:
+        assert call.kwargs["digest"] == policy_digest(call.args[0])
     assert mock_dispatcher.dispatch.call_count == 2
 
 
@@ -158,10 +167,14 @@ async def test_gdpr_firewall(
     mock_vector_store.search.return_value = [sample_manifest_us, sample_manifest_eu]
 
     # Policy:
-    # Call 1 (US Source) -> Allow
-    # Call 2 (EU Source) -> Deny
-    mock_policy_engine.evaluate_policy.side_effect = [True, False]
-    mock_policy_engine.check_access.return_value = True
+    # US Source -> Allow
+    # EU Source -> Deny
+    # (Evaluations run concurrently, so decide by URN rather than call order.)
+    def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
+        return bool(input_data["object"]["urn"] == sample_manifest_us.urn)
+
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
     mock_dispatcher.dispatch.return_value = {"data": "ok"}
 
@@ -193,8 +206,8 @@ async def test_fail_safe_aggregation(
     """
     # Setup
     mock_vector_store.search.return_value = [sample_manifest_us, sample_manifest_eu]
-    mock_policy_engine.evaluate_policy.return_value = True
-    mock_policy_engine.check_access.return_value = True
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
     # Dispatcher: US works, EU fails
     async def side_effect(source: SourceManifest, intent: str) -> Any:
@@ -236,7 +249,7 @@ async def test_no_results(broker: FederationBroker, mock_vector_store: MagicMock
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_embedding_failure(broker: FederationBroker, mock_embedding_service: MagicMock) -> None:
     """Test handling of embedding service failure."""
-    mock_embedding_service.embed_text.side_effect = Exception("Model down")
+    mock_embedding_service.embed_text_async.side_effect = Exception("Model down")
 
     response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
 
@@ -244,6 +257,128 @@ async def test_embedding_failure(broker: FederationBroker, mock_embedding_servic
     assert "Embedding Failed" in response.provenance_signature
 
 
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_intent_embeddings_are_cached(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+) -> None:
+    """Repeated intents reuse the cached embedding; the cache is LRU-bounded and skips failures."""
+    broker._embedding_cache_size = 2
+    mock_vector_store.search.return_value = []
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    for intent in ["a", "b", "a", "c", "a"]:
+        await broker.dispatch_query(intent, user)
+
+    # "b" was evicted as least recently used when "c" arrived; "a" stayed hot.
+    assert [c.args[0] for c in mock_embedding_service.embed_text_async.call_args_list] == ["a", "b", "c"]
+    assert list(broker._embedding_cache) == ["c", "a"]
+    assert not broker._embedding_cache["a"].flags.writeable
+    assert mock_vector_store.search.call_args.args[0] is broker._embedding_cache["a"]
+
+    mock_embedding_service.embed_text_async.side_effect = Exception("Model down")
+    response = await broker.dispatch_query("d", user)
+    assert "Embedding Failed" in response.provenance_signature
+    assert "d" not in broker._embedding_cache
+
+    broker._embedding_cache_size = 0
+    mock_embedding_service.embed_text_async.side_effect = None
+    await broker.dispatch_query("e", user)
+    assert "e" not in broker._embedding_cache
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_concurrent_identical_intents_share_one_embedding(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+) -> None:
+    """Concurrent queries for the same intent coalesce onto one embedding call (single-flight)."""
+    broker._embedding_cache_size = 0  # isolate coalescing from the LRU cache
+    mock_vector_store.search.return_value = []
+    user = UserContext(user_id="u1", email="test@example.com")
+    release = asyncio.Event()
+
+    async def slow_embed(text: str) -> np.ndarray:
+        await release.wait()
+        return np.full(384, 0.1, dtype=np.float32)
+
+    mock_embedding_service.embed_text_async.side_effect = slow_embed
+    queries = [asyncio.create_task(broker.dispatch_query("same", user)) for _ in range(5)]
+    other = asyncio.create_task(broker.dispatch_query("other", user))
+    await asyncio.sleep(0)
+    queries[0].cancel()  # a cancelled caller does not cancel the shared embedding
+    release.set()
+    await asyncio.gather(*queries[1:], other)
+
+    assert sorted(c.args[0] for c in mock_embedding_service.embed_text_async.call_args_list) == ["other", "same"]
+    assert broker._inflight_embeddings == {}
+
+    # Failures propagate to every waiter and are not remembered.
+    async def failing_embed(text: str) -> np.ndarray:
+        await asyncio.sleep(0)
+        raise Exception("Model down")
+
+    mock_embedding_service.embed_text_async.side_effect = failing_embed
+    responses = await asyncio.gather(*(broker.dispatch_query("same", user) for _ in range(3)))
+    assert all("Embedding Failed" in r.provenance_signature for r in responses)
+    assert mock_embedding_service.embed_text_async.call_count == 3
+    assert broker._inflight_embeddings == {}
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_semantic_cache_skips_vector_search(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    sample_manifest_us: SourceManifest,
+) -> None:
+    """Near-identical intents reuse cached candidates; policies still run for every query."""
+    broker.semantic_cache = SemanticCache(threshold=0.99)
+    mock_vector_store.current_generation.return_value = 1
+    mock_vector_store.search.return_value = [sample_manifest_us]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_dispatcher.dispatch.return_value = "data"
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    base = np.full(384, 0.1, dtype=np.float32)
+    mock_embedding_service.embed_text_async.side_effect = [base, base * 1.001 + 0.0001, -base]
+    for intent in ["find US data", "find the US data", "unrelated"]:
+        response = await broker.dispatch_query(intent, user)
+        assert [r.source_urn for r in response.aggregated_results] == [sample_manifest_us.urn]
+
+    assert mock_vector_store.search.call_count == 2
+    assert mock_policy_engine.check_access_batch.call_count == 3
+    assert (broker.semantic_cache.hits, broker.semantic_cache.misses) == (1, 2)
+
+    # A vector store write (new generation) invalidates the cached candidates.
+    mock_vector_store.current_generation.return_value = 2
+    await broker.dispatch_query("find US data", user)
+    assert mock_vector_store.search.call_count == 3
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_failure_responses_are_copied_from_templates(
+    broker: FederationBroker, mock_embedding_service: MagicMock
+) -> None:
+    """Failure responses skip validation but stay independent per query."""
+    mock_embedding_service.embed_text_async.side_effect = Exception("Model down")
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    with patch.object(CatalogResponse, "__init__", side_effect=AssertionError("validated")):
+        first = await broker.dispatch_query("q1", user)
+        second = await broker.dispatch_query("q2", user)
+
+    assert first.query_id != second.query_id
+    assert first.provenance_signature == second.provenance_signature == "ERROR: Embedding Failed"
+    first.aggregated_results.append(MagicMock())
+    assert second.aggregated_results == []
+
+
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_vector_search_failure(
     broker: FederationBroker,
@@ -251,7 +386,7 @@ async def test_vector_search_failure(
     mock_embedding_service: MagicMock,
 ) -> None:
     """Test handling of vector search failure."""
-    mock_embedding_service.embed_text.return_value = [0.1] * 384
+    mock_embedding_service.embed_text_async.return_value = np.full(384, 0.1, dtype=np.float32)
     mock_vector_store.search.side_effect = Exception("DB Down")
 
     response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
@@ -272,14 +407,114 @@ async def test_policy_engine_failure(
     If policy engine raises an exception, the source should be skipped (Fail Closed).
     """
     mock_vector_store.search.return_value = [sample_manifest_us]
-    mock_policy_engine.check_access.return_value = True
-    mock_policy_engine.evaluate_policy.side_effect = Exception("OPA Down")
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.side_effect = Exception("OPA Down")
 
     response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
 
     assert len(response.aggregated_results) == 0
 
 
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_policy_decisions_are_memoized_by_the_engine(
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+    mock_dispatcher: AsyncMock,
+    mock_provenance_service: MagicMock,
+    sample_manifest_us: SourceManifest,
+) -> None:
+    """The engine's decision cache is the only one, so invalidating it through the broker takes effect at once."""
+    engine = PolicyEngine(opa_path="/mock/opa")
+    broker = FederationBroker(
+        vector_store=mock_vector_store,
+        policy_engine=engine,
+        embedding_service=mock_embedding_service,
+        dispatcher=mock_dispatcher,
+        provenance_service=mock_provenance_service,
+    )
+    mock_vector_store.search.return_value = [sample_manifest_us]
+    mock_dispatcher.dispatch.return_value = "data"
+    service = UserContext(user_id="svc", email="svc@example.com", claims={"is_service_account": True})
+
+    with patch.object(engine, "_run_opa", return_value=True) as run_opa:
+        assert len((await broker.dispatch_query("q", service)).aggregated_results) == 1
+
+        # Served from the cache even if OPA would now deny.
+        run_opa.return_value = False
+        assert len((await broker.dispatch_query("q", service)).aggregated_results) == 1
+        assert broker.policy_cache_info() == (1, 1, 4096, 1)
+
+        broker.invalidate_policy_cache()
+        assert (await broker.dispatch_query("q", service)).aggregated_results == []
+        assert run_opa.call_count == 2
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_policy_object_documents_are_memoized(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    sample_manifest_us: SourceManifest,
+) -> None:
+    """The OPA object document is built once per manifest instance and rebuilt when it is replaced."""
+    mock_vector_store.search.return_value = [sample_manifest_us]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_dispatcher.dispatch.return_value = "data"
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    await broker.dispatch_query("q1", user)
+    await broker.dispatch_query("q2", user)
+    first, second = (c.args[1]["object"] for c in mock_policy_engine.evaluate_policy_async.call_args_list)
+    assert first is second
+    assert first == {"urn": sample_manifest_us.urn, "geo": "US", "sensitivity": "PII", "owner": "US_Team"}
+
+    moved = sample_manifest_us.model_copy(update={"geo_location": "EU"})
+    mock_vector_store.search.return_value = [moved]
+    await broker.dispatch_query("q3", user)
+    assert mock_policy_engine.evaluate_policy_async.call_args.args[1]["object"]["geo"] == "EU"
+    assert len(broker._policy_objects) == 1
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_policy_subject_is_shared_per_query(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    sample_manifest_us: SourceManifest,
+    sample_manifest_eu: SourceManifest,
+) -> None:
+    """One JSON-safe subject document per query, without the downstream token, shared by every source."""
+    mock_vector_store.search.return_value = [sample_manifest_us, sample_manifest_eu]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_dispatcher.dispatch.return_value = "data"
+    user = UserContext(user_id="u1", email="test@example.com", groups=["g1"], downstream_token="secret")
+
+    response = await broker.dispatch_query("q", user)
+
+    assert len(response.aggregated_results) == 2
+    first, second = (c.args[1]["subject"] for c in mock_policy_engine.evaluate_policy_async.call_args_list)
+    assert first is second
+    assert first["user_id"] == "u1" and first["groups"] == ["g1"]
+    assert "downstream_token" not in first
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_close_releases_dispatcher(broker: FederationBroker, mock_dispatcher: AsyncMock) -> None:
+    """Broker shutdown closes the dispatcher's pooled client; stateless dispatchers inherit a no-op close."""
+    await broker.close()
+    mock_dispatcher.close.assert_awaited_once()
+
+    class StatelessDispatcher(QueryDispatcher):
+        async def dispatch(self, source: SourceManifest, intent: str) -> Any:
+            return None
+
+    await StatelessDispatcher().close()
+
+
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_empty_intent(
     broker: FederationBroker,
@@ -291,14 +526,14 @@ async def test_empty_intent(
     """
     # Mock embedding behavior for empty string (some models might return vector, others might fail)
     # Assuming it returns a valid vector or we mock it to do so
-    mock_embedding_service.embed_text.return_value = [0.0] * 384
+    mock_embedding_service.embed_text_async.return_value = np.zeros(384, dtype=np.float32)
     mock_vector_store.search.return_value = []
 
     response = await broker.dispatch_query("", UserContext(user_id="u1", email="test@example.com"))
 
     assert isinstance(response, CatalogResponse)
     assert len(response.aggregated_results) == 0
-    mock_embedding_service.embed_text.assert_called_with("")
+    mock_embedding_service.embed_text_async.assert_called_with("")
     mock_vector_store.search.assert_called_once()
 
 
@@ -336,15 +571,15 @@ async def test_complex_federation_scenario(
     mock_vector_store.search.return_value = candidates
 
     # 2. Policy: Block EU (index 1), Allow others
-    mock_policy_engine.check_access.return_value = True
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
-    def policy_side_effect(policy: str, input_data: dict[str, Any]) -> bool:
+    def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
         obj = input_data.get("object", {})
         if obj.get("urn") == sample_manifest_eu.urn:
             return False
         return True
 
-    mock_policy_engine.evaluate_policy.side_effect = policy_side_effect
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
 
     # 3. Dispatcher behavior
     async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
@@ -394,3 +629,6 @@ async def test_complex_federation_scenario(
 
     # Verify partial_content flag (since errors occurred)
     assert response.partial_content is True
+
+    # Results are built without validation, but must still match the validated schema.
+    assert CatalogResponse.model_validate_json(response.model_dump_json()) == response
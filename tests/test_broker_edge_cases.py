@@ -1,6 +1,9 @@
-from typing import Any
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import time
+from typing import Any, List
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 from coreason_identity.models import UserContext
 
@@ -28,7 +31,7 @@ def mock_policy_engine() -> MagicMock:
 @pytest.fixture  # type: ignore[misc]
 def mock_embedding_service() -> MagicMock:
     service = MagicMock(spec=EmbeddingService)
-    service.embed_text.return_value = [0.1] * 384
+    service.embed_text_async.return_value = np.full(384, 0.1, dtype=np.float32)
     return service
 
 
@@ -61,7 +64,7 @@ def broker(
     )
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def base_manifest() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:base",
@@ -75,6 +78,12 @@ def base_manifest() -> SourceManifest:
     )
 
 
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def twenty_sources(base_manifest: SourceManifest) -> List[SourceManifest]:
+    """urn:0 .. urn:19, built once per module (manifests are frozen, tests only read them)."""
+    return [base_manifest.model_copy(update={"urn": f"urn:{i}"}) for i in range(20)]
+
+
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_all_sources_fail(
     broker: FederationBroker,
@@ -90,8 +99,8 @@ async def test_all_sources_fail(
     s1 = base_manifest.model_copy(update={"urn": "urn:1"})
     s2 = base_manifest.model_copy(update={"urn": "urn:2"})
     mock_vector_store.search.return_value = [s1, s2]
-    mock_policy_engine.evaluate_policy.return_value = True
-    mock_policy_engine.check_access.return_value = True
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
     # Dispatcher always raises exception
     mock_dispatcher.dispatch.side_effect = Exception("Down")
@@ -121,12 +130,12 @@ async def test_mixed_blocked_and_success(
     mock_vector_store.search.return_value = [s_allowed, s_blocked]
 
     # Policy Logic
-    mock_policy_engine.check_access.return_value = True
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
-    def policy_side_effect(policy: str, input_data: dict[str, Any]) -> bool:
+    def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
         return bool(input_data["object"]["urn"] == "urn:allowed")
 
-    mock_policy_engine.evaluate_policy.side_effect = policy_side_effect
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
     mock_dispatcher.dispatch.return_value = "data"
 
     response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
@@ -152,11 +161,11 @@ async def test_mixed_blocked_and_error(
     s_blocked = base_manifest.model_copy(update={"urn": "urn:blocked"})
     mock_vector_store.search.return_value = [s_allowed_fail, s_blocked]
 
-    def policy_side_effect(policy: str, input_data: dict[str, Any]) -> bool:
+    def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
         return bool(input_data["object"]["urn"] == "urn:allowed_fail")
 
-    mock_policy_engine.check_access.return_value = True
-    mock_policy_engine.evaluate_policy.side_effect = policy_side_effect
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
     mock_dispatcher.dispatch.side_effect = Exception("Fail")
 
     response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
@@ -172,17 +181,15 @@ async def test_large_scale_partial_failure(
     mock_vector_store: MagicMock,
     mock_policy_engine: MagicMock,
     mock_dispatcher: AsyncMock,
-    base_manifest: SourceManifest,
+    twenty_sources: List[SourceManifest],
 ) -> None:
     """
     Complex Scenario: 20 sources. 19 Success, 1 Fail.
     partial_content must be True.
     """
-    count = 20
-    candidates = [base_manifest.model_copy(update={"urn": f"urn:{i}"}) for i in range(count)]
-    mock_vector_store.search.return_value = candidates
-    mock_policy_engine.evaluate_policy.return_value = True
-    mock_policy_engine.check_access.return_value = True
+    mock_vector_store.search.return_value = twenty_sources
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
 
     # Dispatcher: Fail for urn:0, Success for others
     async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
@@ -203,3 +210,339 @@ async def test_large_scale_partial_failure(
     assert len(errors) == 1
     assert len(successes) == 19
     assert response.partial_content is True
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_policy_evaluations_run_concurrently(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """
+    Policy evaluations run concurrently.
+    Each evaluation waits on a 2-party barrier, which only trips if both run at once.
+    """
+    s1 = base_manifest.model_copy(update={"urn": "urn:1"})
+    s2 = base_manifest.model_copy(update={"urn": "urn:2"})
+    mock_vector_store.search.return_value = [s1, s2]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+
+    barrier = asyncio.Barrier(2)
+
+    async def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
+        await asyncio.wait_for(barrier.wait(), timeout=5)
+        return True
+
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
+    mock_dispatcher.dispatch.return_value = "data"
+
+    response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
+
+    assert sorted(r.source_urn for r in response.aggregated_results) == ["urn:1", "urn:2"]
+    assert response.partial_content is False
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_latency_uses_monotonic_clock(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """Latency is measured with perf_counter_ns, on both the success and the error path."""
+    ok = base_manifest.model_copy(update={"urn": "urn:ok"})
+    mock_vector_store.search.return_value = [ok]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    mock_dispatcher.dispatch.return_value = "data"
+
+    user = UserContext(user_id="u1", email="test@example.com")
+    with patch("coreason_catalog.services.broker.time.perf_counter_ns", side_effect=[1_000_000, 3_500_000]):
+        response = await broker.dispatch_query("query", user)
+    assert response.aggregated_results[0].latency_ms == 2.5
+
+    mock_dispatcher.dispatch.side_effect = Exception("Down")
+    with patch("coreason_catalog.services.broker.time.perf_counter_ns", side_effect=[0, 750_000]):
+        response = await broker.dispatch_query("query", user)
+    assert response.aggregated_results[0].status == "ERROR"
+    assert response.aggregated_results[0].latency_ms == 0.75
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dispatch_fan_out_is_bounded(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """At most max_parallel sources are dispatched at once, and every source still gets a result."""
+    broker.max_parallel = 3
+    mock_vector_store.search.return_value = [base_manifest.model_copy(update={"urn": f"urn:{i}"}) for i in range(10)]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+
+    in_flight = peak = 0
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if source.urn == "urn:0":
+            raise RuntimeError("Fail")
+        return "data"
+
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+
+    response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
+
+    assert peak == 3
+    assert len(response.aggregated_results) == 10
+    assert [r.status for r in response.aggregated_results].count("ERROR") == 1
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_sources_dispatch_without_waiting_for_other_policies(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """A source is dispatched as soon as its own policy passes, while slower policy checks are pending."""
+    fast = base_manifest.model_copy(update={"urn": "urn:fast"})
+    slow = base_manifest.model_copy(update={"urn": "urn:slow", "access_policy": "slow"})
+    mock_vector_store.search.return_value = [fast, slow]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+
+    fast_dispatched = asyncio.Event()
+
+    async def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
+        if policy == "slow":
+            # Only resolves once the fast source has already been dispatched.
+            await asyncio.wait_for(fast_dispatched.wait(), timeout=5)
+        return True
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        if source.urn == "urn:fast":
+            fast_dispatched.set()
+        return "data"
+
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+
+    response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
+
+    assert [r.source_urn for r in response.aggregated_results] == ["urn:fast", "urn:slow"]
+    assert response.partial_content is False
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dispatch_timeout_yields_error_result(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """With a dispatch_timeout, a hung source becomes an ERROR result instead of stalling the query."""
+    broker.dispatch_timeout = 0.01
+    hung = base_manifest.model_copy(update={"urn": "urn:hung"})
+    ok = base_manifest.model_copy(update={"urn": "urn:ok"})
+    mock_vector_store.search.return_value = [hung, ok]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        if source.urn == "urn:hung":
+            await asyncio.sleep(10)
+        return "data"
+
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+
+    response = await broker.dispatch_query("query", UserContext(user_id="u1", email="test@example.com"))
+
+    by_urn = {r.source_urn: r for r in response.aggregated_results}
+    assert by_urn["urn:hung"].status == "ERROR"
+    assert by_urn["urn:hung"].data == {"error": "Timed out after 0.01s"}
+    assert by_urn["urn:ok"].status == "SUCCESS"
+    assert response.partial_content is True
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_circuit_breaker_short_circuits_failing_source(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """After consecutive failures a source is skipped until the cooldown ends; a successful trial closes it."""
+    broker._breaker_threshold = 2
+    broker._breaker_cooldown = 0.05
+    bad = base_manifest.model_copy(update={"urn": "urn:bad"})
+    good = base_manifest.model_copy(update={"urn": "urn:good"})
+    mock_vector_store.search.return_value = [bad, good]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    healthy = {"urn:good"}
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        if source.urn not in healthy:
+            raise RuntimeError("Connection refused")
+        return "data"
+
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    for _ in range(2):
+        await broker.dispatch_query("query", user)
+    assert mock_dispatcher.dispatch.call_count == 4
+
+    # Open: the bad source is reported without being dispatched; the good one is unaffected.
+    response = await broker.dispatch_query("query", user)
+    by_urn = {r.source_urn: r for r in response.aggregated_results}
+    assert by_urn["urn:bad"].status == "ERROR"
+    assert by_urn["urn:bad"].data == {"error": "Circuit open"}
+    assert by_urn["urn:good"].status == "SUCCESS"
+    assert mock_dispatcher.dispatch.call_count == 5
+
+    # After the cooldown one trial goes through; success closes the circuit.
+    await asyncio.sleep(0.06)
+    healthy.add("urn:bad")
+    response = await broker.dispatch_query("query", user)
+    assert all(r.status == "SUCCESS" for r in response.aggregated_results)
+    assert "urn:bad" not in broker._breaker
+
+    # A threshold of 0 disables the breaker.
+    broker._breaker_threshold = 0
+    healthy.clear()
+    for _ in range(3):
+        await broker.dispatch_query("query", user)
+    assert broker._breaker == {}
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_circuit_breaker_half_open_allows_one_trial(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """After the cooldown only one of several concurrent queries reaches the failing source."""
+    broker._breaker_threshold = 1
+    bad = base_manifest.model_copy(update={"urn": "urn:bad"})
+    mock_vector_store.search.return_value = [bad]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    user = UserContext(user_id="u1", email="test@example.com")
+    release = asyncio.Event()
+
+    async def held_failure(source: SourceManifest, intent: str) -> Any:
+        await release.wait()
+        raise RuntimeError("Connection refused")
+
+    mock_dispatcher.dispatch.side_effect = held_failure
+    broker._breaker["urn:bad"] = (1, 0.0)  # open, cooldown already over
+
+    queries = [asyncio.ensure_future(broker.dispatch_query("query", user)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert mock_dispatcher.dispatch.call_count == 1
+    release.set()
+    responses = await asyncio.gather(*queries)
+    errors = sorted(r.aggregated_results[0].data["error"] for r in responses)
+    assert errors == ["Circuit open"] * 4 + ["Connection refused"]
+
+    # The failed trial reopens the circuit for another cooldown.
+    assert broker._breaker["urn:bad"][1] > time.monotonic()
+
+    # A cancelled trial is given up, so a later query can try again.
+    broker._breaker["urn:bad"] = (1, 0.0)
+    release.clear()
+    trial = asyncio.ensure_future(broker.dispatch_query("query", user))
+    await asyncio.sleep(0.01)
+    assert broker._breaker["urn:bad"][1] == float("inf")
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+    assert broker._breaker["urn:bad"] == (1, 0.0)
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dispatch_query_stream_yields_in_completion_order(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """Results stream as sources finish; blocked sources are skipped and errors arrive as they land."""
+    delays = {"urn:slow": 0.05, "urn:fail": 0.02, "urn:fast": 0.0, "urn:blocked": 0.0}
+    mock_vector_store.search.return_value = [base_manifest.model_copy(update={"urn": urn}) for urn in delays]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+
+    def policy_side_effect(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
+        return bool(input_data["object"]["urn"] != "urn:blocked")
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        await asyncio.sleep(delays[source.urn])
+        if source.urn == "urn:fail":
+            raise RuntimeError("Down")
+        return "data"
+
+    mock_policy_engine.evaluate_policy_async.side_effect = policy_side_effect
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+
+    user = UserContext(user_id="u1", email="test@example.com")
+    streamed = [(r.source_urn, r.status) async for r in broker.dispatch_query_stream("query", user)]
+    assert streamed == [("urn:fast", "SUCCESS"), ("urn:fail", "ERROR"), ("urn:slow", "SUCCESS")]
+
+    # dispatch_query returns the same results in discovery order.
+    response = await broker.dispatch_query("query", user)
+    assert [r.source_urn for r in response.aggregated_results] == ["urn:slow", "urn:fail", "urn:fast"]
+    assert response.partial_content is True
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dispatch_query_stream_early_exit_and_discovery_failure(
+    broker: FederationBroker,
+    mock_vector_store: MagicMock,
+    mock_policy_engine: MagicMock,
+    mock_dispatcher: AsyncMock,
+    base_manifest: SourceManifest,
+) -> None:
+    """Closing the stream cancels in-flight dispatches; a failed discovery yields nothing."""
+    mock_vector_store.search.return_value = [
+        base_manifest.model_copy(update={"urn": "urn:fast"}),
+        base_manifest.model_copy(update={"urn": "urn:hung"}),
+    ]
+    mock_policy_engine.check_access_batch.side_effect = lambda assets, ctx: [True] * len(assets)
+    mock_policy_engine.evaluate_policy_async.return_value = True
+    cancelled = asyncio.Event()
+
+    async def dispatch_side_effect(source: SourceManifest, intent: str) -> Any:
+        if source.urn == "urn:hung":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return "data"
+
+    mock_dispatcher.dispatch.side_effect = dispatch_side_effect
+    user = UserContext(user_id="u1", email="test@example.com")
+
+    stream = broker.dispatch_query_stream("query", user)
+    first = await anext(stream)
+    assert first.source_urn == "urn:fast"
+    await stream.aclose()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    mock_vector_store.search.side_effect = Exception("DB Down")
+    assert [r async for r in broker.dispatch_query_stream("other", user)] == []
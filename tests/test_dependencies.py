@@ -10,6 +10,10 @@
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
 from coreason_catalog.dependencies import (
     get_embedding_service,
     get_federation_broker,
@@ -19,101 +23,127 @@ from coreason_catalog.dependencies import (
     get_registry_service,
     get_vector_store,
 )
+from coreason_catalog.main import lifespan
 from coreason_catalog.services.broker import FederationBroker
 from coreason_catalog.services.embedding import EmbeddingService
 from coreason_catalog.services.policy_engine import PolicyEngine
 from coreason_catalog.services.provenance import ProvenanceService
 from coreason_catalog.services.registry import RegistryService
+from coreason_catalog.services.semantic_cache import SemanticCache
 from coreason_catalog.services.sse_dispatcher import SSEQueryDispatcher
 from coreason_catalog.services.vector_store import VectorStore
 
 
-def test_get_vector_store_singleton() -> None:
-    with patch("coreason_catalog.services.vector_store.lancedb.connect") as mock_connect:
-        # Mock the db object returned by connect
-        mock_db = MagicMock()
-        mock_connect.return_value = mock_db
-        # Mock list_tables to avoid further interaction
-        mock_db.list_tables.return_value.tables = []
+def make_request(app: FastAPI) -> Request:
+    return Request({"type": "http", "app": app})
 
-        # Clear cache first to ensure we hit the mock
-        get_vector_store.cache_clear()  # type: ignore[attr-defined]
 
-        vs1 = get_vector_store()
-        vs2 = get_vector_store()
+def test_providers_read_app_state() -> None:
+    app = FastAPI()
+    app.state.vector_store = MagicMock(spec=VectorStore)
+    app.state.embedding_service = MagicMock(spec=EmbeddingService)
+    app.state.policy_engine = MagicMock(spec=PolicyEngine)
+    app.state.provenance_service = MagicMock(spec=ProvenanceService)
+    app.state.query_dispatcher = MagicMock(spec=SSEQueryDispatcher)
 
-        assert isinstance(vs1, VectorStore)
-        assert vs1 is vs2
-        mock_connect.assert_called_once()
+    # Every request resolves the exact same instance
+    for _ in range(2):
+        request = make_request(app)
+        assert get_vector_store(request) is app.state.vector_store
+        assert get_embedding_service(request) is app.state.embedding_service
+        assert get_policy_engine(request) is app.state.policy_engine
+        assert get_provenance_service(request) is app.state.provenance_service
+        assert get_query_dispatcher(request) is app.state.query_dispatcher
 
 
-def test_get_embedding_service_singleton() -> None:
-    with patch("coreason_catalog.services.embedding.TextEmbedding") as mock_embed:
-        get_embedding_service.cache_clear()  # type: ignore[attr-defined]
+def test_lifespan_initializes_services_once(mock_connect: MagicMock, mock_embedding_model: MagicMock) -> None:
+    # Another test in this process may already have memoized a different OPA location.
+    PolicyEngine.refresh_opa_path()
+    with patch("coreason_catalog.services.policy_engine.shutil.which", return_value="/bin/opa"):
+        app = FastAPI(lifespan=lifespan)
 
-        es1 = get_embedding_service()
-        es2 = get_embedding_service()
+        with TestClient(app):
+            request = make_request(app)
+            assert isinstance(get_vector_store(request), VectorStore)
+            assert isinstance(get_embedding_service(request), EmbeddingService)
+            assert isinstance(get_policy_engine(request), PolicyEngine)
+            assert isinstance(get_provenance_service(request), ProvenanceService)
+            assert isinstance(get_query_dispatcher(request), SSEQueryDispatcher)
+            assert get_policy_engine(request).opa_path == "/bin/opa"
 
-        assert isinstance(es1, EmbeddingService)
-        assert es1 is es2
-        mock_embed.assert_called_once()
+        mock_connect.assert_called_once()
+        mock_embedding_model.assert_called_once()
+        # The owned HTTP client is released on shutdown
+        assert app.state.query_dispatcher.client.is_closed
+    PolicyEngine.refresh_opa_path()
 
 
-def test_get_policy_engine_singleton() -> None:
-    with patch("coreason_catalog.services.policy_engine.shutil.which") as mock_which:
-        mock_which.return_value = "/bin/opa"
-        get_policy_engine.cache_clear()  # type: ignore[attr-defined]
+def test_get_registry_service() -> None:
+    app = FastAPI()
+    app.state.registry_service = MagicMock(spec=RegistryService)
 
-        pe1 = get_policy_engine()
-        pe2 = get_policy_engine()
+    assert get_registry_service(make_request(app)) is app.state.registry_service
 
-        assert isinstance(pe1, PolicyEngine)
-        assert pe1 is pe2
 
+def test_get_federation_broker() -> None:
+    app = FastAPI()
+    app.state.federation_broker = MagicMock(spec=FederationBroker)
 
-def test_get_provenance_service_singleton() -> None:
-    get_provenance_service.cache_clear()  # type: ignore[attr-defined]
+    assert get_federation_broker(make_request(app)) is app.state.federation_broker
 
-    ps1 = get_provenance_service()
-    ps2 = get_provenance_service()
 
-    assert isinstance(ps1, ProvenanceService)
-    assert ps1 is ps2
+def test_lifespan_wires_composite_services(mock_connect: MagicMock) -> None:
+    app = FastAPI(lifespan=lifespan)
 
+    with TestClient(app):
+        request = make_request(app)
+        rs = get_registry_service(request)
+        fb = get_federation_broker(request)
 
-def test_get_query_dispatcher_singleton() -> None:
-    get_query_dispatcher.cache_clear()  # type: ignore[attr-defined]
+        assert isinstance(rs, RegistryService)
+        assert rs.vector_store is app.state.vector_store
+        assert rs.embedding_service is app.state.embedding_service
 
-    qd1 = get_query_dispatcher()
-    qd2 = get_query_dispatcher()
+        assert isinstance(fb, FederationBroker)
+        assert fb.vector_store is app.state.vector_store
+        assert fb.policy_engine is app.state.policy_engine
+        assert fb.embedding_service is app.state.embedding_service
+        assert fb.dispatcher is app.state.query_dispatcher
+        assert fb.provenance_service is app.state.provenance_service
 
-    assert isinstance(qd1, SSEQueryDispatcher)
-    assert qd1 is qd2
+        # Built once: every request sees the same instances
+        assert get_federation_broker(make_request(app)) is fb
+        assert get_registry_service(make_request(app)) is rs
 
 
-def test_get_registry_service() -> None:
-    mock_vs = MagicMock(spec=VectorStore)
-    mock_es = MagicMock(spec=EmbeddingService)
+def test_lifespan_semantic_cache_is_opt_in(mock_connect: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("COREASON_CATALOG_SEMANTIC_CACHE_ENABLED", raising=False)
+    app = FastAPI(lifespan=lifespan)
 
-    rs = get_registry_service(mock_vs, mock_es)
+    with TestClient(app):
+        assert get_federation_broker(make_request(app)).semantic_cache is None
 
-    assert isinstance(rs, RegistryService)
-    assert rs.vector_store is mock_vs
-    assert rs.embedding_service is mock_es
+    monkeypatch.setenv("COREASON_CATALOG_SEMANTIC_CACHE_ENABLED", "true")
+    with TestClient(app):
+        assert isinstance(get_federation_broker(make_request(app)).semantic_cache, SemanticCache)
 
 
-def test_get_federation_broker() -> None:
-    mock_vs = MagicMock(spec=VectorStore)
-    mock_pe = MagicMock(spec=PolicyEngine)
-    mock_es = MagicMock(spec=EmbeddingService)
-    mock_qd = MagicMock(spec=SSEQueryDispatcher)
-    mock_ps = MagicMock(spec=ProvenanceService)
-
-    fb = get_federation_broker(mock_vs, mock_pe, mock_es, mock_qd, mock_ps)
-
-    assert isinstance(fb, FederationBroker)
-    assert fb.vector_store is mock_vs
-    assert fb.policy_engine is mock_pe
-    assert fb.embedding_service is mock_es
-    assert fb.dispatcher is mock_qd
-    assert fb.provenance_service is mock_ps
+def test_lifespan_failed_startup_stops_started_services(mock_connect: MagicMock) -> None:
+    app = FastAPI(lifespan=lifespan)
+
+    with (
+        patch.object(PolicyEngine, "start_server", side_effect=RuntimeError("opa is broken")),
+        patch.object(PolicyEngine, "stop_server") as stop_server,
+        patch.object(EmbeddingService, "stop", autospec=True, side_effect=EmbeddingService.stop) as stop_embedding,
+        patch.object(FederationBroker, "close", autospec=True, side_effect=FederationBroker.close) as close_broker,
+    ):
+        with pytest.raises(RuntimeError, match="opa is broken"):
+            with TestClient(app):
+                pass  # pragma: no cover
+
+        # The embedding worker had started, so it is stopped; the OPA server never started.
+        stop_embedding.assert_awaited_once()
+        close_broker.assert_awaited_once()
+        stop_server.assert_not_awaited()
+    assert app.state.embedding_service._worker is None
+    assert app.state.query_dispatcher.client.is_closed
@@ -8,195 +8,233 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_catalog
 
-import concurrent.futures
-from unittest.mock import MagicMock, patch
+import threading
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+from unittest.mock import MagicMock
 
 import pytest
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
 from fastapi.testclient import TestClient
 
 from coreason_catalog.dependencies import (
-    get_embedding_service,
     get_federation_broker,
     get_registry_service,
     get_vector_store,
 )
+from coreason_catalog.main import lifespan
 from coreason_catalog.services.broker import FederationBroker
 from coreason_catalog.services.registry import RegistryService
 from coreason_catalog.services.vector_store import VectorStore
 
 
-def test_singleton_concurrency() -> None:
+def test_singleton_concurrency(mock_connect: MagicMock) -> None:
     """
-    Verify that get_vector_store returns the same instance even when called
-    concurrently from multiple threads.
+    Verify that concurrent requests all receive the single VectorStore
+    instance built at startup.
     """
-    with patch("coreason_catalog.services.vector_store.lancedb.connect") as mock_connect:
-        # Setup mock
-        mock_db = MagicMock()
-        mock_connect.return_value = mock_db
-        mock_db.list_tables.return_value.tables = []
+    app = FastAPI(lifespan=lifespan)
 
-        # Clear cache to ensure fresh start
-        get_vector_store.cache_clear()  # type: ignore[attr-defined]
+    @app.get("/test-vs")  # type: ignore[misc]
+    def check_vs(vector_store: VectorStore = Depends(get_vector_store)) -> dict[str, int]:  # noqa: B008
+        return {"id": id(vector_store)}
 
-        def get_vs_instance() -> VectorStore:
-            return get_vector_store()
+    n = 10
+    barrier = threading.Barrier(n)
+    results: List[Optional[int]] = [None] * n
 
-        # Run 10 threads trying to get the instance
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(get_vs_instance) for _ in range(10)]
-            results = [f.result() for f in futures]
+    with TestClient(app) as client:
+
+        def worker(i: int) -> None:
+            # Every thread issues its request the instant the last one is ready.
+            barrier.wait(timeout=5)
+            results[i] = client.get("/test-vs").json()["id"]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
         # Assert all results are the exact same object
-        first_instance = results[0]
-        for instance in results[1:]:
-            assert instance is first_instance
+        assert results == [id(app.state.vector_store)] * n
 
-        # Verify init was called only once
-        mock_connect.assert_called_once()
+    # The store is built by the lifespan, not lazily by the provider, so there is no
+    # first-call race to lose: init ran exactly once.
+    mock_connect.assert_called_once()
 
 
-def test_initialization_error_propagation() -> None:
+def test_initialization_error_propagation(mock_embedding_model: MagicMock) -> None:
     """
     Verify that if the underlying service raises an error during init,
-    the dependency provider propagates it.
+    application startup propagates it.
     """
-    get_embedding_service.cache_clear()  # type: ignore[attr-defined]
+    mock_embedding_model.side_effect = RuntimeError("Model download failed")
+
+    with pytest.raises(RuntimeError, match="Model download failed"):
+        with TestClient(FastAPI(lifespan=lifespan)):
+            pass  # pragma: no cover
+
+
+# Stand-in injected by test_dependency_overrides.
+_OVERRIDE_VS = MagicMock(spec=VectorStore)
 
-    with patch("coreason_catalog.services.embedding.TextEmbedding") as mock_embed:
-        mock_embed.side_effect = RuntimeError("Model download failed")
 
-        try:
-            get_embedding_service()
-        except RuntimeError as e:
-            assert str(e) == "Model download failed"
-        else:
-            pytest.fail("Should have raised RuntimeError")
+def _check_graph(
+    registry: RegistryService = Depends(get_registry_service),  # noqa: B008
+    broker: FederationBroker = Depends(get_federation_broker),  # noqa: B008
+    vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
+) -> None:
+    """Dependency signature solved directly by the fast-path tests."""
 
 
-def test_dependency_graph_resolution() -> None:
+def _check_vector_store(vector_store: VectorStore = Depends(get_vector_store)) -> None:  # noqa: B008
+    """Dependency signature solved directly by the fast-path tests."""
+
+
+async def _solve(app: FastAPI, call: Callable[..., Any]) -> Dict[str, Any]:
     """
-    Verify the 'Diamond Dependency' scenario:
-    RegistryService and FederationBroker both depend on VectorStore.
-    In a FastAPI request, they should receive the EXACT SAME VectorStore instance.
+    Resolve the dependencies of `call` against `app` without an HTTP round-trip.
+
+    Skips the ASGI stack, middleware and JSON plumbing that `TestClient` exercises, so only
+    FastAPI's dependency solver and the providers run.
     """
-    # Clear caches
-    get_vector_store.cache_clear()  # type: ignore[attr-defined]
-    get_embedding_service.cache_clear()  # type: ignore[attr-defined]
-
-    # Mock the heavyweight internals to avoid real IO
-    with (
-        patch("coreason_catalog.services.vector_store.lancedb.connect") as mock_connect,
-        patch("coreason_catalog.services.embedding.TextEmbedding"),
-    ):
-        mock_db = MagicMock()
-        mock_connect.return_value = mock_db
-        mock_db.list_tables.return_value.tables = []
-
-        app = FastAPI()
-
-        @app.get("/test-graph")  # type: ignore[misc]
-        def check_dependencies(
-            registry: RegistryService = Depends(get_registry_service),  # noqa: B008
-            broker: FederationBroker = Depends(get_federation_broker),  # noqa: B008
-            vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
-        ) -> dict[str, bool]:
-            # The core test: are the instances shared?
-
-            # 1. Registry's VS should be the same as Broker's VS
-            vs_shared_registry_broker = registry.vector_store is broker.vector_store
-
-            # 2. Registry's VS should be the same as the VS injected directly
-            vs_shared_registry_direct = registry.vector_store is vector_store
-
-            # 3. Registry's EmbeddingService should be the same as Broker's
-            es_shared = registry.embedding_service is broker.embedding_service
-
-            return {
-                "vs_shared_registry_broker": vs_shared_registry_broker,
-                "vs_shared_registry_direct": vs_shared_registry_direct,
-                "es_shared": es_shared,
+    async with AsyncExitStack() as inner, AsyncExitStack() as function:
+        request = Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "path": "/",
+                "headers": [],
+                "query_string": b"",
+                "app": app,
+                "fastapi_inner_astack": inner,
+                "fastapi_function_astack": function,
             }
+        )
+        solved = await solve_dependencies(
+            request=request,
+            dependant=get_dependant(path="/", call=call),
+            dependency_overrides_provider=app,
+            async_exit_stack=inner,
+            embed_body_fields=False,
+        )
+    assert not solved.errors
+    return solved.values
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def shared_app(
+    service_internals: Tuple[MagicMock, MagicMock],
+) -> Generator[Tuple[FastAPI, TestClient], None, None]:
+    """One app with the graph probe route, whose lifespan starts once for the dependency-graph tests."""
+    for internal in service_internals:
+        internal.reset_mock(return_value=True, side_effect=True)
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/test-graph")  # type: ignore[misc]
+    def check_dependencies(
+        registry: RegistryService = Depends(get_registry_service),  # noqa: B008
+        broker: FederationBroker = Depends(get_federation_broker),  # noqa: B008
+        vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
+    ) -> dict[str, bool]:
+        # The core test: are the instances shared?
+
+        # 1. Registry's VS should be the same as Broker's VS
+        vs_shared_registry_broker = registry.vector_store is broker.vector_store
+
+        # 2. Registry's VS should be the same as the VS injected directly
+        vs_shared_registry_direct = registry.vector_store is vector_store
 
-        client = TestClient(app)
-        response = client.get("/test-graph")
+        # 3. Registry's EmbeddingService should be the same as Broker's
+        es_shared = registry.embedding_service is broker.embedding_service
 
-        assert response.status_code == 200
-        data = response.json()
+        return {
+            "vs_shared_registry_broker": vs_shared_registry_broker,
+            "vs_shared_registry_direct": vs_shared_registry_direct,
+            "es_shared": es_shared,
+        }
 
-        assert data["vs_shared_registry_broker"] is True
-        assert data["vs_shared_registry_direct"] is True
-        assert data["es_shared"] is True
+    with TestClient(app) as client:
+        yield app, client
 
 
-def test_dependency_overrides() -> None:
+@pytest.fixture  # type: ignore[misc]
+def app_client(shared_app: Tuple[FastAPI, TestClient]) -> Generator[Tuple[FastAPI, TestClient], None, None]:
+    """The shared app and client; dependency overrides set by a test are removed afterwards."""
+    yield shared_app
+    shared_app[0].dependency_overrides.clear()
+
+
+def test_dependency_graph_resolution(app_client: Tuple[FastAPI, TestClient]) -> None:
     """
-    Verify that FastAPI's dependency override mechanism works with the
-    decorated singleton providers.
+    Verify the 'Diamond Dependency' scenario:
+    RegistryService and FederationBroker both depend on VectorStore.
+    In a FastAPI request, they should receive the EXACT SAME VectorStore instance.
     """
-    get_vector_store.cache_clear()  # type: ignore[attr-defined]
+    _, client = app_client
+    response = client.get("/test-graph")
 
-    app = FastAPI()
+    assert response.status_code == 200
+    data = response.json()
 
-    @app.get("/test-override")  # type: ignore[misc]
-    def check_override(
-        vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
-    ) -> dict[str, str]:
-        return {"urn": "original"}
+    assert data["vs_shared_registry_broker"] is True
+    assert data["vs_shared_registry_direct"] is True
+    assert data["es_shared"] is True
 
-    client = TestClient(app)
 
-    # 1. Test Original Behavior (init real/mocked original)
-    with patch("coreason_catalog.services.vector_store.lancedb.connect") as mock_connect:
-        mock_db = MagicMock()
-        mock_connect.return_value = mock_db
-        mock_db.list_tables.return_value.tables = []
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dependency_graph_fast_path(app_client: Tuple[FastAPI, TestClient]) -> None:
+    """
+    The same diamond as above, asserted on the solved dependency values directly.
+    """
+    app, _ = app_client
+    values = await _solve(app, _check_graph)
 
-        response = client.get("/test-override")
-        assert response.status_code == 200
-        assert response.json() == {"urn": "original"}
+    assert values["registry"].vector_store is values["broker"].vector_store
+    assert values["registry"].vector_store is values["vector_store"]
+    assert values["registry"].embedding_service is values["broker"].embedding_service
+    assert values["vector_store"] is app.state.vector_store
 
-    # 2. Test Override
-    mock_override_vs = MagicMock(spec=VectorStore)
 
-    app.dependency_overrides[get_vector_store] = lambda: mock_override_vs
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_dependency_overrides(app_client: Tuple[FastAPI, TestClient]) -> None:
+    """
+    Verify that FastAPI's dependency override mechanism works with the
+    app.state backed providers.
+    """
+    app, _ = app_client
 
-    @app.get("/test-override-check")  # type: ignore[misc]
-    def check_override_val(
-        vector_store: VectorStore = Depends(get_vector_store),  # noqa: B008
-    ) -> dict[str, bool]:
-        return {"is_mock": vector_store is mock_override_vs}
+    # 1. Test Original Behavior
+    values = await _solve(app, _check_vector_store)
+    assert values["vector_store"] is app.state.vector_store
 
-    response = client.get("/test-override-check")
-    assert response.status_code == 200
-    assert response.json() == {"is_mock": True}
+    # 2. Test Override
+    app.dependency_overrides[get_vector_store] = lambda: _OVERRIDE_VS
 
+    values = await _solve(app, _check_vector_store)
+    assert values["vector_store"] is _OVERRIDE_VS
 
-def test_retry_on_initialization_failure() -> None:
+
+def test_retry_on_initialization_failure(mock_connect: MagicMock) -> None:
     """
-    Verify that if singleton initialization fails, subsequent calls
-    retry initialization instead of caching the failure.
+    Verify that if service initialization fails at startup, a subsequent
+    startup retries initialization instead of reusing a broken state.
     """
-    get_vector_store.cache_clear()  # type: ignore[attr-defined]
-
-    with patch("coreason_catalog.services.vector_store.lancedb.connect") as mock_connect:
-        # First call: Fail
-        mock_connect.side_effect = RuntimeError("Temporary Connection Failure")
-
-        try:
-            get_vector_store()
-        except RuntimeError:
-            pass
-        else:
-            pytest.fail("Should have raised RuntimeError")
-
-        # Second call: Succeed
-        mock_connect.side_effect = None
-        mock_db = MagicMock()
-        mock_connect.return_value = mock_db
-        mock_db.list_tables.return_value.tables = []
-
-        vs = get_vector_store()
-        assert isinstance(vs, VectorStore)
-        assert mock_connect.call_count == 2
+    app = FastAPI(lifespan=lifespan)
+
+    # First startup: Fail
+    mock_connect.side_effect = RuntimeError("Temporary Connection Failure")
+
+    with pytest.raises(RuntimeError, match="Temporary Connection Failure"):
+        with TestClient(app):
+            pass  # pragma: no cover
+
+    # Second startup: Succeed
+    mock_connect.side_effect = None
+
+    with TestClient(app):
+        assert isinstance(app.state.vector_store, VectorStore)
+
+    assert mock_connect.call_count == 2
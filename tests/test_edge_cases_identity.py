@@ -1,4 +1,4 @@
-from typing import List
+from typing import Sequence
 
 import pytest
 from coreason_identity.models import UserContext
@@ -6,13 +6,25 @@ from coreason_identity.models import UserContext
 from coreason_catalog.models import DataSensitivity, SourceManifest
 from coreason_catalog.services.policy_engine import PolicyEngine
 
+# Built once at import; Pydantic copies it into each manifest's `acls` list.
+_LARGE_ACLS = tuple(f"group:{i}" for i in range(1000))
+
 
 class TestIdentityEdgeCases:
-    @pytest.fixture  # type: ignore[misc]
-    def policy_engine(self) -> PolicyEngine:
+    @pytest.fixture(scope="class")  # type: ignore[misc]
+    @classmethod
+    def policy_engine(cls) -> PolicyEngine:
+        # ACL checks never touch OPA or the decision cache, so one engine serves the class.
         return PolicyEngine(opa_path="mock")
 
-    def create_manifest(self, acls: List[str]) -> SourceManifest:
+    @pytest.fixture(scope="class")  # type: ignore[misc]
+    @classmethod
+    def large_acl_asset(cls) -> SourceManifest:
+        """A 1000-ACL manifest, validated once per class. Manifests are frozen, so sharing is safe."""
+        return cls.create_manifest(acls=_LARGE_ACLS)
+
+    @staticmethod
+    def create_manifest(acls: Sequence[str]) -> SourceManifest:
         return SourceManifest(
             urn="urn:test",
             name="Test",
@@ -22,7 +34,7 @@ class TestIdentityEdgeCases:
             sensitivity=DataSensitivity.INTERNAL,
             owner_group="Owner",
             access_policy="allow { true }",
-            acls=acls,
+            acls=list(acls),
         )
 
     def test_access_empty_acls_blocks_regular_user(self, policy_engine: PolicyEngine) -> None:
@@ -66,13 +78,11 @@ class TestIdentityEdgeCases:
         user_context_match = UserContext(user_id="u1", email="u1@ex.com", groups=["group:admin"])
         assert policy_engine.check_access(asset, user_context_match) is True
 
-    def test_access_large_lists(self, policy_engine: PolicyEngine) -> None:
+    def test_access_large_lists(self, policy_engine: PolicyEngine, large_acl_asset: SourceManifest) -> None:
         """
         Performance/Correctness check for large lists of groups/ACLs.
         """
-        # 1000 ACLs
-        acls = [f"group:{i}" for i in range(1000)]
-        asset = self.create_manifest(acls=acls)
+        asset = large_acl_asset  # 1000 ACLs
 
         # User has the last group
         user_context = UserContext(user_id="u1", email="u1@ex.com", groups=["group:999"])
@@ -1,3 +1,6 @@
+import asyncio
+from unittest.mock import Mock
+
 import numpy as np
 import pytest
 from pytest_mock import MockerFixture
@@ -9,24 +12,42 @@ from coreason_catalog.services.embedding import EmbeddingService
 # For unit tests, we should mock.
 
 
-@pytest.fixture  # type: ignore[misc]
-def mock_embedding_model(mocker: MockerFixture) -> object:
-    mock_model = mocker.Mock()
-
+def _mock_embed(texts: list[str]) -> object:
     # Mock return value of embed: a generator yielding numpy arrays
-    def mock_embed(texts: list[str]) -> object:
-        for _ in texts:
-            yield np.array([0.1, 0.2, 0.3])
+    for _ in texts:
+        yield np.array([0.1, 0.2, 0.3])
 
-    mock_model.embed.side_effect = mock_embed
 
-    # Patch the TextEmbedding class
-    mocker.patch("coreason_catalog.services.embedding.TextEmbedding", return_value=mock_model)
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def patched_model(module_mocker: MockerFixture) -> Mock:
+    """Patch the TextEmbedding class once per module."""
+    mock_model = module_mocker.Mock()
+    module_mocker.patch("coreason_catalog.services.embedding.TextEmbedding", return_value=mock_model)
     return mock_model
 
 
-def test_embedding_service_initialization(mock_embedding_model: MockerFixture) -> None:
-    service = EmbeddingService()
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def shared_service(patched_model: Mock) -> EmbeddingService:
+    """One EmbeddingService for the tests that do not reconfigure or start it."""
+    return EmbeddingService()
+
+
+@pytest.fixture  # type: ignore[misc]
+def mock_embedding_model(patched_model: Mock) -> Mock:
+    """The patched model, with calls and side effects reset for each test."""
+    patched_model.reset_mock(side_effect=True)
+    patched_model.embed.side_effect = _mock_embed
+    return patched_model
+
+
+@pytest.fixture  # type: ignore[misc]
+def embedding_service(shared_service: EmbeddingService, mock_embedding_model: Mock) -> EmbeddingService:
+    """The shared EmbeddingService, backed by a freshly reset model mock."""
+    return shared_service
+
+
+def test_embedding_service_initialization(embedding_service: EmbeddingService) -> None:
+    service = embedding_service
     assert service.embedding_dim == 384
     # Check that TextEmbedding was instantiated
     # import coreason_catalog.services.embedding
@@ -36,26 +57,140 @@ def test_embedding_service_initialization(mock_embedding_model: MockerFixture) -
     # But here we just verify the service was created
 
 
-def test_embed_text(mock_embedding_model: MockerFixture) -> None:
-    service = EmbeddingService()
+def test_embed_text(embedding_service: EmbeddingService) -> None:
+    service = embedding_service
     vector = service.embed_text("Hello world")
 
-    assert isinstance(vector, list)
+    assert isinstance(vector, np.ndarray)
+    assert vector.dtype == np.float32
     assert len(vector) == 3  # Based on our mock
-    assert vector == [0.1, 0.2, 0.3]
+    np.testing.assert_allclose(vector, [0.1, 0.2, 0.3], rtol=1e-6)
 
     # Verify mock call
     service.model.embed.assert_called_with(["Hello world"])
 
 
-def test_embed_batch(mock_embedding_model: MockerFixture) -> None:
-    service = EmbeddingService()
+def test_embed_batch(embedding_service: EmbeddingService) -> None:
+    service = embedding_service
     texts = ["Hello", "World"]
     vectors = service.embed_batch(texts)
 
     assert isinstance(vectors, list)
     assert len(vectors) == 2
-    assert vectors[0] == [0.1, 0.2, 0.3]
-    assert vectors[1] == [0.1, 0.2, 0.3]
+    assert all(v.dtype == np.float32 for v in vectors)
+    np.testing.assert_allclose(vectors[0], [0.1, 0.2, 0.3], rtol=1e-6)
+    np.testing.assert_allclose(vectors[1], [0.1, 0.2, 0.3], rtol=1e-6)
 
     service.model.embed.assert_called_with(texts)
+
+
+def test_embed_texts(embedding_service: EmbeddingService) -> None:
+    service = embedding_service
+    texts = ["Hello", "World"]
+    matrix = service.embed_texts(texts)
+
+    assert matrix.shape == (2, 3)
+    assert matrix.dtype == np.float32
+    np.testing.assert_allclose(matrix[1], [0.1, 0.2, 0.3], rtol=1e-6)
+    service.model.embed.assert_called_once_with(texts)
+
+    empty = service.embed_texts([])
+    assert empty.shape == (0, 384)
+    assert service.model.embed.call_count == 1
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_without_batcher(embedding_service: EmbeddingService) -> None:
+    service = embedding_service
+    vector = await service.embed_text_async("Hello world")
+
+    np.testing.assert_allclose(vector, [0.1, 0.2, 0.3], rtol=1e-6)
+    service.model.embed.assert_called_once_with(["Hello world"])
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_coalesces_concurrent_requests(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    await service.start()
+    await service.start()  # idempotent
+    try:
+        texts = [f"text {i}" for i in range(5)]
+        vectors = await asyncio.gather(*(service.embed_text_async(t) for t in texts))
+    finally:
+        await service.stop()
+
+    assert len(vectors) == 5
+    assert all(v.dtype == np.float32 for v in vectors)
+    # All five concurrent requests were served by a single model call.
+    service.model.embed.assert_called_once_with(texts)
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_respects_max_batch(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    service.MAX_BATCH = 2
+    await service.start()
+    try:
+        await asyncio.gather(*(service.embed_text_async(f"t{i}") for i in range(5)))
+    finally:
+        await service.stop()
+
+    assert all(len(call.args[0]) <= 2 for call in service.model.embed.call_args_list)
+    assert sum(len(call.args[0]) for call in service.model.embed.call_args_list) == 5
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_zero_wait_disables_coalescing(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    service.MAX_WAIT_MS = 0
+    await service.start()
+    try:
+        await asyncio.gather(*(service.embed_text_async(f"t{i}") for i in range(3)))
+    finally:
+        await service.stop()
+
+    assert service.model.embed.call_count == 3
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_batch_failure(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    service.model.embed.side_effect = RuntimeError("model crashed")
+    await service.start()
+    try:
+        results = await asyncio.gather(
+            service.embed_text_async("a"), service.embed_text_async("b"), return_exceptions=True
+        )
+    finally:
+        await service.stop()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_embed_text_async_skips_cancelled_callers(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    await service.start()
+    try:
+        # A caller that gives up before its batch is embedded does not break the worker.
+        cancelled = asyncio.create_task(service.embed_text_async("gone"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert (await service.embed_text_async("still works")).dtype == np.float32
+    finally:
+        await service.stop()
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_stop_fails_pending_requests(mock_embedding_model: Mock) -> None:
+    service = EmbeddingService()
+    await service.stop()  # not started: no-op
+
+    await service.start()
+    assert service._queue is not None
+    future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+    service._queue.put_nowait(("queued", future))
+    await service.stop()
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        await future
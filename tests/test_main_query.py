@@ -0,0 +1,161 @@
+from types import MappingProxyType
+from typing import Any, Dict, Final, Mapping
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import orjson
+import pytest
+from coreason_identity.models import UserContext
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from helpers import PostJson
+
+from coreason_catalog.api.routes import query_catalog
+from coreason_catalog.main import app
+from coreason_catalog.models import CatalogResponse, QueryRequest, SourceResult
+
+# Every test drives the app in-loop through the shared client (see conftest.py), on one
+# event loop per module, with the registry and broker replaced by reset mocks.
+pytestmark = [pytest.mark.asyncio(loop_scope="module"), pytest.mark.usefixtures("override_dependencies")]
+
+# Request body shared by the tests below; each test copies it into a fresh dict and
+# overrides the fields it exercises.
+_BASE_QUERY_PAYLOAD: Mapping[str, Any] = MappingProxyType(
+    {"intent": "Find data", "user_context": {"user_id": "u1", "email": "test@example.com"}}
+)
+# The unmodified template, serialized once for the tests that send it verbatim.
+_BASE_QUERY_BODY: Final[bytes] = orjson.dumps(dict(_BASE_QUERY_PAYLOAD))
+
+
+async def test_query_catalog_success(post_json: PostJson, mock_broker: AsyncMock) -> None:
+    expected_response = CatalogResponse(
+        query_id=uuid4(),
+        aggregated_results=[
+            SourceResult(
+                source_urn="urn:test",
+                status="SUCCESS",
+                data={"foo": "bar"},
+                latency_ms=10.0,
+            )
+        ],
+        provenance_signature="signed_provenance",
+    )
+    mock_broker.dispatch_query.return_value = expected_response
+
+    payload = {
+        "intent": "Find data",
+        "user_context": {"user_id": "u1", "email": "test@example.com", "role": "admin"},
+        "limit": 5,
+    }
+
+    response = await post_json("/v1/query", payload)
+
+    assert response.status_code == 200
+    data = orjson.loads(response.content)
+    assert UUID(data["query_id"]) == expected_response.query_id
+    assert len(data["aggregated_results"]) == 1
+
+    # Assert called with proper UserContext object
+    call_args = mock_broker.dispatch_query.call_args
+    assert call_args[0][0] == "Find data"
+    assert isinstance(call_args[0][1], UserContext)
+    assert call_args[0][1].user_id == "u1"
+    assert call_args[0][2] == 5
+
+
+async def test_responses_are_orjson_encoded(post_json: PostJson, mock_broker: AsyncMock) -> None:
+    assert app.router.default_response_class is ORJSONResponse
+    query_route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == "/v1/query")
+    assert query_route.response_class is ORJSONResponse
+
+    response = await post_json("/v1/query", _BASE_QUERY_BODY)
+    assert response.headers["content-type"] == "application/json"
+    assert orjson.loads(response.content)["provenance_signature"] == "sig"
+
+
+async def test_large_responses_are_gzipped(post_json: PostJson, mock_broker: AsyncMock) -> None:
+    # Small responses are sent uncompressed.
+    response = await post_json("/v1/query", _BASE_QUERY_BODY, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    mock_broker.dispatch_query.return_value = CatalogResponse(
+        query_id=uuid4(),
+        aggregated_results=[
+            SourceResult(source_urn=f"urn:test:{i}", status="SUCCESS", data={"rows": list(range(50))}, latency_ms=1.0)
+            for i in range(20)
+        ],
+        provenance_signature="sig",
+    )
+    response = await post_json("/v1/query", _BASE_QUERY_BODY, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(orjson.loads(response.content)["aggregated_results"]) == 20
+
+
+async def test_query_catalog_validation_error(post_json: PostJson, mock_broker: AsyncMock) -> None:
+    response = await post_json("/v1/query", {"user_context": {"role": "admin"}, "limit": 5})
+
+    assert response.status_code == 422
+    mock_broker.dispatch_query.assert_not_called()
+
+
+async def test_query_catalog_internal_error(mock_broker: AsyncMock) -> None:
+    mock_broker.dispatch_query.side_effect = Exception("Broker Failure")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await query_catalog(QueryRequest(**_BASE_QUERY_PAYLOAD), x_user_context=None, broker=mock_broker)
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.detail == "Internal Server Error"
+
+
+@pytest.mark.parametrize("partial_content", [False, True])  # type: ignore[misc]
+async def test_query_catalog_empty_results(
+    post_json: PostJson, mock_broker: AsyncMock, partial_content: bool, default_catalog_response: CatalogResponse
+) -> None:
+    mock_broker.dispatch_query.return_value = default_catalog_response.model_copy(
+        update={"partial_content": partial_content}
+    )
+
+    payload = {**_BASE_QUERY_PAYLOAD, "intent": "test"}
+    response = await post_json("/v1/query", payload)
+    assert response.status_code == 200
+    data = orjson.loads(response.content)
+    assert data["aggregated_results"] == []
+    assert data["partial_content"] is partial_content
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    ("overrides", "intent", "limit"),
+    [
+        ({}, "Find data", 10),
+        ({"intent": "test", "limit": 0}, "test", 0),
+        (
+            # UserContext expects flat fields like user_id, email, groups etc.
+            {
+                "intent": "test",
+                "user_context": {
+                    "user_id": "u1",
+                    "email": "test@example.com",
+                    "groups": ["admin", "researcher"],
+                    "extra": {"project": "P1"},
+                },
+            },
+            "test",
+            10,
+        ),
+    ],
+    ids=["default_limit", "limit_zero", "complex_context"],
+)
+async def test_query_catalog_dispatch_args(
+    post_json: PostJson, mock_broker: AsyncMock, overrides: Dict[str, Any], intent: str, limit: int
+) -> None:
+    payload = {**_BASE_QUERY_PAYLOAD, **overrides}
+    response = await post_json("/v1/query", payload)
+    assert response.status_code == 200
+
+    args = mock_broker.dispatch_query.call_args[0]
+    assert args[0] == intent
+    assert isinstance(args[1], UserContext)
+    assert args[1].user_id == "u1"
+    assert args[1].groups == payload["user_context"].get("groups", [])
+    assert args[2] == limit
@@ -0,0 +1,134 @@
+import asyncio
+from types import MappingProxyType
+from typing import Any, Final, Mapping
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from helpers import PostJson
+
+from coreason_catalog.api.routes import register_source
+from coreason_catalog.dependencies import get_registry_service
+from coreason_catalog.main import app
+from coreason_catalog.models import SourceManifest
+
+# Every test drives the app in-loop through the shared client (see conftest.py), on one
+# event loop per module, with the registry and broker replaced by reset mocks.
+pytestmark = [pytest.mark.asyncio(loop_scope="module"), pytest.mark.usefixtures("override_dependencies")]
+
+# Request body shared by the tests below; each test copies it into a fresh dict and
+# overrides the fields it exercises. The top level is read-only, so a test cannot leak
+# changes to the next.
+_BASE_SOURCE_PAYLOAD: Mapping[str, Any] = MappingProxyType(
+    {
+        "urn": "urn:coreason:mcp:test_source",
+        "name": "Test Source",
+        "description": "A test source description",
+        "endpoint_url": "sse://localhost:8080",
+        "geo_location": "US",
+        "sensitivity": "PUBLIC",
+        "owner_group": "Test Group",
+        "access_policy": "allow { input.subject.location == 'US' }",
+    }
+)
+# Longer than CPython folds at compile time, so build it once here rather than per test run.
+_LARGE_DESCRIPTION: Final[str] = "A" * 10_000
+# Bodies sent verbatim, serialized once.
+_BASE_SOURCE_BODY: Final[bytes] = orjson.dumps(dict(_BASE_SOURCE_PAYLOAD))
+_LARGE_SOURCE_BODY: Final[bytes] = orjson.dumps({**_BASE_SOURCE_PAYLOAD, "description": _LARGE_DESCRIPTION})
+# Handed straight to the route function by the error-path tests, which need no HTTP round trip.
+_ERROR_MANIFEST: Final[SourceManifest] = SourceManifest(
+    **{**_BASE_SOURCE_PAYLOAD, "urn": "urn:coreason:mcp:error_source", "name": "Error Source"}
+)
+
+
+async def test_register_source_success(post_json: PostJson, mock_registry_service: MagicMock) -> None:
+    response = await post_json("/v1/sources", _BASE_SOURCE_BODY)
+
+    assert response.status_code == 201
+    assert orjson.loads(response.content) == {"status": "registered", "urn": _BASE_SOURCE_PAYLOAD["urn"]}
+
+    mock_registry_service.register_source.assert_called_once()
+    call_args = mock_registry_service.register_source.call_args[0][0]
+    assert isinstance(call_args, SourceManifest)
+    assert call_args.urn == _BASE_SOURCE_PAYLOAD["urn"]
+
+
+async def test_register_source_runs_off_event_loop(post_json: PostJson, mock_registry_service: MagicMock) -> None:
+    def register(manifest: SourceManifest) -> None:
+        # A worker thread has no running event loop
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+
+    mock_registry_service.register_source.side_effect = register
+    payload = {
+        **_BASE_SOURCE_PAYLOAD,
+        "urn": "urn:coreason:mcp:threaded_source",
+        "name": "Threaded Source",
+        "access_policy": "allow { true }",
+    }
+
+    response = await post_json("/v1/sources", payload)
+
+    assert response.status_code == 201
+    mock_registry_service.register_source.assert_called_once()
+
+
+async def test_register_source_validation_error(post_json: PostJson) -> None:
+    # Missing required field 'urn'
+    payload = {k: v for k, v in _BASE_SOURCE_PAYLOAD.items() if k != "urn"}
+    response = await post_json("/v1/sources", payload)
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    ("error", "detail"),
+    [
+        (ValueError("Embedding failed"), "Embedding failed"),
+        (RuntimeError("DB error"), "DB error"),
+        (Exception("Unknown"), "Internal Server Error"),
+    ],
+    ids=["value_error", "runtime_error", "unexpected_error"],
+)
+async def test_register_source_error(mock_registry_service: MagicMock, error: Exception, detail: str) -> None:
+    mock_registry_service.register_source.side_effect = error
+
+    with pytest.raises(HTTPException) as exc_info:
+        await register_source(_ERROR_MANIFEST, registry_service=mock_registry_service)
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.detail == detail
+    mock_registry_service.register_source.assert_called_once_with(_ERROR_MANIFEST)
+
+
+async def test_register_source_invalid_enum(post_json: PostJson, mock_registry_service: MagicMock) -> None:
+    response = await post_json("/v1/sources", {**_BASE_SOURCE_PAYLOAD, "sensitivity": "TOP_SECRET"})
+
+    assert response.status_code == 422
+    mock_registry_service.register_source.assert_not_called()
+
+
+async def test_register_source_idempotency(post_json: PostJson, mock_registry_service: MagicMock) -> None:
+    await post_json("/v1/sources", _BASE_SOURCE_BODY)
+    await post_json("/v1/sources", _BASE_SOURCE_BODY)
+
+    assert mock_registry_service.register_source.call_count == 2
+
+
+async def test_register_source_dependency_failure(post_json: PostJson) -> None:
+    # Explicitly break dependency for this test
+    def broken_dependency() -> None:
+        raise RuntimeError("Database connection failed")
+
+    app.dependency_overrides[get_registry_service] = broken_dependency
+
+    response = await post_json("/v1/sources", _BASE_SOURCE_BODY)
+    assert response.status_code == 500
+
+
+async def test_register_source_large_payload(post_json: PostJson, mock_registry_service: MagicMock) -> None:
+    response = await post_json("/v1/sources", _LARGE_SOURCE_BODY)
+    assert response.status_code == 201
+
+    call_args = mock_registry_service.register_source.call_args[0][0]
+    assert call_args.description == _LARGE_DESCRIPTION
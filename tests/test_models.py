@@ -1,9 +1,42 @@
+from typing import Any, Dict
 from uuid import uuid4
 
 import pytest
 from pydantic import ValidationError
 
-from coreason_catalog.models import CatalogResponse, DataSensitivity, SourceManifest, SourceResult
+from coreason_catalog.models import (
+    CatalogResponse,
+    DataSensitivity,
+    QueryRequest,
+    SourceManifest,
+    SourceResult,
+    policy_digest,
+)
+
+# Constructor arguments for a valid manifest; tests that exercise validation build from these.
+_MANIFEST_FIELDS: Dict[str, Any] = {
+    "urn": "urn:coreason:mcp:test",
+    "name": "Test Source",
+    "description": "A test source",
+    "endpoint_url": "sse://localhost:8000",
+    "geo_location": "US",
+    "sensitivity": DataSensitivity.INTERNAL,
+    "owner_group": "Testers",
+    "access_policy": "allow { true }",
+}
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def base_manifest() -> SourceManifest:
+    """A manifest validated once per module. It is frozen, so tests derive variants with model_copy."""
+    return SourceManifest(**_MANIFEST_FIELDS)
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def base_response() -> CatalogResponse:
+    """A one-result response validated once per module; tests only read it or copy it."""
+    result = SourceResult(source_urn="urn:coreason:mcp:test", status="SUCCESS", data={"foo": "bar"}, latency_ms=10.5)
+    return CatalogResponse(query_id=uuid4(), aggregated_results=[result], provenance_signature="sig_123")
 
 
 def test_data_sensitivity_enum() -> None:
@@ -11,49 +44,74 @@ def test_data_sensitivity_enum() -> None:
     assert DataSensitivity.GxP_LOCKED == "GxP_LOCKED"
 
 
-def test_source_manifest_valid() -> None:
-    manifest = SourceManifest(
-        urn="urn:coreason:mcp:test",
-        name="Test Source",
-        description="A test source",
-        endpoint_url="sse://localhost:8000",
-        geo_location="US",
-        sensitivity=DataSensitivity.INTERNAL,
-        owner_group="Testers",
-        access_policy="allow { true }",
-    )
-    assert manifest.urn == "urn:coreason:mcp:test"
-    assert manifest.sensitivity == DataSensitivity.INTERNAL
+def test_source_manifest_valid(base_manifest: SourceManifest) -> None:
+    assert base_manifest.urn == "urn:coreason:mcp:test"
+    assert base_manifest.sensitivity == DataSensitivity.INTERNAL
+
+
+def test_source_manifest_is_frozen_and_ignores_extra_fields() -> None:
+    manifest = SourceManifest(**_MANIFEST_FIELDS, unknown_field="dropped")
+    assert not hasattr(manifest, "unknown_field")
+
+    with pytest.raises(ValidationError):
+        manifest.description = "changed"
+
+    updated = manifest.model_copy(update={"description": "changed"})
+    assert updated.description == "changed"
+    assert manifest.description == "A test source"
+
+
+def test_source_manifest_policy_digest(base_manifest: SourceManifest) -> None:
+    manifest = base_manifest
+    assert manifest.policy_digest == policy_digest("allow { true }")
+    assert len(manifest.policy_digest) == 16
+    assert "policy_digest" not in manifest.model_dump()
+
+    # Copies keep the digest in sync with the policy.
+    assert manifest.model_copy(update={"name": "Renamed"}).policy_digest == manifest.policy_digest
+    changed = manifest.model_copy(update={"access_policy": "allow { false }"})
+    assert changed.policy_digest == policy_digest("allow { false }")
+
+    # Round-tripping through the wire schema recomputes it.
+    assert SourceManifest.model_validate_json(manifest.model_dump_json()).policy_digest == manifest.policy_digest
+
+
+def test_source_manifest_acls_set() -> None:
+    manifest = SourceManifest(**_MANIFEST_FIELDS, acls=["group:a", "group:b", "group:a"])
+    assert manifest.acls_set == frozenset({"group:a", "group:b"})
+    assert "acls_set" not in manifest.model_dump()
+    assert manifest.model_copy(update={"acls": ["group:c"]}).acls_set == frozenset({"group:c"})
+
+
+def test_source_manifest_is_hashable() -> None:
+    manifest = SourceManifest(**_MANIFEST_FIELDS, acls=["group:a"], source_pointer={"table": "t"})
+    same = SourceManifest.model_validate_json(manifest.model_dump_json())
+    renamed = manifest.model_copy(update={"name": "Renamed"})
+
+    # Usable as a dict key despite list/dict fields; lookups still compare every field.
+    cache = {manifest: "cached"}
+    assert cache[same] == "cached"
+    assert hash(renamed) == hash(manifest)
+    assert renamed not in cache
 
 
 def test_source_manifest_invalid_sensitivity() -> None:
     with pytest.raises(ValidationError):
-        SourceManifest(
-            urn="urn:coreason:mcp:test",
-            name="Test Source",
-            description="A test source",
-            endpoint_url="sse://localhost:8000",
-            geo_location="US",
-            sensitivity="INVALID_LEVEL",
-            owner_group="Testers",
-            access_policy="allow { true }",
-        )
-
-
-def test_catalog_response_valid() -> None:
-    result = SourceResult(source_urn="urn:coreason:mcp:test", status="SUCCESS", data={"foo": "bar"}, latency_ms=10.5)
-    response = CatalogResponse(query_id=uuid4(), aggregated_results=[result], provenance_signature="sig_123")
-    assert response.aggregated_results[0].status == "SUCCESS"
-    assert response.provenance_signature == "sig_123"
-    assert response.partial_content is False  # Default check
-
-
-def test_catalog_response_with_partial_content() -> None:
-    result = SourceResult(source_urn="urn:coreason:mcp:test", status="ERROR", data={}, latency_ms=10.5)
-    response = CatalogResponse(
-        query_id=uuid4(),
-        aggregated_results=[result],
-        provenance_signature="sig_123",
-        partial_content=True,
-    )
+        SourceManifest(**{**_MANIFEST_FIELDS, "sensitivity": "INVALID_LEVEL"})
+
+
+def test_query_request_requires_intent_and_identity() -> None:
+    with pytest.raises(ValidationError):
+        QueryRequest(user_context={"role": "admin"}, limit=5)  # Missing intent and user_id/email
+
+
+def test_catalog_response_valid(base_response: CatalogResponse) -> None:
+    assert base_response.aggregated_results[0].status == "SUCCESS"
+    assert base_response.provenance_signature == "sig_123"
+    assert base_response.partial_content is False  # Default check
+
+
+def test_catalog_response_with_partial_content(base_response: CatalogResponse) -> None:
+    response = base_response.model_copy(update={"partial_content": True})
     assert response.partial_content is True
+    assert base_response.partial_content is False
@@ -1,14 +1,42 @@
+import asyncio
 import json
+import re
+import signal
 import subprocess
-from unittest.mock import MagicMock, patch
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Set
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
-from coreason_catalog.services.policy_engine import PolicyEngine
+from coreason_catalog.services.policy_engine import _TEMP_DIR, PolicyCheck, PolicyEngine, policy_digest
+
+
+@pytest.fixture(autouse=True)  # type: ignore[misc]
+def fresh_opa_path() -> Generator[None, None, None]:
+    # Tests patch the filesystem lookups, so never reuse a memoized OPA location.
+    PolicyEngine.refresh_opa_path()
+    yield
+    PolicyEngine.refresh_opa_path()
+
+
+@pytest.fixture(autouse=True)  # type: ignore[misc]
+def no_real_opa(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fail any test that would fork a real OPA process; tests patch these per case instead."""
+
+    def forbidden(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("test_policy_engine must not run a real OPA subprocess")
+
+    monkeypatch.setattr(subprocess, "run", forbidden)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", forbidden)
 
 
 @pytest.fixture  # type: ignore[misc]
 def policy_engine() -> PolicyEngine:
+    # Fresh per test: tests assert on decision-cache counts and server state.
     # Use a mock path to avoid looking for the real binary
     return PolicyEngine(opa_path="/mock/opa")
 
@@ -37,6 +65,7 @@ def test_find_opa(mock_path: MagicMock, mock_which: MagicMock) -> None:
 
     mock_path.side_effect = path_side_effect
 
+    PolicyEngine.refresh_opa_path()
     engine = PolicyEngine()
     assert engine.opa_path == "/abs/bin/opa"
 
@@ -51,28 +80,44 @@ def test_find_opa(mock_path: MagicMock, mock_which: MagicMock) -> None:
         return m
 
     mock_path.side_effect = path_side_effect_usr
+    PolicyEngine.refresh_opa_path()
     engine = PolicyEngine()
     assert engine.opa_path == "/usr/local/bin/opa"
 
     # Case 4: Not found
     mock_path.side_effect = lambda x: MagicMock(exists=lambda: False)
+    PolicyEngine.refresh_opa_path()
     engine = PolicyEngine()
     assert engine.opa_path is None
 
 
+@patch("coreason_catalog.services.policy_engine.shutil.which")
+def test_opa_path_is_memoized(mock_which: MagicMock) -> None:
+    mock_which.return_value = "/usr/bin/opa"
+    assert PolicyEngine().opa_path == "/usr/bin/opa"
+    mock_which.return_value = "/opt/opa"
+    assert PolicyEngine().opa_path == "/usr/bin/opa"
+    assert mock_which.call_count == 1
+
+    # Only an explicit refresh looks the binary up again.
+    PolicyEngine.refresh_opa_path()
+    assert PolicyEngine().opa_path == "/opt/opa"
+    assert mock_which.call_count == 2
+
+
 @patch("subprocess.run")
 def test_evaluate_simple_allow(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
     policy = 'allow { input.user == "admin" }'
 
     # Mock success response
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]})
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
 
     # Matching input
     assert policy_engine.evaluate_policy(policy, {"user": "admin"}) is True
 
     # Mock failure response
-    mock_run.return_value.stdout = json.dumps({"result": []})
+    mock_run.return_value.stdout = json.dumps({"result": []}).encode()
 
     # Non-matching input
     assert policy_engine.evaluate_policy(policy, {"user": "guest"}) is False
@@ -88,13 +133,13 @@ def test_evaluate_complex_policy(mock_run: MagicMock, policy_engine: PolicyEngin
 
     # Match
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]})
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
 
     input_data = {"subject": {"location": "US"}, "object": {"geo": "US"}}
     assert policy_engine.evaluate_policy(policy, input_data) is True
 
     # Mismatch
-    mock_run.return_value.stdout = json.dumps({"result": []})
+    mock_run.return_value.stdout = json.dumps({"result": []}).encode()
     input_data_loc = {"subject": {"location": "EU"}, "object": {"geo": "US"}}
     assert policy_engine.evaluate_policy(policy, input_data_loc) is False
 
@@ -110,7 +155,7 @@ def test_custom_package_name(mock_run: MagicMock, policy_engine: PolicyEngine) -
     """
 
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]})
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
 
     assert policy_engine.evaluate_policy(policy, {"x": 1}) is True
 
@@ -121,8 +166,8 @@ def test_invalid_rego_syntax(mock_run: MagicMock, policy_engine: PolicyEngine) -
 
     # Simulate OPA error output
     mock_run.return_value.returncode = 1
-    mock_run.return_value.stderr = "rego_parse_error: illegal token"
-    mock_run.return_value.stdout = ""
+    mock_run.return_value.stderr = b"rego_parse_error: illegal token"
+    mock_run.return_value.stdout = b""
 
     with pytest.raises(RuntimeError) as excinfo:
         policy_engine.evaluate_policy(policy, {"x": 1})
@@ -134,8 +179,8 @@ def test_invalid_rego_syntax(mock_run: MagicMock, policy_engine: PolicyEngine) -
 def test_opa_execution_failure(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
     # Simulate a binary failure
     mock_run.return_value.returncode = 1
-    mock_run.return_value.stderr = "Fatal error"
-    mock_run.return_value.stdout = ""
+    mock_run.return_value.stderr = b"Fatal error"
+    mock_run.return_value.stdout = b""
 
     with pytest.raises(RuntimeError, match="OPA execution failed"):
         policy_engine.evaluate_policy("allow { true }", {})
@@ -163,6 +208,22 @@ def test_timeout_expired(mock_run: MagicMock, policy_engine: PolicyEngine) -> No
         policy_engine.evaluate_policy("allow { true }", {}, timeout=1.0)
 
 
+@patch("subprocess.run")
+def test_input_piped_as_json(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
+    def run(cmd: List[str], **kwargs: Any) -> MagicMock:
+        policy_path = Path(cmd[cmd.index("-d") + 1])
+        assert str(policy_path.parent) == (_TEMP_DIR or tempfile.gettempdir())
+        assert policy_path.read_text().startswith("package match")
+        return MagicMock(returncode=0, stdout=b'{"result": [{"expressions": [{"value": true}]}]}')
+
+    mock_run.side_effect = run
+    assert policy_engine.evaluate_policy("allow { true }", {"user": "ü", "ids": {1: "a"}}) is True
+
+    cmd = mock_run.call_args.args[0]
+    assert "--stdin-input" in cmd and "-i" not in cmd
+    assert json.loads(mock_run.call_args.kwargs["input"]) == {"user": "ü", "ids": {"1": "a"}}
+
+
 def test_invalid_input_data(policy_engine: PolicyEngine) -> None:
     # Pass non-serializable object
     class NonSerializable:
@@ -176,7 +237,7 @@ def test_invalid_input_data(policy_engine: PolicyEngine) -> None:
 def test_non_boolean_return(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
     # Simulate OPA returning a non-boolean value (e.g., a string)
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": "some string"}]}]})
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": "some string"}]}]}).encode()
 
     # Should log warning and return False
     assert policy_engine.evaluate_policy("allow { true }", {}) is False
@@ -196,13 +257,15 @@ def test_malformed_package_declaration(mock_run: MagicMock, policy_engine: Polic
     # Expected query: data.match.allow
 
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]})
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
 
     assert policy_engine.evaluate_policy(policy, {}) is True
 
     # Verify default package was used
-    args, _ = mock_run.call_args
+    args, kwargs = mock_run.call_args
     assert "data.match.allow" in args[0]
+    # Output is captured as bytes and parsed without a text decode.
+    assert kwargs["capture_output"] is True and not kwargs.get("text")
 
 
 @patch("subprocess.run")
@@ -218,7 +281,658 @@ def test_generic_exception_handling(mock_run: MagicMock, policy_engine: PolicyEn
 def test_invalid_json_output(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
     # Simulate OPA returning invalid JSON
     mock_run.return_value.returncode = 0
-    mock_run.return_value.stdout = "Invalid JSON"
+    mock_run.return_value.stdout = b"Invalid JSON"
 
     with pytest.raises(RuntimeError, match="Failed to parse OPA output"):
         policy_engine.evaluate_policy("allow { true }", {})
+
+
+def _governance_input(user_id: str, urn: str = "urn:test:1", geo: str = "US") -> Dict[str, Any]:
+    return {
+        "subject": {"user_id": user_id, "groups": []},
+        "object": {"urn": urn, "geo": geo, "sensitivity": "PUBLIC", "owner": "team"},
+        "action": "QUERY",
+    }
+
+
+@patch("subprocess.run")
+def test_decision_cache_hit(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    policy = "allow { true }"
+
+    assert policy_engine.evaluate_policy(policy, _governance_input("u1")) is True
+    assert policy_engine.evaluate_policy(policy, _governance_input("u1")) is True
+    assert mock_run.call_count == 1
+
+    # Different subject, source metadata or policy each miss the cache.
+    policy_engine.evaluate_policy(policy, _governance_input("u2"))
+    policy_engine.evaluate_policy(policy, _governance_input("u1", geo="EU"))
+    policy_engine.evaluate_policy("allow { false }", _governance_input("u1"))
+    assert mock_run.call_count == 4
+
+
+@patch("subprocess.run")
+def test_decision_cache_uses_precomputed_digest(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    policy = "allow { true }"
+
+    policy_engine.evaluate_policy(policy, _governance_input("u1"), digest=policy_digest(policy))
+    # Same digest, whether supplied by the caller or computed here, hits the same entry.
+    policy_engine.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 1
+
+
+@patch("subprocess.run")
+def test_decision_cache_lru_eviction(mock_run: MagicMock) -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=2)
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": []}).encode()
+    policy = "allow { true }"
+
+    engine.evaluate_policy(policy, _governance_input("u1"))
+    engine.evaluate_policy(policy, _governance_input("u2"))
+    engine.evaluate_policy(policy, _governance_input("u1"))  # refresh u1
+    engine.evaluate_policy(policy, _governance_input("u3"))  # evicts u2
+    assert mock_run.call_count == 3
+
+    engine.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 3
+    engine.evaluate_policy(policy, _governance_input("u2"))
+    assert mock_run.call_count == 4
+
+
+@patch("subprocess.run")
+def test_decision_cache_skips_errors_and_uncacheable_inputs(mock_run: MagicMock) -> None:
+    engine = PolicyEngine(opa_path="/mock/opa")
+    policy = "allow { true }"
+
+    # Failed evaluations are not cached.
+    mock_run.return_value.returncode = 1
+    with pytest.raises(RuntimeError):
+        engine.evaluate_policy(policy, _governance_input("u1"))
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    assert engine.evaluate_policy(policy, _governance_input("u1")) is True
+    assert mock_run.call_count == 2
+
+    # A disabled cache always evaluates.
+    disabled = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0)
+    disabled.evaluate_policy(policy, _governance_input("u1"))
+    disabled.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 4
+
+
+@patch("subprocess.run")
+def test_decision_cache_keys_on_canonical_input(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    policy = "allow { true }"
+
+    # Key order does not matter, and arbitrary (non-governance) documents are cacheable.
+    policy_engine.evaluate_policy(policy, {"a": 1, "b": ["x", {"c": 2}]})
+    policy_engine.evaluate_policy(policy, {"b": ["x", {"c": 2}], "a": 1})
+    assert mock_run.call_count == 1
+
+    # Every input attribute is part of the key, e.g. the subject's groups.
+    admin = _governance_input("u1")
+    admin["subject"]["groups"] = ["admins"]
+    policy_engine.evaluate_policy(policy, _governance_input("u1"))
+    policy_engine.evaluate_policy(policy, admin)
+    assert mock_run.call_count == 3
+
+
+@patch("subprocess.run")
+def test_decision_cache_ttl_and_stats(mock_run: MagicMock) -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_ttl=10.0)
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    policy = "allow { true }"
+
+    with patch("coreason_catalog.services.policy_engine.time.monotonic", return_value=100.0):
+        engine.evaluate_policy(policy, _governance_input("u1"))
+        engine.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 1
+    assert engine.cache_info() == (1, 1, 4096, 1)
+
+    # Expired decisions are dropped and re-evaluated.
+    with patch("coreason_catalog.services.policy_engine.time.monotonic", return_value=110.0):
+        engine.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 2
+    assert engine.cache_info().misses == 2
+
+    engine.cache_clear()
+    assert engine.cache_info() == (0, 0, 4096, 0)
+    engine.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 3
+
+    # A decision whose evaluation spans a cache_clear is not memoized.
+    engine.cache_clear()
+    with patch.object(engine, "_run_opa", side_effect=lambda *args: engine.cache_clear() or True):
+        assert engine.evaluate_policy(policy, _governance_input("u1")) is True
+    assert engine.cache_info().currsize == 0
+
+    # Without a TTL, decisions live until evicted.
+    forever = PolicyEngine(opa_path="/mock/opa", decision_ttl=None)
+    forever.evaluate_policy(policy, _governance_input("u1"))
+    with patch("coreason_catalog.services.policy_engine.time.monotonic", return_value=1e12):
+        forever.evaluate_policy(policy, _governance_input("u1"))
+    assert mock_run.call_count == 4
+
+
+def _opa_server(routes: Dict[str, Any], seen: List[httpx.Request]) -> httpx.AsyncClient:
+    """An AsyncClient whose transport answers OPA REST calls from `routes` (keyed by method + path prefix)."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        for route, reply in routes.items():
+            method, prefix = route.split(" ", 1)
+            if request.method == method and request.url.path.startswith(prefix):
+                return reply(request) if callable(reply) else reply
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://opa")
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+@patch("subprocess.run")
+async def test_evaluate_policy_async_without_server_uses_subprocess(
+    mock_run: MagicMock, policy_engine: PolicyEngine
+) -> None:
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+
+    assert await policy_engine.evaluate_policy_async("allow { true }", {"user": "admin"}) is True
+    mock_run.assert_called_once()
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_evaluate_policy_async_on_server(policy_engine: PolicyEngine) -> None:
+    seen: List[httpx.Request] = []
+    policy_engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/data/coreason/policies/": httpx.Response(200, json={"result": {"allow": True}}),
+        },
+        seen,
+    )
+    policy = "package authz\n\nallow { true }"
+    policy_id = "p" + policy_digest(policy).hex()
+
+    assert await policy_engine.evaluate_policy_async(policy, _governance_input("u1")) is True
+    put, post = seen
+    assert put.url.path == f"/v1/policies/{policy_id}"
+    assert put.content.decode().startswith(f"package coreason.policies.{policy_id}\n")
+    assert "package authz" not in put.content.decode()
+    assert post.url.path == f"/v1/data/coreason/policies/{policy_id}"
+    assert json.loads(post.content)["input"]["subject"]["user_id"] == "u1"
+
+    # The policy is uploaded once; governance decisions are cached.
+    assert await policy_engine.evaluate_policy_async(policy, _governance_input("u2")) is True
+    assert await policy_engine.evaluate_policy_async(policy, _governance_input("u2")) is True
+    assert [r.method for r in seen] == ["PUT", "POST", "POST"]
+
+    assert await policy_engine.evaluate_policy_async("  ", _governance_input("u1")) is False
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_evaluate_policy_async_server_results(policy_engine: PolicyEngine) -> None:
+    results = iter([{"result": {}}, {"result": {"allow": "yes"}}])
+    policy_engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/data/": lambda request: httpx.Response(200, json=next(results)),
+        },
+        [],
+    )
+
+    # Undefined `allow` and non-boolean values both deny.
+    assert await policy_engine.evaluate_policy_async("allow { false }", {"user": "a"}) is False
+    assert await policy_engine.evaluate_policy_async("allow { false }", {"user": "b"}) is False
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_server_without_the_policy_is_retried_not_denied(policy_engine: PolicyEngine) -> None:
+    # An undefined package means the server lost the policy (e.g. unloaded or restarted).
+    results = iter([{}, {"result": {"allow": True}}, {}, {}])
+    seen: List[httpx.Request] = []
+    policy_engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/data/": lambda request: httpx.Response(200, json=next(results)),
+        },
+        seen,
+    )
+    policy = "allow { true }"
+
+    # It is uploaded again and the query retried once.
+    assert await policy_engine.evaluate_policy_async(policy, {"user": "a"}) is True
+    assert [r.method for r in seen] == ["PUT", "POST", "PUT", "POST"]
+
+    # If it is still missing the evaluation fails, and the failure is not memoized as a deny.
+    with pytest.raises(RuntimeError, match="undefined"):
+        await policy_engine.evaluate_policy_async(policy, {"user": "b"})
+    assert policy_engine.cache_info().currsize == 1
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_evaluate_policy_async_server_errors(policy_engine: PolicyEngine) -> None:
+    policy_engine._server_client = _opa_server({"PUT /v1/policies/": httpx.Response(400, text="rego_parse_error")}, [])
+    with pytest.raises(RuntimeError, match="rejected policy"):
+        await policy_engine.evaluate_policy_async("allow {", {})
+
+    policy_engine._server_client = _opa_server(
+        {"PUT /v1/policies/": httpx.Response(200, json={}), "POST /v1/data/": httpx.Response(500, text="boom")}, []
+    )
+    with pytest.raises(RuntimeError, match="evaluation failed \\(500\\)"):
+        await policy_engine.evaluate_policy_async("allow { true }", {})
+
+    with pytest.raises(ValueError, match="Invalid input data"):
+        await policy_engine.evaluate_policy_async("allow { true }", {"bad": object()})
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("socket gone")
+
+    policy_engine._server_client = _opa_server({"PUT /v1/policies/": unreachable}, [])
+    with pytest.raises(RuntimeError, match="request failed"):
+        await policy_engine.evaluate_policy_async("allow { 1 == 1 }", {})
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_server_policy_cache_lru_eviction() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0, policy_cache_size=2)
+    seen: List[httpx.Request] = []
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "DELETE /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/data/": httpx.Response(200, json={"result": {"allow": True}}),
+        },
+        seen,
+    )
+    policies = [f"allow {{ {i} == {i} }}" for i in range(3)]
+    ids = ["p" + policy_digest(p).hex() for p in policies]
+
+    await engine.evaluate_policy_async(policies[0], {})
+    await engine.evaluate_policy_async(policies[1], {})
+    await engine.evaluate_policy_async(policies[0], {})  # refreshes policy 0
+    await engine.evaluate_policy_async(policies[2], {})  # evicts policy 1
+
+    assert list(engine._uploaded_policies) == [ids[0], ids[2]]
+    deletes = [r.url.path for r in seen if r.method == "DELETE"]
+    assert deletes == [f"/v1/policies/{ids[1]}"]
+
+    # A failed unload is logged; the policy is still forgotten locally.
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("socket gone")
+
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "DELETE /v1/policies/": unreachable,
+            "POST /v1/data/": httpx.Response(200, json={"result": {"allow": True}}),
+        },
+        [],
+    )
+    assert await engine.evaluate_policy_async(policies[1], {}) is True
+    assert list(engine._uploaded_policies) == [ids[2], ids[1]]
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_server_policies_in_use_are_not_evicted() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0, policy_cache_size=2)
+    seen: List[httpx.Request] = []
+    loaded: Set[str] = set()
+
+    def put(request: httpx.Request) -> httpx.Response:
+        loaded.add(request.url.path.rsplit("/", 1)[1])
+        return httpx.Response(200, json={})
+
+    def delete(request: httpx.Request) -> httpx.Response:
+        loaded.discard(request.url.path.rsplit("/", 1)[1])
+        return httpx.Response(200, json={})
+
+    def query(request: httpx.Request) -> httpx.Response:
+        # Like OPA: a term over an unloaded policy makes the whole result undefined.
+        if any(
+            policy_id not in loaded for policy_id in re.findall(r"policies\.(p[0-9a-f]+)", request.content.decode())
+        ):
+            return httpx.Response(200, json={})
+        return httpx.Response(200, json={"result": [{"r0": True, "r1": True, "r2": True}]})
+
+    engine._server_client = _opa_server(
+        {"PUT /v1/policies/": put, "DELETE /v1/policies/": delete, "POST /v1/query": query}, seen
+    )
+    policies = [f"allow {{ {i} == {i} }}" for i in range(3)]
+
+    # A batch with more distinct policies than the cache holds keeps all of them loaded for its query.
+    decisions = await engine.evaluate_policy_batch_async([PolicyCheck(p, {}) for p in policies])
+    assert decisions == [True, True, True]
+    assert [r.method for r in seen] == ["PUT", "PUT", "PUT", "POST"]
+    assert len(engine._uploaded_policies) == 3
+    assert engine._policy_pins == {}
+
+    # The excess is unloaded by the next upload, once nothing is in flight.
+    await engine.evaluate_policy_batch_async([PolicyCheck("allow { 3 == 3 }", {}), PolicyCheck(policies[2], {})])
+    assert len(engine._uploaded_policies) == 2
+    assert [r.method for r in seen].count("DELETE") == 2
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_concurrent_server_evaluations_share_one_query() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0)
+    seen: List[httpx.Request] = []
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/query": httpx.Response(200, json={"result": [{"r0": True, "r1": False, "r2": "yes"}]}),
+            "POST /v1/data/": httpx.Response(200, json={"result": {"allow": False}}),
+        },
+        seen,
+    )
+    allow, deny = "allow { true }", "allow { false }"
+
+    decisions = await engine.evaluate_policy_batch_async(
+        [
+            PolicyCheck(allow, _governance_input("u1", urn="urn:1")),
+            PolicyCheck(deny, _governance_input("u1", urn="urn:2"), digest=policy_digest(deny)),
+            PolicyCheck(allow, _governance_input("u1", urn="urn:3")),
+        ]
+    )
+
+    # Non-boolean values deny, as on the single-check path.
+    assert decisions == [True, False, False]
+    assert [r.method for r in seen] == ["PUT", "PUT", "POST"]
+    body = json.loads(seen[-1].content)
+    assert [item["object"]["urn"] for item in body["input"]] == ["urn:1", "urn:2", "urn:3"]
+    allow_id = "p" + policy_digest(allow).hex()
+    assert body["query"].split("; ")[2] == (
+        f'r2 := object.get(data.coreason.policies.{allow_id}, "allow", false) with input as input[2]'
+    )
+
+    # A lone evaluation still uses the data API.
+    assert await engine.evaluate_policy_async(allow, {}) is False
+    assert seen[-1].url.path == f"/v1/data/coreason/policies/{allow_id}"
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_batched_query_waits_for_the_most_patient_caller() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0)
+    seen: List[httpx.Request] = []
+    query_replies = iter(
+        [
+            httpx.Response(200, json={"result": [{"r0": True, "r1": True}]}),
+            httpx.Response(400, text="rego_type_error"),
+        ]
+    )
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/query": lambda request: next(query_replies),
+            "POST /v1/data/": httpx.Response(200, json={"result": {"allow": True}}),
+        },
+        seen,
+    )
+
+    def evaluate_both() -> Any:
+        return asyncio.gather(
+            engine.evaluate_policy_async("allow { true }", {"n": 1}, timeout=1.0),
+            engine.evaluate_policy_async("allow { true }", {"n": 2}, timeout=7.0),
+        )
+
+    assert await evaluate_both() == [True, True]
+    query = next(r for r in seen if r.url.path == "/v1/query")
+    assert query.extensions["timeout"]["read"] == 7.0
+
+    # The per-check fallback keeps each caller's own timeout.
+    seen.clear()
+    assert await evaluate_both() == [True, True]
+    fallback = [r.extensions["timeout"]["read"] for r in seen if r.url.path.startswith("/v1/data/")]
+    assert fallback == [1.0, 7.0]
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_failed_batch_falls_back_to_individual_evaluations() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0)
+    seen: List[httpx.Request] = []
+    query_replies = iter(
+        [
+            httpx.Response(400, text="rego_type_error"),
+            httpx.Response(200, json={"result": []}),  # undefined
+        ]
+    )
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/query": lambda request: next(query_replies),
+            "POST /v1/data/": lambda request: httpx.Response(
+                200, json={"result": {"allow": b"deny" not in request.content}}
+            ),
+        },
+        seen,
+    )
+    checks = [PolicyCheck("allow { true }", {"who": "ok"}), PolicyCheck("allow { true }", {"who": "deny"})]
+
+    # A rejected query and an undefined result both fall back to one request per check.
+    assert await engine.evaluate_policy_batch_async(checks) == [True, False]
+    assert await engine.evaluate_policy_batch_async(checks) == [True, False]
+    assert [r.url.path for r in seen].count("/v1/query") == 2
+
+    # Each check keeps its own outcome: a bad input fails alone, and an upload error reaches its caller.
+    outcomes = await asyncio.gather(
+        engine.evaluate_policy_async("allow { true }", {"who": "ok"}),
+        engine.evaluate_policy_async("allow { true }", {"bad": object()}),
+        return_exceptions=True,
+    )
+    assert outcomes[0] is True
+    assert isinstance(outcomes[1], ValueError)
+
+    engine._server_client = _opa_server({"PUT /v1/policies/": httpx.Response(400, text="rego_parse_error")}, [])
+    with pytest.raises(RuntimeError, match="rejected policy"):
+        await engine.evaluate_policy_batch_async([PolicyCheck("allow {", {}), PolicyCheck("allow {", {"x": 1})])
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_cancelled_caller_is_dropped_from_batch() -> None:
+    engine = PolicyEngine(opa_path="/mock/opa", decision_cache_size=0)
+    seen: List[httpx.Request] = []
+    engine._server_client = _opa_server(
+        {
+            "PUT /v1/policies/": httpx.Response(200, json={}),
+            "POST /v1/query": httpx.Response(200, json={"result": [{"r0": True, "r1": True}]}),
+        },
+        seen,
+    )
+    cancelled = asyncio.ensure_future(engine.evaluate_policy_async("allow { true }", {"n": 0}))
+    kept = [asyncio.ensure_future(engine.evaluate_policy_async("allow { true }", {"n": i})) for i in (1, 2)]
+    await asyncio.sleep(0)  # all three are queued
+    cancelled.cancel()
+
+    assert await asyncio.gather(*kept) == [True, True]
+    body = json.loads(next(r for r in seen if r.url.path == "/v1/query").content)
+    assert body["input"] == [{"n": 1}, {"n": 2}]
+
+    # A caller cancelled while the query is in flight is skipped when the answer arrives.
+    in_flight, release = asyncio.Event(), asyncio.Event()
+
+    async def held_reply(request: httpx.Request) -> httpx.Response:
+        in_flight.set()
+        await release.wait()
+        return httpx.Response(200, json={"result": [{"r0": True, "r1": True}]})
+
+    engine._server_client = _opa_server({"POST /v1/query": held_reply}, [])
+    first = asyncio.ensure_future(engine.evaluate_policy_async("allow { true }", {"n": 3}))
+    second = asyncio.ensure_future(engine.evaluate_policy_async("allow { true }", {"n": 4}))
+    await asyncio.wait_for(in_flight.wait(), timeout=5)
+    first.cancel()
+    release.set()
+    assert await second is True
+    assert first.cancelled()
+
+
+@patch("subprocess.run")
+def test_sync_evaluate_policy_uses_server(mock_run: MagicMock, policy_engine: PolicyEngine) -> None:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"result": True})
+
+    try:
+        seen: List[httpx.Request] = []
+        policy_engine._server_client = _opa_server(
+            {
+                "PUT /v1/policies/": httpx.Response(200, json={}),
+                "POST /v1/data/": httpx.Response(200, json={"result": {"allow": True}}),
+            },
+            seen,
+        )
+        policy_engine._server_loop = loop
+
+        # Called from a plain thread: served by the OPA server, no subprocess.
+        assert policy_engine.evaluate_policy("allow { true }", {"user": "a"}) is True
+        assert [r.method for r in seen] == ["PUT", "POST"]
+        mock_run.assert_not_called()
+
+        policy_engine._server_client = httpx.AsyncClient(transport=httpx.MockTransport(slow), base_url="http://opa")
+        with pytest.raises(RuntimeError, match="timed out"):
+            policy_engine.evaluate_policy("allow { true }", {"user": "b"}, timeout=0.05)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # A closed loop falls back to the subprocess path.
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    assert policy_engine.evaluate_policy("allow { true }", {"user": "c"}) is True
+    mock_run.assert_called_once()
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+@patch("subprocess.run")
+async def test_sync_evaluate_policy_on_server_loop_uses_subprocess(
+    mock_run: MagicMock, policy_engine: PolicyEngine
+) -> None:
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = json.dumps({"result": [{"expressions": [{"value": True}]}]}).encode()
+    policy_engine._server_client = _opa_server({}, [])
+    policy_engine._server_loop = asyncio.get_running_loop()
+
+    # Blocking on the loop's own future would deadlock, so the subprocess path is used.
+    assert policy_engine.evaluate_policy("allow { true }", {"user": "a"}) is True
+    mock_run.assert_called_once()
+
+
+def test_server_module_rehomes_package() -> None:
+    assert PolicyEngine._server_module("allow { true }", "p1") == "package coreason.policies.p1\n\nallow { true }"
+    assert (
+        PolicyEngine._server_module("package a.b\nallow { true }", "p1")
+        == "package coreason.policies.p1\nallow { true }"
+    )
+
+
+def _fake_process(returncode: Optional[int] = None) -> MagicMock:
+    process = MagicMock()
+    process.returncode = returncode
+    process.wait = AsyncMock(return_value=0)
+    return process
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_start_and_stop_server(policy_engine: PolicyEngine) -> None:
+    process = _fake_process()
+    health = iter([httpx.ConnectError("not yet"), httpx.Response(200, json={})])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        reply = next(health)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    with (
+        patch("asyncio.create_subprocess_exec", AsyncMock(return_value=process)) as mock_exec,
+        patch("httpx.AsyncHTTPTransport", lambda uds, limits: httpx.MockTransport(handler)),
+        patch("coreason_catalog.services.policy_engine.atexit") as mock_atexit,
+    ):
+        assert await policy_engine.start_server() is True
+        assert await policy_engine.start_server() is True  # idempotent
+        mock_atexit.register.assert_called_once_with(policy_engine._kill_server_at_exit)
+        assert policy_engine._server_loop is asyncio.get_running_loop()
+
+        # The exit hook terminates a server that was never stopped.
+        process.pid = 4242
+        with patch("coreason_catalog.services.policy_engine.os.kill", side_effect=ProcessLookupError) as mock_kill:
+            policy_engine._kill_server_at_exit()
+        mock_kill.assert_called_once_with(4242, signal.SIGTERM)
+
+        server_dir = policy_engine._server_dir
+        assert server_dir is not None and Path(server_dir).is_dir()
+        await policy_engine.stop_server()
+        mock_atexit.unregister.assert_called_once_with(policy_engine._kill_server_at_exit)
+        assert not Path(server_dir).exists()
+
+    args = mock_exec.call_args.args
+    assert args[:4] == ("/mock/opa", "run", "--server", "--addr")
+    assert args[4].startswith("unix://") and args[4].endswith("opa.sock")
+    process.terminate.assert_called_once()
+    assert policy_engine._server_client is None
+    assert policy_engine._server_loop is None
+
+    with patch("coreason_catalog.services.policy_engine.os.kill") as mock_kill:
+        policy_engine._kill_server_at_exit()  # nothing left to kill
+    mock_kill.assert_not_called()
+
+    await policy_engine.stop_server()  # no-op when stopped
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_start_server_failures() -> None:
+    with (
+        patch("coreason_catalog.services.policy_engine.shutil.which", return_value=None),
+        patch("coreason_catalog.services.policy_engine.Path.exists", return_value=False),
+    ):
+        assert await PolicyEngine().start_server() is False
+
+    engine = PolicyEngine(opa_path="/mock/opa")
+    with patch("asyncio.create_subprocess_exec", AsyncMock(side_effect=FileNotFoundError("no opa"))):
+        assert await engine.start_server() is False
+
+    # The server never becomes healthy: it is terminated and the subprocess path is kept.
+    process = _fake_process()
+    with (
+        patch("asyncio.create_subprocess_exec", AsyncMock(return_value=process)),
+        patch("httpx.AsyncHTTPTransport", lambda uds, limits: httpx.MockTransport(lambda r: httpx.Response(503))),
+    ):
+        assert await engine.start_server(startup_timeout=0.1) is False
+    process.terminate.assert_called_once()
+    assert engine._server_client is None
+
+    # The server process exited immediately.
+    exited = _fake_process(returncode=1)
+    with (
+        patch("asyncio.create_subprocess_exec", AsyncMock(return_value=exited)),
+        patch("httpx.AsyncHTTPTransport", lambda uds, limits: httpx.MockTransport(lambda r: httpx.Response(503))),
+    ):
+        assert await engine.start_server() is False
+    exited.terminate.assert_not_called()
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_terminate_kills_unresponsive_server() -> None:
+    process = _fake_process()
+
+    calls: List[int] = []
+
+    async def wait() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return 0
+
+    process.wait = wait
+    await PolicyEngine._terminate(process, timeout=0.01)
+    process.kill.assert_called_once()
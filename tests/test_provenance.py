@@ -1,5 +1,6 @@
 import json
 import uuid
+from datetime import datetime, timedelta
 from typing import List
 
 import pytest
@@ -78,3 +79,8 @@ class TestProvenanceService:
 
         assert "prov:endedAtTime" in activity
         assert "@value" in activity["prov:endedAtTime"]
+        # Encoded natively by orjson: an ISO 8601 UTC timestamp and the canonical UUID string.
+        ended = datetime.fromisoformat(activity["prov:endedAtTime"]["@value"])
+        assert ended.utcoffset() == timedelta(0)
+        entity = next(item for item in data["@graph"] if item["@type"] == "prov:Entity")
+        assert entity["coreason:queryId"] == str(query_id)
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
 from coreason_catalog.models import DataSensitivity, SourceManifest
@@ -17,7 +18,7 @@ def mock_vector_store() -> MagicMock:
 def mock_embedding_service() -> MagicMock:
     service = MagicMock(spec=EmbeddingService)
     # Default behavior: return a dummy embedding of correct size (384)
-    service.embed_text.return_value = [0.1] * 384
+    service.embed_text.return_value = np.full(384, 0.1, dtype=np.float32)
     service.embedding_dim = 384
     return service
 
@@ -27,7 +28,7 @@ def registry_service(mock_vector_store: MagicMock, mock_embedding_service: Magic
     return RegistryService(vector_store=mock_vector_store, embedding_service=mock_embedding_service)
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def sample_manifest() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:test_source",
@@ -53,9 +54,11 @@ def test_register_source_success(
     # Verify embedding called with description
     mock_embedding_service.embed_text.assert_called_once_with(sample_manifest.description)
 
-    # Verify vector store add called with manifest and embedding
-    expected_embedding = [0.1] * 384
-    mock_vector_store.add_source.assert_called_once_with(sample_manifest, expected_embedding)
+    # Verify vector store add called with manifest and the very same float32 array (no conversion copy)
+    expected_embedding = mock_embedding_service.embed_text.return_value
+    mock_vector_store.add_source.assert_called_once()
+    assert mock_vector_store.add_source.call_args.args[0] == sample_manifest
+    assert mock_vector_store.add_source.call_args.args[1] is expected_embedding
 
 
 def test_register_source_embedding_failure(
@@ -102,8 +105,7 @@ def test_register_source_empty_description(
     sample_manifest: SourceManifest,
 ) -> None:
     """Test registration with an empty description."""
-    sample_manifest.description = ""
-    registry_service.register_source(sample_manifest)
+    registry_service.register_source(sample_manifest.model_copy(update={"description": ""}))
 
     # Should still attempt to embed empty string
     mock_embedding_service.embed_text.assert_called_once_with("")
@@ -117,8 +119,7 @@ def test_register_source_whitespace_description(
     sample_manifest: SourceManifest,
 ) -> None:
     """Test registration with a whitespace-only description."""
-    sample_manifest.description = "   "
-    registry_service.register_source(sample_manifest)
+    registry_service.register_source(sample_manifest.model_copy(update={"description": "   "}))
 
     # Should still attempt to embed whitespace string
     mock_embedding_service.embed_text.assert_called_once_with("   ")
@@ -140,7 +141,8 @@ def test_register_source_update_scenario(
     # 1. First Registration
     registry_service.register_source(sample_manifest)
     mock_embedding_service.embed_text.assert_called_with(sample_manifest.description)
-    mock_vector_store.add_source.assert_called_with(sample_manifest, [0.1] * 384)
+    assert mock_vector_store.add_source.call_args.args[0] == sample_manifest
+    np.testing.assert_array_equal(mock_vector_store.add_source.call_args.args[1], np.full(384, 0.1, dtype=np.float32))
 
     # Reset mocks to track second call cleanly
     mock_embedding_service.embed_text.reset_mock()
@@ -148,14 +150,62 @@ def test_register_source_update_scenario(
 
     # 2. Update Description
     new_description = "Updated description for the same source."
-    sample_manifest.description = new_description
+    updated_manifest = sample_manifest.model_copy(update={"description": new_description})
     # Simulate a different embedding for the new text
-    new_embedding = [0.2] * 384
+    new_embedding = np.full(384, 0.2, dtype=np.float32)
     mock_embedding_service.embed_text.return_value = new_embedding
 
-    registry_service.register_source(sample_manifest)
+    registry_service.register_source(updated_manifest)
 
     # Verify new embedding was generated
     mock_embedding_service.embed_text.assert_called_once_with(new_description)
     # Verify new embedding was stored
-    mock_vector_store.add_source.assert_called_once_with(sample_manifest, new_embedding)
+    mock_vector_store.add_source.assert_called_once()
+    assert mock_vector_store.add_source.call_args.args[0] == updated_manifest
+    np.testing.assert_array_equal(mock_vector_store.add_source.call_args.args[1], new_embedding)
+
+
+def test_register_sources_batch(
+    registry_service: RegistryService,
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+    sample_manifest: SourceManifest,
+) -> None:
+    """Bulk registration embeds all descriptions in one call and stores them in one batch."""
+    manifests = [sample_manifest.model_copy(update={"urn": f"urn:{i}", "description": f"d{i}"}) for i in range(3)]
+    matrix = np.full((3, 384), 0.1, dtype=np.float32)
+    mock_embedding_service.embed_texts.return_value = matrix
+
+    registry_service.register_sources(manifests)
+
+    mock_embedding_service.embed_texts.assert_called_once_with(["d0", "d1", "d2"])
+    mock_vector_store.add_sources_batch.assert_called_once()
+    assert mock_vector_store.add_sources_batch.call_args.args[0] == manifests
+    assert mock_vector_store.add_sources_batch.call_args.args[1] is matrix
+
+    registry_service.register_sources([])
+    assert mock_embedding_service.embed_texts.call_count == 1
+
+
+def test_register_sources_failures(
+    registry_service: RegistryService,
+    mock_vector_store: MagicMock,
+    mock_embedding_service: MagicMock,
+    sample_manifest: SourceManifest,
+) -> None:
+    """Bulk registration surfaces the same errors as single registration."""
+    manifests = [sample_manifest]
+
+    mock_embedding_service.embed_texts.side_effect = Exception("Embedding model error")
+    with pytest.raises(ValueError, match="Failed to generate embedding"):
+        registry_service.register_sources(manifests)
+
+    mock_embedding_service.embed_texts.side_effect = None
+    mock_embedding_service.embed_texts.return_value = np.zeros((1, 10), dtype=np.float32)
+    with pytest.raises(ValueError, match="Generated embedding matrix shape"):
+        registry_service.register_sources(manifests)
+
+    mock_embedding_service.embed_texts.return_value = np.zeros((1, 384), dtype=np.float32)
+    mock_vector_store.add_sources_batch.side_effect = Exception("DB Error")
+    with pytest.raises(RuntimeError, match="Failed to store source"):
+        registry_service.register_sources(manifests)
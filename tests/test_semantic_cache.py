@@ -0,0 +1,90 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from coreason_catalog.models import DataSensitivity, SourceManifest
+from coreason_catalog.services.semantic_cache import SemanticCache
+
+
+def _manifests(*urns: str) -> List[SourceManifest]:
+    return [
+        SourceManifest(
+            urn=urn,
+            name=urn,
+            description=urn,
+            endpoint_url="sse://localhost",
+            geo_location="US",
+            sensitivity=DataSensitivity.PUBLIC,
+            owner_group="G1",
+            access_policy="",
+        )
+        for urn in urns
+    ]
+
+
+def _unit(axis: int) -> np.ndarray:
+    v = np.zeros(384, dtype=np.float32)
+    v[axis] = 1.0
+    return v
+
+
+def test_similar_queries_hit() -> None:
+    cache = SemanticCache(threshold=0.95)
+    candidates = _manifests("urn:a", "urn:b", "urn:c")
+    cache.store(_unit(0), 3, generation=1, candidates=candidates)
+
+    # Magnitude does not matter, small perturbations still hit, smaller limits are sliced.
+    assert cache.lookup(5.0 * _unit(0), 3, generation=1) == candidates
+    near = _unit(0) + 0.1 * _unit(1)
+    assert [m.urn for m in cache.lookup(near, 2, generation=1) or []] == ["urn:a", "urn:b"]
+    assert (cache.hits, cache.misses) == (2, 0)
+
+    # Dissimilar queries, larger limits and zero vectors miss.
+    assert cache.lookup(_unit(1), 3, generation=1) is None
+    assert cache.lookup(_unit(0), 4, generation=1) is None
+    assert cache.lookup(np.zeros(384, dtype=np.float32), 3, generation=1) is None
+    assert cache.misses == 3
+
+    # Cached lists are copies, so callers cannot corrupt them.
+    candidates.clear()
+    assert len(cache.lookup(_unit(0), 3, generation=1) or []) == 3
+
+
+def test_generation_change_drops_entries() -> None:
+    cache = SemanticCache()
+    cache.store(_unit(0), 1, generation=1, candidates=_manifests("urn:a"))
+    assert len(cache) == 1
+    assert cache.lookup(_unit(0), 1, generation=2) is None
+    assert len(cache) == 0
+
+    # Storing against a newer generation also resets, and zero vectors are never stored.
+    cache.store(_unit(0), 1, generation=2, candidates=_manifests("urn:a"))
+    cache.store(_unit(1), 1, generation=3, candidates=_manifests("urn:b"))
+    cache.store(np.zeros(384, dtype=np.float32), 1, generation=3, candidates=[])
+    assert len(cache) == 1
+    assert cache.lookup(_unit(0), 1, generation=3) is None
+
+
+def test_lru_eviction() -> None:
+    cache = SemanticCache(max_entries=2)
+    cache.store(_unit(0), 1, generation=0, candidates=_manifests("urn:0"))
+    cache.store(_unit(1), 1, generation=0, candidates=_manifests("urn:1"))
+    assert cache.lookup(_unit(0), 1, generation=0) is not None  # urn:0 is now most recently used
+
+    cache.store(_unit(2), 1, generation=0, candidates=_manifests("urn:2"))
+    assert len(cache) == 2
+    assert cache.lookup(_unit(1), 1, generation=0) is None
+    assert [m.urn for m in cache.lookup(_unit(0), 1, generation=0) or []] == ["urn:0"]
+    assert [m.urn for m in cache.lookup(_unit(2), 1, generation=0) or []] == ["urn:2"]
+
+    disabled = SemanticCache(max_entries=0)
+    disabled.store(_unit(0), 1, generation=0, candidates=_manifests("urn:0"))
+    assert disabled.lookup(_unit(0), 1, generation=0) is None
+
+
+def test_invalid_threshold() -> None:
+    with pytest.raises(ValueError, match="threshold"):
+        SemanticCache(threshold=0.0)
+    with pytest.raises(ValueError, match="threshold"):
+        SemanticCache(threshold=1.5)
@@ -9,7 +9,7 @@ from coreason_catalog.models import DataSensitivity, SourceManifest
 from coreason_catalog.services.sse_dispatcher import SSEQueryDispatcher
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def mock_source() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:test_source",
@@ -23,9 +23,9 @@ def mock_source() -> SourceManifest:
     )
 
 
-async def _async_gen(lines: List[str]) -> AsyncGenerator[str, None]:
+async def _async_gen(lines: List[str]) -> AsyncGenerator[bytes, None]:
     for line in lines:
-        yield line
+        yield line.encode()
 
 
 def create_mock_client(
@@ -51,8 +51,8 @@ def create_mock_client(
     else:
         mock_response.raise_for_status.return_value = None
 
-    # Mock aiter_lines
-    mock_response.aiter_lines.side_effect = lambda: _async_gen(lines)
+    # Mock aiter_bytes, one chunk per entry in `lines`
+    mock_response.aiter_bytes.side_effect = lambda chunk_size=None: _async_gen(lines)
 
     # Mock the async context manager for client.stream()
     async def mock_stream_context(*args: Any, **kwargs: Any) -> Any:
@@ -196,6 +196,19 @@ async def test_sse_dispatch_multiline_data(mock_source: SourceManifest) -> None:
     await dispatcher.close()
 
 
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_sse_dispatch_events_split_across_chunks(mock_source: SourceManifest) -> None:
+    """Events may be split, or packed together, arbitrarily across network chunks."""
+    sse_content = ['data: {"a": 1}\r\n\r\ndata: {"b"', ': "caf\u00e9"}\n', "\n", 'data: {"c": 3}\n\n']
+    mock_client = create_mock_client(sse_content)
+    dispatcher = SSEQueryDispatcher(client=mock_client)
+
+    results = await dispatcher.dispatch(mock_source, "find data")
+
+    assert results == [{"a": 1}, {"b": "caf\u00e9"}, {"c": 3}]
+    await dispatcher.close()
+
+
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_sse_dispatch_ignored_fields(mock_source: SourceManifest) -> None:
     """Test that id, event, retry, and comments are ignored."""
@@ -286,6 +299,7 @@ async def test_sse_dispatcher_lifecycle() -> None:
 
         dispatcher = SSEQueryDispatcher()  # Should create its own client
         assert dispatcher._owns_client is True
+        assert MockClientCls.call_args.kwargs["http2"] is True
 
         await dispatcher.close()
 
@@ -298,3 +312,15 @@ async def test_sse_dispatcher_lifecycle() -> None:
 
     await dispatcher_shared.close()
     mock_shared_client.aclose.assert_not_awaited()
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_sse_dispatcher_default_client_supports_http2() -> None:
+    """The owned client is built with HTTP/2 enabled (requires the h2 package)."""
+    dispatcher = SSEQueryDispatcher()
+    try:
+        assert dispatcher.client._transport._pool._http2 is True
+        # Long gaps between events are tolerated, but unreachable hosts fail fast.
+        assert dispatcher.client.timeout == httpx.Timeout(30.0, connect=5.0)
+    finally:
+        await dispatcher.close()
@@ -1,6 +1,9 @@
+import asyncio
 from pathlib import Path
 from typing import Generator
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 from coreason_catalog.models import DataSensitivity, SourceManifest
@@ -21,7 +24,7 @@ def vector_store(test_db_path: str) -> VectorStore:
     return VectorStore(uri=test_db_path)
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def sample_manifest() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:test_01",
@@ -97,9 +100,282 @@ def test_upsert_behavior(vector_store: VectorStore, sample_manifest: SourceManif
     vector_store.add_source(sample_manifest, embedding)
 
     # Update description
+    version = vector_store._table.version
     updated_manifest = sample_manifest.model_copy(update={"description": "Updated Description"})
     vector_store.add_source(updated_manifest, embedding)
 
     results = vector_store.search(embedding)
     assert len(results) == 1
     assert results[0].description == "Updated Description"
+
+    # The upsert is a single commit and leaves exactly one persisted row.
+    assert vector_store._table.version == version + 1
+    assert vector_store._table.count_rows() == 1
+
+
+def _manifest(urn: str, geo: str = "US", sensitivity: DataSensitivity = DataSensitivity.PUBLIC) -> SourceManifest:
+    return SourceManifest(
+        urn=urn,
+        name=urn,
+        description=f"Description of {urn}",
+        endpoint_url="sse://localhost",
+        geo_location=geo,
+        sensitivity=sensitivity,
+        owner_group="G1",
+        access_policy="",
+    )
+
+
+def _unit(axis: int) -> np.ndarray:
+    v = np.zeros(384, dtype=np.float32)
+    v[axis] = 1.0
+    return v
+
+
+def test_search_ranks_by_cosine_similarity(vector_store: VectorStore) -> None:
+    for i in range(5):
+        vector_store.add_source(_manifest(f"urn:{i}"), _unit(i))
+
+    # Closest to axis 3, then axis 1; magnitude must not matter for cosine.
+    query = 10.0 * (0.9 * _unit(3) + 0.4 * _unit(1))
+    results = vector_store.search(query, limit=2)
+    assert [r.urn for r in results] == ["urn:3", "urn:1"]
+
+    # Limit larger than the catalog returns everything, best first.
+    results = vector_store.search(query, limit=50)
+    assert len(results) == 5
+    assert [r.urn for r in results[:2]] == ["urn:3", "urn:1"]
+
+    # Filtered searches (LanceDB) rank consistently with the in-memory index.
+    vector_store.add_source(_manifest("urn:eu", geo="EU"), _unit(1))
+    results = vector_store.search(query, limit=2, filter_sql="geo_location = 'US'")
+    assert [r.urn for r in results] == ["urn:3", "urn:1"]
+
+
+def test_search_zero_vectors_and_limits(vector_store: VectorStore) -> None:
+    vector_store.add_source(_manifest("urn:zero"), np.zeros(384, dtype=np.float32))
+    vector_store.add_source(_manifest("urn:one"), _unit(0))
+
+    assert [r.urn for r in vector_store.search(_unit(0), limit=1)] == ["urn:one"]
+    assert len(vector_store.search(np.zeros(384, dtype=np.float32))) == 2
+    assert vector_store.search(_unit(0), limit=0) == []
+
+
+def test_index_matrix_is_contiguous_and_upserted_in_place(vector_store: VectorStore) -> None:
+    vector_store.add_source(_manifest("urn:a"), _unit(0))
+    vector_store.add_source(_manifest("urn:b"), _unit(1))
+    vector_store.add_source(_manifest("urn:a"), _unit(2))
+
+    matrix = vector_store._index.matrix
+    assert matrix.shape == (2, 384)
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert vector_store.search(_unit(2), limit=1)[0].urn == "urn:a"
+
+
+def test_index_rows_are_normalized_on_ingest(vector_store: VectorStore) -> None:
+    # A long but poorly aligned vector must not outrank a short, well aligned one.
+    vector_store.add_source(_manifest("urn:long"), 100.0 * (_unit(0) + _unit(1)))
+    vector_store.add_source(_manifest("urn:short"), 0.1 * _unit(0))
+
+    np.testing.assert_allclose(np.linalg.norm(vector_store._index.matrix, axis=1), 1.0, rtol=1e-6)
+    assert [r.urn for r in vector_store.search(_unit(0))] == ["urn:short", "urn:long"]
+
+
+def test_index_reloaded_from_disk(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path)
+    store.add_source(_manifest("urn:a"), _unit(0))
+    store.add_source(_manifest("urn:b"), _unit(1))
+
+    reopened = VectorStore(uri=test_db_path)
+    assert reopened._index.matrix.shape == (2, 384)
+    assert [r.urn for r in reopened.search(_unit(1), limit=1)] == ["urn:b"]
+
+
+def test_quantized_index(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, quantize=True)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((20, 384)).astype(np.float32)
+    for i, v in enumerate(vectors):
+        store.add_source(_manifest(f"urn:{i}"), v)
+    store.add_source(_manifest("urn:zero"), np.zeros(384, dtype=np.float32))
+    store.add_source(_manifest("urn:3"), vectors[3])  # upsert keeps int8 layout
+
+    index = store._index
+    assert index.matrix.dtype == np.int8
+    assert index.scales is not None and index.scales.shape == (21,)
+
+    # Top-k agrees with the float32 index.
+    exact = VectorStore(uri=test_db_path)
+    for i in (3, 7, 11):
+        query = vectors[i] + 0.05 * rng.standard_normal(384).astype(np.float32)
+        assert store.search(query, limit=1)[0].urn == f"urn:{i}"
+        assert [r.urn for r in store.search(query, limit=3)] == [r.urn for r in exact.search(query, limit=3)]
+
+    # A zero query scores everything as 0 instead of dividing by zero.
+    assert len(store.search(np.zeros(384, dtype=np.float32), limit=5)) == 5
+
+    # Reloading from disk re-quantizes the persisted float32 vectors.
+    reopened = VectorStore(uri=test_db_path, quantize=True)
+    assert reopened._index.matrix.dtype == np.int8
+    assert reopened.search(vectors[7], limit=1)[0].urn == "urn:7"
+
+
+def test_index_picks_up_writes_from_other_processes(test_db_path: str) -> None:
+    reader = VectorStore(uri=test_db_path, refresh_interval=0.0)
+    writer = VectorStore(uri=test_db_path)  # e.g. another uvicorn worker
+    assert reader.search(_unit(0)) == []
+
+    writer.add_source(_manifest("urn:a"), _unit(0))
+    assert [r.urn for r in reader.search(_unit(0))] == ["urn:a"]
+
+    # Checks are rate limited by refresh_interval.
+    reader.refresh_interval = 3600.0
+    reader.search(_unit(0))
+    writer.add_source(_manifest("urn:b"), _unit(1))
+    assert [r.urn for r in reader.search(_unit(1))] == ["urn:a"]
+
+
+def test_local_writes_do_not_reload_index(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, refresh_interval=0.0)
+    with patch.object(store, "_load_index", wraps=store._load_index) as load_index:
+        for i in range(3):
+            store.add_source(_manifest(f"urn:{i}"), _unit(i))
+            assert [r.urn for r in store.search(_unit(i), limit=1)] == [f"urn:{i}"]
+            store.current_generation()
+        assert load_index.call_count == 0
+
+        # A write from another process still triggers exactly one reload.
+        VectorStore(uri=test_db_path).add_source(_manifest("urn:other"), _unit(5))
+        assert [r.urn for r in store.search(_unit(5), limit=1)] == ["urn:other"]
+        store.search(_unit(5))
+        assert load_index.call_count == 1
+
+
+def test_local_write_after_a_foreign_write_reloads_index(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, refresh_interval=3600.0)
+    VectorStore(uri=test_db_path).add_source(_manifest("urn:b"), _unit(1))  # not seen yet
+    store.add_source(_manifest("urn:a"), _unit(0))
+
+    # The local write landed on top of the foreign one, so both are searchable, on both paths.
+    store._next_refresh = 0.0
+    assert sorted(r.urn for r in store.search(_unit(0))) == ["urn:a", "urn:b"]
+    assert sorted(r.urn for r in store.search(_unit(0), filter_sql="geo_location = 'US'")) == ["urn:a", "urn:b"]
+    assert store._table.count_rows() == 2
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_async_refresh_runs_in_a_worker_thread(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, refresh_interval=3600.0)
+    VectorStore(uri=test_db_path).add_source(_manifest("urn:a"), _unit(0))
+    store._next_refresh = 0.0
+
+    with patch("asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        await store.refresh_if_stale_async()
+        to_thread.assert_called_once_with(store._refresh)
+        # Within the interval there is nothing to check, on or off the loop.
+        await store.refresh_if_stale_async()
+        assert to_thread.call_count == 1
+    with patch.object(store._table, "checkout_latest", side_effect=AssertionError("checked on the loop")):
+        assert [r.urn for r in store.search(_unit(0))] == ["urn:a"]
+
+
+def test_refresh_rechecks_the_version_under_the_write_lock(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, refresh_interval=0.0)
+    store.add_source(_manifest("urn:a"), _unit(0))
+    caught_up = store._index_version
+    store._index_version = -1  # looks stale when checked without the lock
+
+    def local_write_finishes() -> None:
+        store._index_version = caught_up
+
+    lock = MagicMock()
+    lock.__enter__.side_effect = local_write_finishes
+    with patch.object(store, "_write_lock", lock), patch.object(store, "_load_index") as load_index:
+        store.search(_unit(0))
+    lock.__enter__.assert_called_once()
+    load_index.assert_not_called()
+
+
+def test_index_refresh_failure_keeps_serving(vector_store: VectorStore) -> None:
+    vector_store.add_source(_manifest("urn:a"), _unit(0))
+    vector_store._next_refresh = 0.0
+    with patch.object(vector_store._table, "checkout_latest", side_effect=Exception("DB unavailable")):
+        assert [r.urn for r in vector_store.search(_unit(0))] == ["urn:a"]
+
+
+def test_table_handle_is_reused(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path)
+    with patch.object(store.db, "open_table", side_effect=AssertionError("table reopened")):
+        store.add_source(_manifest("urn:a", geo="EU"), _unit(0))
+        store._next_refresh = 0.0
+        assert [r.urn for r in store.search(_unit(0))] == ["urn:a"]
+        assert [r.urn for r in store.search(_unit(0), filter_sql="geo_location = 'EU'")] == ["urn:a"]
+
+    # refresh_table reopens the handle and reloads the index.
+    other = VectorStore(uri=test_db_path)
+    other.add_source(_manifest("urn:b"), _unit(1))
+    store.refresh_interval = 3600.0
+    store.refresh_table()
+    assert [r.urn for r in store.search(_unit(1), limit=1)] == ["urn:b"]
+
+
+def test_upsert_urn_is_not_interpolated_into_sql(vector_store: VectorStore) -> None:
+    # Upserts match on the key column, so quotes in a URN cannot alter a predicate.
+    tricky = "urn:x' OR '1'='1"
+    vector_store.add_source(_manifest("urn:other"), _unit(1))
+    vector_store.add_source(_manifest(tricky), _unit(0))
+    vector_store.add_source(_manifest(tricky, geo="EU"), _unit(0))
+
+    assert vector_store._table.count_rows() == 2
+    assert sorted(r.geo_location for r in vector_store.search(_unit(0))) == ["EU", "US"]
+
+
+def test_vector_shape_validation(vector_store: VectorStore) -> None:
+    vector_store.add_source(_manifest("urn:a"), _unit(0))
+    assert [r.urn for r in vector_store.search(_unit(0).tolist(), limit=1)] == ["urn:a"]
+
+    # The check is on the converted array's shape, so 2-D input of the right length is rejected too.
+
+    with pytest.raises(ValueError, match="dimension mismatch"):
+        vector_store.add_source(_manifest("urn:b"), np.ones((1, 384), dtype=np.float32))
+    with pytest.raises(ValueError, match="got 768"):
+        vector_store.search(np.ones((2, 384), dtype=np.float32))
+
+
+def test_add_sources_batch(vector_store: VectorStore) -> None:
+    vector_store.add_source(_manifest("urn:a"), _unit(0))
+    version = vector_store._table.version
+
+    # One commit updates urn:a, inserts urn:b and urn:c; a duplicate URN keeps its last occurrence.
+    manifests = [_manifest("urn:a", geo="EU"), _manifest("urn:b"), _manifest("urn:c"), _manifest("urn:b", geo="APAC")]
+    vector_store.add_sources_batch(manifests, np.stack([_unit(3), _unit(1), _unit(2), _unit(4)]))
+
+    assert vector_store._table.version == version + 1
+    assert vector_store._table.count_rows() == 3
+    assert [r.urn for r in vector_store.search(_unit(3), limit=1)] == ["urn:a"]
+    assert [r.geo_location for r in vector_store.search(_unit(4), limit=1)] == ["APAC"]
+    assert vector_store._index.matrix.shape == (3, 384)
+
+    # Filtered (LanceDB) and in-memory searches agree on what was persisted.
+    assert [r.urn for r in vector_store.search(_unit(1), limit=1, filter_sql="geo_location = 'US'")] == ["urn:c"]
+
+    vector_store.add_sources_batch([], np.empty((0, 384), dtype=np.float32))
+    assert vector_store._table.version == version + 1
+
+    with pytest.raises(ValueError, match="shape mismatch"):
+        vector_store.add_sources_batch([_manifest("urn:d")], np.stack([_unit(0), _unit(1)]))
+
+
+def test_generation_tracks_index_changes(test_db_path: str) -> None:
+    store = VectorStore(uri=test_db_path, refresh_interval=0.0)
+    start = store.current_generation()
+    assert store.current_generation() == start
+
+    store.add_source(_manifest("urn:a"), _unit(0))
+    after_write = store.current_generation()
+    assert after_write > start
+
+    # Writes from another process bump it once they are picked up.
+    VectorStore(uri=test_db_path).add_source(_manifest("urn:b"), _unit(1))
+    assert store.current_generation() > after_write
@@ -21,7 +21,7 @@ def vector_store_complex(test_db_path_complex: str) -> VectorStore:
     return VectorStore(uri=test_db_path_complex)
 
 
-@pytest.fixture  # type: ignore[misc]
+@pytest.fixture(scope="session")  # type: ignore[misc]
 def sample_manifest() -> SourceManifest:
     return SourceManifest(
         urn="urn:coreason:mcp:test_complex",
@@ -125,8 +125,8 @@ def test_add_source_runtime_error(vector_store_complex: VectorStore, sample_mani
     """Test that generic exceptions during add_source are caught and re-raised as RuntimeError."""
     embedding = [0.1] * 384
 
-    # Mock open_table to raise an exception
-    with patch.object(vector_store_complex.db, "open_table", side_effect=Exception("DB connection lost")):
+    # Make the table write raise an exception
+    with patch.object(vector_store_complex._table, "merge_insert", side_effect=Exception("DB connection lost")):
         with pytest.raises(RuntimeError, match="Failed to add source: DB connection lost"):
             vector_store_complex.add_source(sample_manifest, embedding)
 
@@ -135,10 +135,10 @@ def test_search_runtime_error(vector_store_complex: VectorStore) -> None:
     """Test that generic exceptions during search are caught and re-raised as RuntimeError."""
     embedding = [0.1] * 384
 
-    # Mock open_table to raise an exception
-    with patch.object(vector_store_complex.db, "open_table", side_effect=Exception("Search Error")):
+    # Make the table search raise an exception (filtered searches are served by LanceDB)
+    with patch.object(vector_store_complex._table, "search", side_effect=Exception("Search Error")):
         with pytest.raises(RuntimeError, match="Search failed: Search Error"):
-            vector_store_complex.search(embedding)
+            vector_store_complex.search(embedding, filter_sql="geo_location = 'US'")
 
 
 def test_search_sql_syntax_error(vector_store_complex: VectorStore, sample_manifest: SourceManifest) -> None:
@@ -146,18 +146,21 @@ def test_search_sql_syntax_error(vector_store_complex: VectorStore, sample_manif
     embedding = [0.1] * 384
     vector_store_complex.add_source(sample_manifest, embedding)
 
-    # We deliberately inject an error that to_pandas might raise if the query plan is invalid
-    # Mocking query.to_pandas to raise a specific Syntax Error message
+    # We deliberately inject an error that to_arrow might raise if the query plan is invalid
+    # Mocking query.to_arrow to raise a specific Syntax Error message
 
     # Create a mock query object
     mock_query = MagicMock()
+    mock_query.distance_type.return_value = mock_query
+    mock_query.select.return_value = mock_query
     mock_query.limit.return_value = mock_query
     mock_query.where.return_value = mock_query
-    mock_query.to_pandas.side_effect = Exception("syntax error at or near")
+    mock_query.to_arrow.side_effect = Exception("syntax error at or near")
 
     mock_table = MagicMock()
     mock_table.search.return_value = mock_query
+    mock_table.version = vector_store_complex._index_version
 
-    with patch.object(vector_store_complex.db, "open_table", return_value=mock_table):
+    with patch.object(vector_store_complex, "_table", mock_table):
         with pytest.raises(ValueError, match="Invalid SQL filter"):
             vector_store_complex.search(embedding, filter_sql="BAD SQL")
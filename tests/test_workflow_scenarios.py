@@ -1,6 +1,7 @@
 from typing import Any, List
 from unittest.mock import AsyncMock, MagicMock
 
+import numpy as np
 import pytest
 from coreason_identity.models import UserContext
 
@@ -17,7 +18,7 @@ def broker_setup() -> tuple[FederationBroker, MagicMock, MagicMock, AsyncMock]:
     vector_store = MagicMock(spec=VectorStore)
     policy_engine = MagicMock(spec=PolicyEngine)
     embedding_service = MagicMock(spec=EmbeddingService)
-    embedding_service.embed_text.return_value = [0.1] * 384
+    embedding_service.embed_text_async.return_value = np.full(384, 0.1, dtype=np.float32)
     dispatcher = AsyncMock(spec=QueryDispatcher)
     provenance_service = MagicMock(spec=ProvenanceService)
     provenance_service.generate_provenance.return_value = "sig"
@@ -58,15 +59,15 @@ async def test_workflow_access_upgrade(
     """
     broker, vector_store, policy_engine, dispatcher = broker_setup
 
-    # Mock Policy Engine to use real check_access logic but mock evaluate_policy
+    # Mock Policy Engine to use real check_access logic but mock evaluate_policy_async
     # We can rely on the side_effect trick or just reimplement simple logic for the mock
     def check_access_impl(asset: SourceManifest, user_context: UserContext) -> bool:
         if user_context.claims.get("is_service_account"):
             return True
         return bool(set(asset.acls) & set(user_context.groups))
 
-    policy_engine.check_access.side_effect = check_access_impl
-    policy_engine.evaluate_policy.return_value = True  # OPA always says yes for this test
+    policy_engine.check_access_batch.side_effect = lambda assets, ctx: [check_access_impl(a, ctx) for a in assets]
+    policy_engine.evaluate_policy_async.return_value = True  # OPA always says yes for this test
 
     # Data Setup
     source_a = create_source("urn:A", ["group:A"])
@@ -120,17 +121,17 @@ async def test_workflow_mixed_governance(
     def check_access_impl(asset: SourceManifest, user_context: UserContext) -> bool:
         return bool(set(asset.acls) & set(user_context.groups))
 
-    policy_engine.check_access.side_effect = check_access_impl
+    policy_engine.check_access_batch.side_effect = lambda assets, ctx: [check_access_impl(a, ctx) for a in assets]
 
     # OPA Logic
-    def evaluate_policy_impl(policy: str, input_data: dict[str, Any]) -> bool:
+    def evaluate_policy_impl(policy: str, input_data: dict[str, Any], **kwargs: Any) -> bool:
         # Block urn:opa_block
         obj_urn = input_data["object"]["urn"]
         if obj_urn == "urn:opa_block":
             return False
         return True
 
-    policy_engine.evaluate_policy.side_effect = evaluate_policy_impl
+    policy_engine.evaluate_policy_async.side_effect = evaluate_policy_impl
 
     # Dispatch Logic
     async def dispatch_impl(source: SourceManifest, intent: str) -> Any:
@@ -7,6 +7,7 @@ from coreason_catalog.api.routes import query_catalog
 from coreason_catalog.models import DataSensitivity, QueryRequest, SourceManifest
 from coreason_catalog.services.broker import FederationBroker
 from coreason_catalog.services.policy_engine import PolicyEngine
+from coreason_catalog.services.vector_store import VectorStore
 
 
 class TestPolicyEngineACLs:
@@ -58,11 +59,35 @@ class TestPolicyEngineACLs:
         )
         assert engine.check_access(asset, user_context) is False
 
+    def test_access_batch_matches_single_checks(self) -> None:
+        engine = PolicyEngine(opa_path="mock")
+        assets = [
+            SourceManifest(
+                urn=f"urn:{i}",
+                name="n",
+                description="d",
+                endpoint_url="url",
+                geo_location="loc",
+                sensitivity=DataSensitivity.PUBLIC,
+                owner_group="og",
+                access_policy="pol",
+                acls=acls,
+            )
+            for i, acls in enumerate([["group:A"], ["group:B", "group:C"], []])
+        ]
+        user = UserContext(user_id="u1", email="u1@example.com", groups=["group:C"])
+        service = UserContext(user_id="sa", email="sa@bot.com", claims={"is_service_account": True})
+
+        assert engine.check_access_batch(assets, user) == [False, True, False]
+        assert engine.check_access_batch(assets, user) == [engine.check_access(a, user) for a in assets]
+        assert engine.check_access_batch(assets, service) == [True, True, True]
+        assert engine.check_access_batch([], user) == []
+
 
 @pytest.mark.asyncio  # type: ignore[misc]
 async def test_broker_acl_filtering() -> None:
     # Mock dependencies
-    vector_store = MagicMock()
+    vector_store = MagicMock(spec=VectorStore)
 
     # Use a pure mock for policy engine to avoid instantiation and mypy issues
     policy_engine = MagicMock(spec=PolicyEngine)
@@ -73,11 +98,11 @@ async def test_broker_acl_filtering() -> None:
             return True
         return bool(set(asset.acls) & set(user_context.groups))
 
-    policy_engine.check_access.side_effect = fake_check_access
-    policy_engine.evaluate_policy.return_value = True
+    policy_engine.check_access_batch.side_effect = lambda assets, ctx: [fake_check_access(a, ctx) for a in assets]
+    policy_engine.evaluate_policy_async.return_value = True
 
     embedding_service = MagicMock()
-    embedding_service.embed_text.return_value = [0.1] * 384  # Dimension? Assumed mocked
+    embedding_service.embed_text_async = AsyncMock(return_value=[0.1] * 384)
 
     dispatcher = MagicMock()
     # Mock dispatch return
@@ -169,3 +194,25 @@ async def test_api_context_propagation() -> None:
     call_args = mock_broker.dispatch_query.call_args
     assert isinstance(call_args[0][1], UserContext)
     assert call_args[0][1].user_id == "u1"
+
+
+@pytest.mark.asyncio  # type: ignore[misc]
+async def test_api_context_header_not_shared_between_requests() -> None:
+    mock_broker = AsyncMock()
+    mock_broker.dispatch_query.return_value = MagicMock()
+
+    request = QueryRequest(intent="test", user_context=UserContext(user_id="u1", email="base@test.com"), limit=10)
+    header_context = UserContext(
+        user_id="u3", email="header@test.com", groups=["g"], downstream_token="secret"
+    ).model_dump_json()
+
+    await query_catalog(request, x_user_context=header_context, broker=mock_broker)
+    first = mock_broker.dispatch_query.call_args[0][1]
+    # UserContext is frozen, but its groups and claims containers are not.
+    first.groups.append("injected")
+    await query_catalog(request, x_user_context=header_context, broker=mock_broker)
+    second = mock_broker.dispatch_query.call_args[0][1]
+
+    # Every request validates its own header, so nothing leaks from one request to the next.
+    assert second is not first
+    assert second.groups == ["g"]